@@ -91,6 +91,21 @@ def wheel(session: Session):
     pytest_run(session, WEBTEST_DB='sqlite')
 
 
+@session(py=py_single)
+def bench(session: Session):
+    """
+    Run the benchmarks, e.g. `nox -e bench -- run --sizes 1k,100k --output results.json`
+    """
+    uv_sync(session, 'tests', project=True)
+    session.run(
+        'python',
+        '-m',
+        'webgrid_bench',
+        *(session.posargs or ('run',)),
+        env={'PYTHONPATH': tests_dpath},
+    )
+
+
 @session(py=py_single)
 def precommit(session: Session):
     uv_sync(session, 'pre-commit', project=False)
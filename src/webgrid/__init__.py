@@ -1,6 +1,11 @@
+import contextlib
+import copy
 import datetime as dt
+from decimal import Decimal
 import inspect
+import json
 import logging
+import operator
 import sys
 import time
 from typing import ClassVar
@@ -15,10 +20,13 @@ from blazeutils.strings import case_cw2us, randchars
 import six
 import sqlalchemy as sa
 import sqlalchemy.sql as sasql
+import sqlalchemy.sql.operators as sa_operators
 
 from . import validators
+from .cache import make_key
 from .extensions import gettext as _
 from .renderers import HTML, XLSX
+from .utils import decode_cursor, encode_cursor
 from .version import VERSION as __version__  # noqa: F401
 
 
@@ -34,27 +42,95 @@ log = logging.getLogger(__name__)
 # subtotals functions
 sum_ = sasql.functions.sum
 avg_ = sasql.func.avg
+count_ = sasql.functions.count
 
 
 def subtotal_function_map(v):
     """Maps string value to a function, or passes the value through.
 
-    Recognizes True, "sum" or "avg". If True, "sum" is used as the default
+    Recognizes True, "sum", "avg" or "count". If True, "sum" is used as the default
     subtotal function.
 
     Args:
         v (Union(str, callable)): Value defining the subtotal method.
 
     Returns:
-        Union(str, callable): `sum` or `avg` SQLAlchemy functions, or the value.
+        Union(str, callable): `sum`, `avg` or `count` SQLAlchemy functions, or the value.
     """
     if v is True or v == 'sum':
         return sum_
     elif v == 'avg':
         return avg_
+    elif v == 'count':
+        return count_
     return v
 
 
+def _total_sum(values):
+    values = [value for value in values if value is not None]
+    return sum(values) if values else None
+
+
+def _total_avg(values):
+    values = [value for value in values if value is not None]
+    return sum(values) / len(values) if values else None
+
+
+def _total_count(values):
+    return sum(1 for value in values if value is not None)
+
+
+# Python equivalents of SQL aggregates, used to total records already fetched. Like SQL, nulls
+# are skipped.
+_python_totals = {sum_: _total_sum, avg_: _total_avg, count_: _total_count}
+
+
+class TotalsRecord(dict):
+    """Totals computed from loaded records. Values are available as keys or attributes, like
+    a result row from a totals query."""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(
+                f"'{self.__class__.__name__}' object has no attribute '{name}'",
+            ) from None
+
+
+class PostgresCountEstimator:
+    """Approximate record counts from the PostgreSQL planner's row estimate.
+
+    Assign an instance to a grid's `count_estimator`. The estimate is only used when the grid
+    has no active filters or search, and when it is at least `min_count` (small tables are
+    cheap to count exactly, and their estimates are the least reliable). In all other cases,
+    None is returned and the grid runs an exact count.
+
+    Args:
+        min_count (int, optional): Smallest estimate to use in place of a count. Default 100000.
+    """
+
+    def __init__(self, min_count=100000):
+        self.min_count = min_count
+
+    def estimate(self, grid, query):
+        if grid.has_filters:
+            return None
+        connection = query.session.connection()
+        if connection.dialect.name != 'postgresql':
+            return None
+
+        compiled = query.statement.compile(dialect=connection.dialect)
+        plan = connection.exec_driver_sql(
+            f'EXPLAIN (FORMAT JSON) {compiled}',
+            compiled.params,
+        ).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]['Plan']['Plan Rows'])
+        return estimate if estimate >= self.min_count else None
+
+
 class _None:
     """
     A sentinal object to indicate no value
@@ -65,6 +141,36 @@ class ExtractionError(TypeError):
     """raised when we are unable to extract a value from the record"""
 
 
+def _number_formatter(places, curr='', sep=',', dp='.', pos='', neg='-', trailneg=''):
+    """Build a function formatting numbers the way `decimalfmt` does with these options.
+
+    Rounding and grouping are left to Python's format specification, which is much faster
+    than `decimalfmt` assembling the string digit by digit.
+    """
+    spec = f',.{places}f'
+    separators = None if (sep, dp) == (',', '.') else str.maketrans({',': sep, '.': dp})
+    positive = pos + curr
+    negative = neg + curr
+
+    def format_number(value):
+        if not isinstance(value, Decimal):
+            # floats go through their repr, so 2.675 rounds as written
+            value = Decimal(str(value) if isinstance(value, float) else value)
+        text = format(value, spec)
+        if separators is not None:
+            text = text.translate(separators)
+        if text[0] == '-':
+            return negative + text[1:] + trailneg
+        return positive + text
+
+    return format_number
+
+
+def _overrides(obj, attr, base):
+    """True if obj provides its own version of the method `base` defines as `attr`."""
+    return getattr(type(obj), attr, None) is not getattr(base, attr)
+
+
 class _DeclarativeMeta(type):
     def __new__(cls, name, bases, class_dict):
         class_dict['_rowstylers'] = []
@@ -118,23 +224,31 @@ class Column:
         Defaults to _None.
 
         has_subtotal (Union(bool,str,callable), optional): Subtotal method to use, if any.
-        True or "sum" will yield a sum total. "avg" maps to average. Can also be a
-        callable that will be called with the aggregate expression and is expected
-        to return a SQLAlchemy expression. Defaults to False.
+        True or "sum" will yield a sum total. "avg" maps to average, and "count" counts
+        non-null values. Can also be a callable that will be called with the aggregate
+        expression and is expected to return a SQLAlchemy expression. Defaults to False.
 
         visible (Union(bool, callable), optional): Enables any target in `render_in`.
         Defaults to True.
 
         group (ColumnGroup, optional): Render grouping under a single heading. Defaults to None.
 
+        loader_options (Union(ORMOption, tuple), optional): SQLAlchemy loader option(s), such
+        as ``selectinload(Person.emails)``, for relationships the column reads from records.
+        Applied to the records query only when the column renders in the current target.
+        Defaults to None.
+
     Class Attributes:
         xls_width (float, optional): Override to autocalculated width in Excel exports.
 
         xls_num_format (str, optional): Default numeric/date format type.
+
+        loader_options (Union(ORMOption, tuple), optional): Default loader option(s).
     """
 
     xls_width = None
     xls_num_format = None
+    loader_options = None
     json_type_helper = None
     _render_in = 'html', 'xlsx', 'csv', 'json'
     _visible = True
@@ -203,6 +317,7 @@ class Column:
         has_subtotal=False,
         visible=True,
         group=None,
+        loader_options=None,
         **kwargs,
     ):
         self.label = label
@@ -218,6 +333,8 @@ class Column:
         self.expr = None
         self._query_idx = None
         self._query_key = None
+        self._accessor_shape = None
+        self._accessor = None
         if render_in is not _None:
             self.render_in = render_in
         self.visible = visible
@@ -225,6 +342,8 @@ class Column:
             self.xls_width = xls_width
         if xls_num_format:
             self.xls_num_format = xls_num_format
+        if loader_options is not None:
+            self.loader_options = loader_options
 
         try:
             is_group_cls = issubclass(type(group), ColumnGroup) or issubclass(group, ColumnGroup)
@@ -273,17 +392,30 @@ class Column:
         Used during the grid instantiation process. Grid classes have column instances defining
         the grid structure. When the grid instantiates, we have to copy those column instances
         along with it, to attach them to the grid instance.
+
+        The first copy made for a given key is kept as a blueprint. Later grid instances get a
+        copy of the blueprint, with their own filter, HTML attributes, and deep copies of dict,
+        list and set attributes. Changes made to the class-level column after its grid class is
+        first instantiated are therefore not picked up.
         """
         cls = self.__class__
         key = grid.get_unique_column_key(
             self.key or case_cw2us(str(self.label).replace(' ', '')) or 'unnamed_expression',
         )
 
-        column = cls(self.label, key, None, self.can_sort, group=self.group, _dont_assign=True)
-        column.key = key
+        blueprints = self.__dict__.setdefault('_blueprints', {})
+        blueprint = blueprints.get(key)
+        if blueprint is None:
+            blueprint = blueprints[key] = self._new_blueprint(key)
+
+        column = cls.__new__(cls, _dont_assign=True)
+        column.__dict__.update(blueprint.__dict__)
+        # give each instance its own containers, as building a column with __init__ would.
+        # Loader options are SQLAlchemy constructs, shared as they were before blueprints.
+        for attr, value in blueprint.__dict__.items():
+            if isinstance(value, dict | list | set) and attr != 'loader_options':
+                column.__dict__[attr] = copy.deepcopy(value)
         column.grid = grid
-        column.expr = self.expr
-        column._query_key = self._query_key
 
         if self.filter:
             column.filter = self.filter.new_instance(
@@ -296,6 +428,16 @@ class Column:
         column.body = BlankObject()
         column.body.hah = HTMLAttributes(self.kwargs)
 
+        return column
+
+    def _new_blueprint(self, key):
+        """Build the grid-independent part of a column copy for `new_instance`."""
+        cls = self.__class__
+        column = cls(self.label, key, None, self.can_sort, group=self.group, _dont_assign=True)
+        column.key = key
+        column.expr = self.expr
+        column._query_key = self._query_key
+
         # try to be smart about which attributes should get copied to the
         # new instance by looking for attributes on the class that have the
         # same name as arguments to the classes __init__ method
@@ -317,6 +459,7 @@ class Column:
         # lambdas that should be called per grid instance.
         column.render_in = self._render_in
         column.visible = self._visible
+        column.loader_options = self.loader_options
 
         return column
 
@@ -327,21 +470,41 @@ class Column:
         """
         data = self.extract_data(record)
         data = self.format_data(data)
-        for _filter, cname in self.grid._colfilters:
-            for_column = self.grid.column(cname)
-            if self.key == for_column.key:
-                data = _filter(self.grid, data)
+        for _filter in self.grid._column_filters(self):
+            data = _filter(self.grid, data)
         return data
 
     def extract_data(self, record):
         """
         Locate the data for this column in the record and return it.
+
+        How the data was found is remembered for records of the same shape (rows of the same
+        result, or instances of the same type), so following records skip the search.
+        """
+        shape = record._parent if isinstance(record, sa.engine.Row) else type(record)
+        if shape is self._accessor_shape:
+            try:
+                return self._accessor(record)
+            except (KeyError, IndexError, AttributeError, TypeError):
+                # the search below raises any real error
+                pass
+
+        value, accessor = self._locate_data(record)
+        self._accessor_shape = shape
+        self._accessor = accessor
+        return value
+
+    def _locate_data(self, record):
+        """Search the record for this column's data.
+
+        Returns:
+            tuple: The data, and an accessor callable to get it from similar records.
         """
         # key style based on key
         try:
             if isinstance(record, dict):
-                return record[self.key]
-            return record._mapping[self.key]
+                return record[self.key], operator.itemgetter(self.key)
+            return record._mapping[self.key], self._mapping_accessor(record)
         except (TypeError, KeyError, AttributeError):
             pass
 
@@ -349,13 +512,13 @@ class Column:
         if self._query_idx is not None and hasattr(record, '_fields'):
             try:
                 if record._fields[self._query_idx] == self._query_key:
-                    return record[self._query_idx]
+                    return record[self._query_idx], operator.itemgetter(self._query_idx)
             except IndexError:
                 pass
 
         # attribute style
         try:
-            return getattr(record, self._query_key)
+            return getattr(record, self._query_key), operator.attrgetter(self._query_key)
         except AttributeError as e:
             if (f"object has no attribute '{self._query_key}'") not in str(e):
                 raise
@@ -365,13 +528,21 @@ class Column:
 
         # attribute style with grid key
         try:
-            return getattr(record, self.key)
+            return getattr(record, self.key), operator.attrgetter(self.key)
         except AttributeError as e:
             if (f"object has no attribute '{self.key}'") not in str(e):
                 raise
 
         raise ExtractionError(_('key "{key}" not found in record', key=self.key))
 
+    def _mapping_accessor(self, record):
+        # a name appearing once in the row's fields can be read by position
+        fields = getattr(record, '_fields', ())
+        if fields.count(self.key) == 1:
+            return operator.itemgetter(fields.index(self.key))
+        key = self.key
+        return lambda record: record._mapping[key]
+
     def format_data(self, value):
         """
         Use to adjust the value extracted from the record for this column.
@@ -393,6 +564,44 @@ class Column:
             return getattr(self, render_attr)(record, *args, **kwargs)
         return self.extract_and_format_data(record)
 
+    def render_batch(self, render_type, records):
+        """Render this column for a sequence of records, a column at a time.
+
+        Returns a list holding the value `render` would give for each record. A subclass
+        overriding `render` has it called per record. A `render_<type>` override is looked up
+        once and called per record. Otherwise values are extracted together and handed to
+        `format_batch`, so subclasses can format the whole column in one pass.
+
+        Not used for HTML, where rendering also sets attributes on the cell.
+        """
+        if _overrides(self, 'render', Column):
+            return [self.render(render_type, record) for record in records]
+        render_attr = f'render_{render_type}'
+        if hasattr(self, render_attr):
+            render = getattr(self, render_attr)
+            return [render(record) for record in records]
+        return self.extract_and_format_batch(records)
+
+    def extract_and_format_batch(self, records):
+        """Batch version of `extract_and_format_data`, returning a list of values."""
+        if _overrides(self, 'extract_and_format_data', Column):
+            return [self.extract_and_format_data(record) for record in records]
+        values = self.format_batch([self.extract_data(record) for record in records])
+        for _filter in self.grid._column_filters(self):
+            values = [_filter(self.grid, value) for value in values]
+        return values
+
+    def format_batch(self, values):
+        """Batch version of `format_data`, returning a list of formatted values.
+
+        Columns that format values without per-value dispatch can override this together with
+        `format_data`.
+        """
+        if not _overrides(self, 'format_data', Column):
+            return values
+        format_data = self.format_data
+        return [format_data(value) for value in values]
+
     def apply_sort(self, query, flag_desc):
         """Query modifier to enable sort for this column's expression."""
         if self.expr is None:
@@ -543,6 +752,14 @@ class BoolColumn(Column):
             return self.true_label
         return self.false_label
 
+    def format_batch(self, values):
+        if _overrides(self, 'format_data', BoolColumn):
+            return super().format_batch(values)
+        true_label, false_label = self.true_label, self.false_label
+        if self.reverse:
+            true_label, false_label = false_label, true_label
+        return [true_label if value else false_label for value in values]
+
 
 class YesNoColumn(BoolColumn):
     """BoolColumn rendering values as Yes/No.
@@ -650,6 +867,9 @@ class DateColumnBase(Column):
         data = self.extract_and_format_data(record)
         if not data:
             return data
+        return self._xlsx_value(data)
+
+    def _xlsx_value(self, data):
         # if we have an arrow date, pull the underlying datetime, else the renderer won't know
         #   how to handle it
         if arrow and isinstance(data, arrow.Arrow):
@@ -665,6 +885,20 @@ class DateColumnBase(Column):
             return data
         return self._format_datetime(data, self.csv_format)
 
+    def render_batch(self, render_type, records):
+        """Format CSV and XLSX dates a column at a time, unless `render` or the target's
+        render method is overridden."""
+        if render_type not in ('csv', 'xlsx'):
+            return super().render_batch(render_type, records)
+        render_overridden = _overrides(self, 'render', Column)
+        if render_overridden or _overrides(self, f'render_{render_type}', DateColumnBase):
+            return super().render_batch(render_type, records)
+        values = self.extract_and_format_batch(records)
+        if render_type == 'xlsx':
+            return [self._xlsx_value(value) if value else value for value in values]
+        fmt = self.csv_format
+        return [self._format_datetime(value, fmt) if value else value for value in values]
+
     def xls_width_calc(self, value):
         """Determine approximate width from value.
 
@@ -855,21 +1089,54 @@ class NumericColumn(Column):
         Negative values are given a "negative" CSS class in the render.
         """
         data = self.extract_and_format_data(record)
-        if not data and data != 0:
-            return data
-
-        if self.format_as == 'percent':
-            data = data * 100
+        (formatted,), (negative,) = self.format_numbers([data])
+        if negative:
+            hah.class_ += 'negative'
+        return formatted
 
-        formatted = decimalfmt(data, *self.html_decimal_format_opts(data))
+    def format_numbers(self, values):
+        """Format a batch of numbers for HTML display.
 
-        if self.format_as == 'percent':
-            formatted += '%'
+        Output matches `decimalfmt` given `html_decimal_format_opts`. The options are worked
+        out once for the batch, unless `html_decimal_format_opts` is overridden, since it may
+        then depend on the value. Empty values other than zero are passed through.
 
-        if data < 0:
-            hah.class_ += 'negative'
+        Args:
+            values (list): Numbers to format, e.g. Decimal, float, or int.
 
-        return formatted
+        Returns:
+            tuple: List of formatted values, and list of flags marking the negative ones.
+        """
+        if _overrides(self, 'html_decimal_format_opts', NumericColumn):
+            format_number = lambda value: decimalfmt(
+                value,
+                *self.html_decimal_format_opts(value),
+            )
+        else:
+            format_number = self._html_number_formatter()
+        percent = self.format_as == 'percent'
+
+        formatted = []
+        negatives = []
+        for value in values:
+            if not value and value != 0:
+                formatted.append(value)
+                negatives.append(False)
+                continue
+            if percent:
+                value = value * 100
+            text = format_number(value)
+            formatted.append(f'{text}%' if percent else text)
+            negatives.append(value < 0)
+        return formatted, negatives
+
+    def _html_number_formatter(self):
+        # cells are often formatted one at a time, so keep the formatter while options hold
+        opts = self.html_decimal_format_opts(None)
+        cached = self.__dict__.get('_html_formatter')
+        if cached is None or cached[0] != opts:
+            cached = self._html_formatter = (opts, _number_formatter(*opts))
+        return cached[1]
 
     def xls_construct_format(self, fmt_str):
         """Apply places and xls_neg_red settings to the given number format string."""
@@ -904,6 +1171,11 @@ class EnumColumn(Column):
             return None
         return value.value
 
+    def format_batch(self, values):
+        if _overrides(self, 'format_data', EnumColumn):
+            return super().format_batch(values)
+        return [None if value is None else value.value for value in values]
+
 
 class ColumnGroup:
     r"""Represents a grouping of grid columns which may be rendered within a group label.
@@ -953,6 +1225,8 @@ class QueryStringBuilder:
             grid_args.append(('onpage', self.grid.on_page))
         if self.grid.per_page != self.grid.__class__.per_page:
             grid_args.append(('perpage', self.grid.per_page))
+        if self.grid.page_cursor:
+            grid_args.append(('cursor', self.grid.page_cursor))
         return grid_args
 
     def args_sort(self):
@@ -1038,6 +1312,12 @@ class BaseGrid(six.with_metaclass(_DeclarativeMeta, object)):
 
         enable_search (bool): Enable single-search UX. Default True.
 
+        lazy_filters (bool): Render only the active filter rows in HTML. Rows for other
+        filters are fetched from the manager when picked in "Add Filter", which avoids
+        rendering and resolving options for filters that are not in use. Requires a manager
+        that serves filter rows, e.g. ``webgrid.flask.WebGrid`` with ``enable_filter_routes``
+        on and the grid registered via ``register_grid`` under its ident. Default False.
+
         unconfirmed_export_limit (int): Ask for confirmation before exporting more than this many
         records. Set to None to disable. Default 10000.
 
@@ -1059,6 +1339,49 @@ class BaseGrid(six.with_metaclass(_DeclarativeMeta, object)):
         are not set on the grid.
         Note, relationship attributes must be referenced within tuples, due to SQLAlchemy magic.
 
+        count_cache (cache backend): Cache for record counts, such as
+        ``webgrid.cache.LRUCache(ttl=60)``. Counts are keyed by the compiled count query and
+        its parameters, so grids sharing a backend only share identical counts. Default None.
+
+        count_estimator (object): Provides approximate counts in place of a count query, via
+        an ``estimate(grid, query)`` method returning a number or None. See
+        `PostgresCountEstimator`. Default None.
+
+        window_count (bool): Fetch the record count along with the page of records, via a
+        ``count(*) over ()`` column on the paged query, instead of running a separate count
+        query. A count query is still run when the page comes back empty. Requires a database
+        with window function support (e.g. PostgreSQL, SQLite 3.25+, MSSQL). Not used with
+        keyset paging, or for queries using DISTINCT or GROUP BY. Default False.
+
+        keyset_tiebreaker (expression): Unique, non-null SQLAlchemy expression (usually the
+        primary key) used to make ordering deterministic. Setting it enables keyset paging:
+        pages are addressed by an opaque cursor, and the query seeks past the boundary record
+        of the previous page instead of using an offset. Sort columns need an expression, and
+        should not contain nulls. Default None (offset paging).
+
+        timing_listeners (tuple): Callables receiving ``(grid, phase, seconds)`` each time a
+        phase recorded in `timings` completes. Instances get their own list, which may be
+        appended to. Default empty.
+
+        debug_timings (bool): Include `timings` in the JSON grid state, and as a comment at
+        the end of the HTML grid. Default False.
+
+        loader_options (tuple): SQLAlchemy loader option(s) applied to the records query, in
+        addition to those of the rendering columns. e.g. ``(selectinload(Person.emails),)``.
+        Default None.
+
+        render_target (str): Target being rendered, e.g. "html" or "csv". Renderers set this
+        while they run, so that only the loader options of columns rendering in that target
+        are applied. When None, options of all visible columns are applied. Default None.
+
+        prune_columns (bool): Select only the column expressions needed for `render_target`
+        in the records query: those of columns rendering in the target, and of columns
+        being filtered, sorted or subtotaled. Count queries always select every column.
+        Records loaded for one target are reloaded when rendering another, but are kept
+        as loaded outside of a render. Leave off if a column reads the value of another
+        column that may not render, or if the query is DISTINCT, since fewer columns can then
+        yield fewer rows. Default False.
+
     """
 
     __cls_cols__ = ()
@@ -1077,6 +1400,8 @@ class BaseGrid(six.with_metaclass(_DeclarativeMeta, object)):
     # Enables single-search feature, where one search value is applied to every supporting
     # filter at once
     enable_search = True
+    # Render only active filter rows, fetching others from the manager on demand
+    lazy_filters = False
 
     # Base selectable(s) to be used in the FROM clause of the query
     query_select_from = None
@@ -1092,6 +1417,27 @@ class BaseGrid(six.with_metaclass(_DeclarativeMeta, object)):
     # Parameter(s) tuple to be passed to order_by if sort options are not set on the grid
     # note: relationship attributes must be referenced within tuples, due to SQLAlchemy magic
     query_default_sort = None
+    # Fetch the record count with the paged records using a count(*) over () column
+    window_count = False
+    # Unique expression appended to the ordering to enable keyset paging
+    keyset_tiebreaker = None
+
+    # Cache backend for record counts (see webgrid.cache)
+    count_cache = None
+    # Object with an estimate(grid, query) method, to use approximate record counts
+    count_estimator = None
+
+    # Callables receiving (grid, phase, seconds) as each timed phase completes
+    timing_listeners = ()
+    # Include phase timings in JSON grid state and as an HTML comment
+    debug_timings = False
+
+    # Loader option(s) for the records query, e.g. (selectinload(Person.emails),)
+    loader_options = None
+    # Target being rendered, set by renderers. Selects the columns whose loader options apply
+    render_target = None
+    # Leave columns that will not render in render_target out of the records query
+    prune_columns = False
 
     # Will ask for confirmation before exporting more than this many records.
     # Set to None to disable this check
@@ -1117,9 +1463,14 @@ class BaseGrid(six.with_metaclass(_DeclarativeMeta, object)):
         self.user_warnings = []
         self.search_value = None
         self._record_count = None
+        self.record_count_is_approximate = False
         self._records = None
+        self._records_target = None
         self._page_totals = None
         self._grand_totals = None
+        self._query_columns = None
+        self.timings = {}
+        self.timing_listeners = list(self.timing_listeners)
 
         if self.allowed_export_targets is None:
             self.allowed_export_targets = {}
@@ -1138,9 +1489,13 @@ class BaseGrid(six.with_metaclass(_DeclarativeMeta, object)):
 
         self.per_page = per_page if per_page is not _None else self.__class__.per_page
         self.on_page = on_page if on_page is not _None else self.__class__.on_page
+        self.page_cursor = None
+        self._keyset_links = None
 
         self.columns = []
         self.key_column_map = {}
+        self._colstyler_map = None
+        self._colfilter_map = None
 
         self._init_columns()
         self.post_init()
@@ -1158,6 +1513,7 @@ class BaseGrid(six.with_metaclass(_DeclarativeMeta, object)):
             self.add_column(col)
 
     def add_column(self, column):
+        self._clear_column_dispatch()
         new_col = column.new_instance(self)
         self.columns.append(new_col)
         self.key_column_map[new_col.key] = new_col
@@ -1167,6 +1523,7 @@ class BaseGrid(six.with_metaclass(_DeclarativeMeta, object)):
             self.subtotal_cols[new_col.key] = (subtotal_function_map(new_col.has_subtotal), new_col)
 
     def drop_columns(self, column_keys):
+        self._clear_column_dispatch()
         self.columns = list(filter(lambda col: col.key not in tolist(column_keys), self.columns))
         for key in tolist(column_keys):
             self.key_column_map.pop(key, None)
@@ -1187,10 +1544,59 @@ class BaseGrid(six.with_metaclass(_DeclarativeMeta, object)):
             raise Exception(f'Keys not recognized on grid: {key_check}')
 
         self.columns = [self.key_column_map[key] for key in column_keys]
+        self._clear_column_dispatch()
+
+    def _clear_column_dispatch(self):
+        self._colstyler_map = None
+        self._colfilter_map = None
+
+    def _column_dispatch_map(self, handlers):
+        """Map column keys to the handlers declared for them with `col_styler`/`col_filter`."""
+        dispatch = {}
+        for handler, cname in handlers:
+            dispatch.setdefault(self.column(cname).key, []).append(handler)
+        return dispatch
+
+    def _column_stylers(self, column):
+        """Column stylers that apply to the given column, in declaration order."""
+        if self._colstyler_map is None:
+            self._colstyler_map = self._column_dispatch_map(self._colstylers)
+        return self._colstyler_map.get(column.key, ())
+
+    def _column_filters(self, column):
+        """Column filters that apply to the given column, in declaration order."""
+        if self._colfilter_map is None:
+            self._colfilter_map = self._column_dispatch_map(self._colfilters)
+        return self._colfilter_map.get(column.key, ())
 
     def before_query_hook(self):
         """Hook to give subclasses a chance to change things before executing the query."""
 
+    def record_timing(self, phase, seconds):
+        """Add the duration of a phase to `timings`, and pass it on to `timing_listeners`.
+
+        Phases recorded by the grid are "args", "apply_qs_args", "build_query", "count",
+        "data", "totals", and "render_<target>" (e.g. "render_html"). Queries include their
+        SQL compilation, which SQLAlchemy does on execution. Phases may nest: rendering
+        includes any queries it runs. A phase running more than once accumulates.
+
+        Args:
+            phase (str): Phase name.
+            seconds (float): Duration of this run of the phase.
+        """
+        self.timings[phase] = self.timings.get(phase, 0) + seconds
+        for listener in self.timing_listeners:
+            listener(self, phase, seconds)
+
+    @contextlib.contextmanager
+    def timed(self, phase):
+        """Context manager recording the duration of its block with `record_timing`."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_timing(phase, time.perf_counter() - t0)
+
     def build(self, grid_args=None):
         """Apply query args, run `before_query_hook`, and execute a record count query.
 
@@ -1211,7 +1617,8 @@ class BaseGrid(six.with_metaclass(_DeclarativeMeta, object)):
         If a 40* response is warranted, take that action here.
 
         Note, this method is not part of normal grid/render operation. It will only be
-        executed if run by a calling layer, such as the Flask WebGridAPI manager/extension.
+        executed if run by a calling layer, such as the Flask WebGridAPI manager/extension,
+        or the filter views of a WebGrid manager with ``enable_filter_routes`` on.
         """
 
     def column(self, ident):
@@ -1400,6 +1807,16 @@ class BaseGrid(six.with_metaclass(_DeclarativeMeta, object)):
         self.per_page = per_page
         self.on_page = on_page
 
+    def set_cursor(self, cursor):
+        """Set the keyset paging cursor for the main query. Resets record cache.
+
+        Args:
+            cursor (str): Opaque cursor, as produced by `cursor_next`/`cursor_prev`, or None
+            for the first page.
+        """
+        self.clear_record_cache(preserve_count=True)
+        self.page_cursor = cursor
+
     def clear_record_cache(self, preserve_count=False):
         """Reset records and record count cached from previous queries.
 
@@ -1409,7 +1826,11 @@ class BaseGrid(six.with_metaclass(_DeclarativeMeta, object)):
         """
         if not preserve_count:
             self._record_count = None
+            self.record_count_is_approximate = False
+            self._grand_totals = None
         self._records = None
+        self._page_totals = None
+        self._keyset_links = None
 
     @property
     def ident(self):
@@ -1447,16 +1868,73 @@ class BaseGrid(six.with_metaclass(_DeclarativeMeta, object)):
         Value is cached to prevent duplicate query execution. Methods changing
         the query (e.g. `set_filter`) will reset the cached value.
 
+        If a `count_estimator` supplies an estimate, that is used instead, and
+        `record_count_is_approximate` is set. Otherwise, the `count_cache` is consulted
+        before running a count query.
+
+        With `window_count`, the count is read from the page of records instead.
+
         Returns:
             int: Count of records.
         """
+        if self._record_count is None and self.uses_window_count:
+            # loading the records sets the count
+            self.records  # noqa: B018
         if self._record_count is None:
-            query = self.build_query(for_count=True)
+            self._load_record_count()
+        return self._record_count
+
+    def _load_record_count(self):
+        query = self.build_query(for_count=True)
+        if self.count_estimator is not None:
+            estimate = self.count_estimator.estimate(self, query)
+            if estimate is not None:
+                self.record_count_is_approximate = True
+                self._record_count = estimate
+                return
+
+        cache_key = None
+        if self.count_cache is not None:
+            cache_key = self.count_cache_key(query)
+            self._record_count = self.count_cache.get(cache_key)
+            if self._record_count is not None:
+                log.debug('Count loaded from cache')
+                return
+
+        if self._grand_totals is None and self._grand_totals_on:
+            # the totals query counts records too, so one query serves both
+            self.grand_totals  # noqa: B018
+        else:
             t0 = time.perf_counter()
             self._record_count = query.count()
             t1 = time.perf_counter()
             log.debug(f'Count query ran in {t1 - t0} seconds')
-        return self._record_count
+            self.record_timing('count', t1 - t0)
+        if cache_key is not None:
+            self.count_cache.set(cache_key, self._record_count)
+
+    def count_cache_key(self, query):
+        """Key for storing a count query's result in `count_cache`.
+
+        Built from the database URL, the compiled SQL, and its bound parameters. The database
+        is the one the query's session binds it to, which may differ from the manager's
+        default engine.
+
+        Args:
+            query (Query): Count query, from `build_query(for_count=True)`.
+
+        Returns:
+            str: Cache key.
+        """
+        statement = query.statement
+        # engines and connections both provide the engine they run on
+        engine = query.session.get_bind(clause=statement).engine
+        compiled = statement.compile(dialect=engine.dialect)
+        return make_key(
+            engine.url.render_as_string(hide_password=True),
+            str(compiled),
+            sorted(compiled.params.items()),
+        )
 
     @property
     def records(self):
@@ -1468,27 +1946,139 @@ class BaseGrid(six.with_metaclass(_DeclarativeMeta, object)):
         Returns:
             list(Any): Result records from SQLAlchemy query.
         """
+        if self._records_pruned_for_other_target():
+            self._records = None
         if self._records is None:
             query = self.build_query()
             t0 = time.perf_counter()
-            self._records = query.all()
+            records = query.all()
             t1 = time.perf_counter()
             log.debug(f'Data query ran in {t1 - t0} seconds')
+            self.record_timing('data', t1 - t0)
+            if self.uses_keyset_paging:
+                records = self._keyset_trim_records(records)
+            elif self.uses_window_count:
+                records = self._window_count_records(records)
+            self._records = records
+            self._records_target = self.query_target
         return self._records
 
+    def _records_pruned_for_other_target(self):
+        """Indicates loaded records lack columns pruned for a target other than the current one.
+
+        Outside of a render (no `render_target`), records are kept as loaded.
+        """
+        target = self.query_target
+        return (
+            self._records is not None
+            and target is not None
+            and self._records_target not in (None, target)
+        )
+
+    @property
+    def uses_window_count(self):
+        """Indicates whether the record count is fetched along with the paged records."""
+        return (
+            self.window_count
+            and bool(self.pager_on and self.per_page)
+            and not self.uses_keyset_paging
+            and self._query_allows_window_count()
+        )
+
+    def _query_allows_window_count(self):
+        """Indicates whether the query can carry the window count column.
+
+        With DISTINCT or GROUP BY, a window count would be taken over rows before they are
+        combined, and the extra column would keep duplicate rows apart.
+        """
+        statement = self.build_query(for_count=True).statement
+        return not (statement._distinct or statement._group_by_clauses)
+
+    def _window_count_records(self, records):
+        """Take the record count from the window column of the paged records.
+
+        An empty page carries no count. On the first page, that simply means there are no
+        records. Past the first page, run the count query, and move back to the last page if
+        the requested one is out of range (`_apply_paging` leaves that to us in this mode).
+        """
+        if records:
+            if self._record_count is None:
+                self._record_count = records[0]._mapping['_wg_record_count']
+            return records
+
+        if not self.on_page or self.on_page <= 1:
+            if self._record_count is None:
+                self._record_count = 0
+            return records
+
+        if self._record_count is None:
+            self._load_record_count()
+        page_count = self.page_count
+        if self.on_page <= page_count:
+            return records
+
+        self.on_page = page_count
+        t0 = time.perf_counter()
+        records = self.build_query().all()
+        t1 = time.perf_counter()
+        log.debug(f'Data query ran in {t1 - t0} seconds')
+        self.record_timing('data', t1 - t0)
+        return records
+
+    def iter_records(self, batch_size=1000):
+        """Iterate records for current filtered/sorted/paged query without caching them.
+
+        Rows are fetched from the database in batches via ``yield_per``, which also requests
+        a server-side cursor (``stream_results``) from drivers that support one. Memory use
+        is therefore bounded by the batch size rather than the size of the result. If records
+        have already been loaded (or set via ``set_records``), those are used instead.
+
+        Args:
+            batch_size (int, optional): Number of rows to fetch per round-trip. Default 1000.
+
+        Yields:
+            Any: Result records from SQLAlchemy query.
+        """
+        if self._records is not None and not self._records_pruned_for_other_target():
+            yield from self._records
+            return
+
+        query = self.build_query()
+        rows = iter(query.yield_per(batch_size))
+        # time only the query and fetches, not the consumer's work between records
+        elapsed = 0
+        while True:
+            t0 = time.perf_counter()
+            try:
+                record = next(rows)
+            except StopIteration:
+                elapsed += time.perf_counter() - t0
+                break
+            elapsed += time.perf_counter() - t0
+            yield record
+        log.debug(f'Data query streamed in {elapsed} seconds')
+        self.record_timing('data', elapsed)
+
     def _totals_col_results(self, page_totals_only):
         """Executes query to retrieve subtotals for the filtered query.
 
         A single result record is returned, which will have fields corresponding to all of the
         grid columns (same as a record returned in the general records query).
 
+        Grand totals also carry the record count, in the ``__record_count__`` field.
+
         Args:
             page_totals_only (bool): Tells query builder to use only current page records.
 
         Returns:
             Any: Single result record.
         """
-        SUB = self.build_query(for_count=(not page_totals_only)).subquery()
+        query = self.build_query(for_count=(not page_totals_only))
+        query_columns = self.query_columns(for_count=(not page_totals_only))
+        if page_totals_only and self.uses_keyset_paging:
+            # leave out the look-ahead record requested by keyset paging
+            query = query.limit(self.per_page)
+        SUB = query.subquery()
 
         cols = []
         # Not all columns can be totaled. But, we should put in null placeholders
@@ -1496,7 +2086,7 @@ class BaseGrid(six.with_metaclass(_DeclarativeMeta, object)):
         # can be applied.
         # This will apply to any columns with an expr. Other subtotaled columns can be
         # tacked onto the end - these will not be indexed and must be referred to by name
-        for colobj in [col for col in self.columns if col.expr is not None] + [
+        for colobj in query_columns + [
             coltuple[1] for coltuple in self.subtotal_cols.values() if coltuple[1].expr is None
         ]:
             colname = colobj._query_key or colobj.key
@@ -1526,6 +2116,8 @@ class BaseGrid(six.with_metaclass(_DeclarativeMeta, object)):
                 labeled_aggregate_col = sa_aggregate_func.label(colname)
             cols.append(labeled_aggregate_col)
         cols.append(sa.literal(1).label('__is_total__'))
+        if not page_totals_only:
+            cols.append(sa.func.count().label('__record_count__'))
 
         t0 = time.perf_counter()
         query = self.manager.sa_query(*cols)
@@ -1534,6 +2126,7 @@ class BaseGrid(six.with_metaclass(_DeclarativeMeta, object)):
         result = query.first()
         t1 = time.perf_counter()
         log.debug(f'Totals query ran in {t1 - t0} seconds')
+        self.record_timing('totals', t1 - t0)
 
         return result
 
@@ -1547,13 +2140,32 @@ class BaseGrid(six.with_metaclass(_DeclarativeMeta, object)):
         A single result record is returned, which will have fields corresponding to all of the
         grid columns (same as a record returned in the general records query).
 
+        When every subtotal is a sum, avg, or count, totals are computed from the loaded
+        `records` instead of running another query.
+
         Returns:
             Any: Single result record, or None if page totals are not configured.
         """
         if self._page_totals is None and self.subtotals in ('page', 'all') and self.subtotal_cols:
-            self._page_totals = self._totals_col_results(page_totals_only=True)
+            if all(func in _python_totals for func, _ in self.subtotal_cols.values()):
+                self._page_totals = self._records_totals(self.records)
+            else:
+                self._page_totals = self._totals_col_results(page_totals_only=True)
         return self._page_totals
 
+    def _records_totals(self, records):
+        """Aggregate subtotal columns over the given records, in the shape of a totals row."""
+        totals = TotalsRecord(__is_total__=1)
+        for col in self.columns:
+            if col.expr is not None and col.key not in self.subtotal_cols:
+                totals[col._query_key or col.key] = None
+        for func, col in self.subtotal_cols.values():
+            value = _python_totals[func]([col.extract_data(record) for record in records])
+            totals[col.key] = value
+            if col._query_key:
+                totals[col._query_key] = value
+        return totals
+
     @property
     def grand_totals(self):
         """Executes query to retrieve subtotals for the filtered query.
@@ -1564,13 +2176,200 @@ class BaseGrid(six.with_metaclass(_DeclarativeMeta, object)):
         A single result record is returned, which will have fields corresponding to all of the
         grid columns (same as a record returned in the general records query).
 
+        The same query counts the records, so `record_count` does not need its own query if
+        grand totals are loaded first.
+
         Returns:
             Any: Single result record, or None if grand totals are not configured.
         """
-        if self._grand_totals is None and self.subtotals in ('grand', 'all') and self.subtotal_cols:
+        if self._grand_totals is None and self._grand_totals_on:
             self._grand_totals = self._totals_col_results(page_totals_only=False)
+            if self._record_count is None:
+                self._record_count = self._grand_totals._mapping['__record_count__']
         return self._grand_totals
 
+    @property
+    def _grand_totals_on(self):
+        return self.subtotals in ('grand', 'all') and bool(self.subtotal_cols)
+
+    @property
+    def has_previous_page(self):
+        """Indicates whether a page precedes the current one."""
+        if self.uses_keyset_paging:
+            return self._keyset_link('prev') is not None
+        return self.on_page > 1
+
+    @property
+    def has_next_page(self):
+        """Indicates whether a page follows the current one."""
+        if self.uses_keyset_paging:
+            return self._keyset_link('next') is not None
+        return self.on_page < self.page_count
+
+    @property
+    def cursor_prev(self):
+        """Keyset paging cursor for the previous page, or None if not applicable."""
+        return self._keyset_link('prev') if self.uses_keyset_paging else None
+
+    @property
+    def cursor_next(self):
+        """Keyset paging cursor for the next page, or None if not applicable."""
+        return self._keyset_link('next') if self.uses_keyset_paging else None
+
+    @property
+    def cursor_last(self):
+        """Keyset paging cursor for the last page, or None if not applicable."""
+        if not self.uses_keyset_paging:
+            return None
+        return encode_cursor('last', self._keyset_signature())
+
+    @property
+    def uses_keyset_paging(self):
+        """Indicates whether the paged query seeks by cursor rather than by offset.
+
+        Requires `keyset_tiebreaker` to be set, paging to be active, and every sort column to
+        have an expression a seek predicate can be built from.
+        """
+        return (
+            self._keyset_tiebreaker is not None
+            and bool(self.pager_on and self.per_page)
+            and self._keyset_order() is not None
+        )
+
+    @property
+    def _keyset_tiebreaker(self):
+        # ORM attributes are descriptors, so read the class attribute rather than going
+        # through the instance
+        tiebreaker = self.__dict__.get('keyset_tiebreaker', type(self).keyset_tiebreaker)
+        if isinstance(tiebreaker, list | tuple):
+            return tiebreaker[0]
+        return tiebreaker
+
+    def _keyset_order(self):
+        """Ordering for keyset paging, as a list of (expression, flag_desc) tuples.
+
+        Grid sorts are used if present, otherwise `query_default_sort`. The tiebreaker is
+        appended unless already included. Returns None if a sort column has no expression.
+        """
+        order = []
+        if self.order_by:
+            seen = set()
+            for key, flag_desc in self.order_by:
+                col = self.key_column_map.get(key)
+                if col is None or col.key in seen:
+                    continue
+                if col.expr is None:
+                    return None
+                seen.add(col.key)
+                order.append((col.expr, flag_desc))
+        else:
+            for term in tolist(self.query_default_sort) or ():
+                modifier = getattr(term, 'modifier', None)
+                if modifier in (sa_operators.asc_op, sa_operators.desc_op):
+                    order.append((term.element, modifier is sa_operators.desc_op))
+                else:
+                    order.append((term, False))
+
+        tiebreaker = self._keyset_tiebreaker
+        if not any(expr is tiebreaker for expr, _ in order):
+            order.append((tiebreaker, False))
+        return order
+
+    def _keyset_signature(self):
+        """Sort keys a cursor is tied to. Cursors from a different sort are ignored."""
+        return [('-' if flag_desc else '') + key for key, flag_desc in self.order_by]
+
+    def _keyset_cursor(self):
+        """Decode the current cursor into (direction, values).
+
+        Returns (None, None) for the first page, including when the cursor was produced for a
+        different sort.
+        """
+        if not self.page_cursor:
+            return None, None
+        try:
+            direction, signature, values = decode_cursor(self.page_cursor)
+        except ValueError:
+            return None, None
+        if signature != self._keyset_signature():
+            return None, None
+        if direction == 'last':
+            return direction, None
+        if direction not in ('next', 'prev') or len(values) != len(self._keyset_order()):
+            return None, None
+        return direction, values
+
+    def _keyset_seek_clause(self, order, values, reverse):
+        """Build the seek predicate selecting records beyond the given ordering values."""
+        clauses = []
+        for idx, (expr, flag_desc) in enumerate(order):
+            value = values[idx]
+            past = expr > value if flag_desc == reverse else expr < value
+            equals = [order[i][0] == values[i] for i in range(idx)]
+            clauses.append(sa.and_(*equals, past))
+        return sa.or_(*clauses)
+
+    def _keyset_query_paging(self, query):
+        """Apply keyset ordering, seek predicate, and limit to the query.
+
+        One extra record is requested, so that the presence of a following page is known
+        without a separate query. Going backward, the ordering is reversed, and
+        `_keyset_trim_records` puts the records back in order.
+        """
+        order = self._keyset_order()
+        direction, values = self._keyset_cursor()
+        reverse = direction in ('prev', 'last')
+
+        query = query.order_by(None).order_by(
+            *[expr.desc() if flag_desc != reverse else expr.asc() for expr, flag_desc in order],
+        )
+        if values is not None:
+            query = query.filter(self._keyset_seek_clause(order, values, reverse))
+        query = query.add_columns(
+            *[expr.label(f'_wg_keyset_{idx}') for idx, (expr, _) in enumerate(order)],
+        )
+        log.debug(f'Keyset page {direction or "first"}; {self.per_page} per page')
+        return query.limit(self.per_page + 1)
+
+    def _keyset_link(self, direction):
+        # cursors are derived from the boundary records, so make sure those are loaded
+        if self.records is not None and self._keyset_links is not None:
+            return self._keyset_links[direction]
+        return None
+
+    def _keyset_trim_records(self, records):
+        """Drop the look-ahead record, restore ordering, and compute cursors for neighbors."""
+        direction, _ = self._keyset_cursor()
+        has_more = len(records) > self.per_page
+        records = records[: self.per_page]
+        if direction in ('prev', 'last'):
+            records.reverse()
+
+        has_prev = has_more if direction in ('prev', 'last') else direction is not None
+        has_next = direction == 'prev' or (direction in (None, 'next') and has_more)
+
+        signature = self._keyset_signature()
+        num_terms = len(self._keyset_order())
+
+        def boundary_values(record):
+            return [record._mapping[f'_wg_keyset_{idx}'] for idx in range(num_terms)]
+
+        self._keyset_links = {'prev': None, 'next': None}
+        if has_prev:
+            self._keyset_links['prev'] = (
+                encode_cursor('prev', signature, boundary_values(records[0]))
+                if records
+                # seeking past the end leaves nothing to anchor on, go back to the beginning
+                else encode_cursor('first', signature)
+            )
+        if has_next and records:
+            self._keyset_links['next'] = encode_cursor(
+                'next',
+                signature,
+                boundary_values(records[-1]),
+            )
+        return records
+
     @property
     def page_count(self):
         """Page count, or 1 if no `per_page` is set."""
@@ -1589,34 +2388,46 @@ class BaseGrid(six.with_metaclass(_DeclarativeMeta, object)):
         - `query_base`
         - `query_prep`
         - `query_filters`
+        - `query_loader_options`
         - `query_sort`
         - `query_paging`
 
+        The current `render_target` selects the columns to query when `prune_columns` is on.
+
         Args:
-            for_count (bool, optional): Excludes sort/page from query. Defaults to False.
+            for_count (bool, optional): Excludes sort/page from query, and selects every column.
+            Defaults to False.
 
         Returns:
             Query: SQLAlchemy query object
         """
-        log.debug(str(self))
+        with self.timed('build_query'):
+            log.debug(str(self))
 
-        has_filters = self.has_filters
-        query = self.query_base(self.has_sort, has_filters)
-        query = self.query_prep(query, self.has_sort or for_count, has_filters)
+            has_filters = self.has_filters
+            self._query_columns = self.query_columns(for_count=for_count)
+            try:
+                query = self.query_base(self.has_sort, has_filters)
+            finally:
+                self._query_columns = None
+            query = self.query_prep(query, self.has_sort or for_count, has_filters)
 
-        if has_filters:
-            query = self.query_filters(query)
-        else:
-            log.debug('No filters')
+            if has_filters:
+                query = self.query_filters(query)
+            else:
+                log.debug('No filters')
 
-        if for_count:
-            return query
+            if for_count:
+                return query
 
-        query = self.query_sort(query)
-        if self.pager_on:
-            query = self.query_paging(query)
+            query = self.query_loader_options(query)
+            query = self.query_sort(query)
+            if self.pager_on:
+                query = self.query_paging(query)
+                if self.uses_window_count:
+                    query = query.add_columns(sa.func.count().over().label('_wg_record_count'))
 
-        return query
+            return query
 
     def set_records(self, records):
         """Assign a set of records to the grid's cache.
@@ -1630,13 +2441,14 @@ class BaseGrid(six.with_metaclass(_DeclarativeMeta, object)):
         """
         self._record_count = len(records)
         self._records = records
+        self._records_target = None
 
     def query_base(self, has_sort, has_filters):
         """Construct a query from grid columns, using grid's join/filter/sort attributes.
 
-        Used by `build_query` to establish the basic query from column spec. If query is to be
-        modified, it is recommended to do so in `query_prep` if possible, rather than overriding
-        `query_base`.
+        Used by `build_query` to establish the basic query from column spec, selecting the
+        expressions of `query_columns`. If query is to be modified, it is recommended to do so
+        in `query_prep` if possible, rather than overriding `query_base`.
 
         Args:
             has_sort (bool): Tells method not to order query, since the grid has sort params.
@@ -1645,10 +2457,14 @@ class BaseGrid(six.with_metaclass(_DeclarativeMeta, object)):
         Returns:
             Query: SQLAlchemy query
         """
-        for idx, column in enumerate(filter(lambda col: col.expr is not None, self.columns)):
+        query_columns = self._query_columns
+        if query_columns is None:
+            query_columns = self.query_columns()
+        for column in self.columns:
+            column._query_idx = None
+        for idx, column in enumerate(query_columns):
             column._query_idx = idx
-        cols = [col.expr for col in self.columns if col.expr is not None]
-        query = self.manager.sa_query(*cols)
+        query = self.manager.sa_query(*[col.expr for col in query_columns])
 
         if self.query_select_from is not None:
             query = query.select_from(*tolist(self.query_select_from))
@@ -1667,6 +2483,43 @@ class BaseGrid(six.with_metaclass(_DeclarativeMeta, object)):
 
         return query
 
+    @property
+    def query_target(self):
+        """Target the records query is pruned for, or None if it selects every column."""
+        return self.render_target if self.prune_columns else None
+
+    def query_columns(self, for_count=False):
+        """Columns with an expression to select in the grid query, in query order.
+
+        With `prune_columns` on and a `render_target` set, columns that will not render in
+        the target are left out, unless they are filtered, sorted or subtotaled.
+
+        Args:
+            for_count (bool, optional): Columns for a count query, which are never pruned.
+            Defaults to False.
+
+        Returns:
+            list(Column): Columns whose expressions `query_base` selects.
+        """
+        columns = [col for col in self.columns if col.expr is not None]
+        target = self.query_target
+        if for_count or target is None:
+            return columns
+
+        keep = {col.key for col in self.iter_columns(target)}
+        keep.update(self.subtotal_cols)
+        keep.update(
+            col.key
+            for col in self.filtered_cols.values()
+            if col.filter.is_active or self.search_value is not None
+        )
+        keep.update(
+            self.key_column_map[key].key
+            for key, _flag_desc in self.order_by
+            if key in self.key_column_map
+        )
+        return [col for col in columns if col.key in keep]
+
     def query_prep(self, query, has_sort, has_filters):
         """Modify the query that was constructed in `query_base`.
 
@@ -1685,6 +2538,34 @@ class BaseGrid(six.with_metaclass(_DeclarativeMeta, object)):
         """
         return query
 
+    def query_loader_options(self, query):
+        """Modify the query by applying loader options from the grid and rendering columns.
+
+        Only columns rendering in `render_target` contribute options (all visible columns if
+        no target is set), so relationships are eagerly loaded only when they will be read.
+        Not applied to count queries.
+
+        Called by `build_query`.
+
+        Args:
+            query (Query): SQLAlchemy query object.
+
+        Returns:
+            Query: SQLAlchemy query
+        """
+        if self.render_target is None:
+            columns = (col for col in self.columns if col.visible)
+        else:
+            columns = self.iter_columns(self.render_target)
+
+        options = list(tolist(self.loader_options) or ())
+        for col in columns:
+            options.extend(tolist(col.loader_options) or ())
+
+        if options:
+            query = query.options(*options)
+        return query
+
     def query_filters(self, query):
         """Modify the query by applying filter terms.
 
@@ -1745,6 +2626,8 @@ class BaseGrid(six.with_metaclass(_DeclarativeMeta, object)):
         Returns:
             Query: SQLAlchemy query
         """
+        if self.uses_keyset_paging:
+            return self._keyset_query_paging(query)
         if self.on_page and self.per_page:
             offset = (self.on_page - 1) * self.per_page
             query = query.offset(offset).limit(self.per_page)
@@ -1822,7 +2705,15 @@ class BaseGrid(six.with_metaclass(_DeclarativeMeta, object)):
             add_user_warnings (bool, optional): Add flash messages for warnings. Defaults to True.
             grid_args (MultiDict, optional): Supply args directly to the grid.
         """
-        args = grid_args if grid_args is not None else self.manager.get_args(self)
+        with self.timed('apply_qs_args'):
+            self._apply_qs_args(add_user_warnings, grid_args)
+
+    def _apply_qs_args(self, add_user_warnings, grid_args):
+        if grid_args is not None:
+            args = grid_args
+        else:
+            with self.timed('args'):
+                args = self.manager.get_args(self)
 
         if self.session_on:
             self.session_key = args.get('session_key') or self.session_key
@@ -1911,10 +2802,16 @@ class BaseGrid(six.with_metaclass(_DeclarativeMeta, object)):
             on_page = self.apply_validator(validators.IntValidator, args[op_qsk], op_qsk)
             if on_page is None or on_page < 1:
                 on_page = 1
-            if on_page > self.page_count:
+            # with window counts, the page is clamped once records are loaded, to avoid
+            # running the count query up front
+            if not self.uses_window_count and on_page > self.page_count:
                 on_page = self.page_count
             self.on_page = on_page
 
+        cursor_qsk = 'cursor'
+        if cursor_qsk in args and self._keyset_tiebreaker is not None:
+            self.set_cursor(args[cursor_qsk] or None)
+
     def _apply_sorting(self, args):
         """Turn request/session args into sort settings.
 
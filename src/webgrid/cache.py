@@ -0,0 +1,121 @@
+"""Cache backends for values grids compute repeatedly across requests.
+
+Backends share a small interface: ``get`` returns None for missing or expired keys, ``set``
+stores a value, ``delete`` drops one key, and ``clear`` drops everything. Keys are strings,
+see `make_key` for deriving one from arbitrary parts.
+"""
+
+from collections import OrderedDict
+import contextlib
+import hashlib
+import threading
+import time
+
+
+def make_key(*parts):
+    """Hash arbitrary parts into a compact string key suitable for any backend."""
+    return hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+
+
+class LRUCache:
+    """In-process cache with a size limit and optional time-to-live.
+
+    Safe to share between threads. Least recently used entries are evicted when the cache
+    is full.
+
+    Args:
+        maxsize (int, optional): Maximum number of entries. Default 1024.
+        ttl (float, optional): Seconds an entry stays valid. Default None (no expiry).
+    """
+
+    def __init__(self, maxsize=1024, ttl=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        expires_at = None if self.ttl is None else time.monotonic() + self.ttl
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def keys(self):
+        """Return a list of the keys held, including any expired but not yet dropped."""
+        with self._lock:
+            return list(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+
+class MappingCache:
+    """Cache on top of a dict-like store shared between processes.
+
+    The store only needs item access (``__getitem__``, ``__setitem__``, ``__delitem__``), so
+    mapping interfaces to Redis, memcached, a database table, etc. all work. Values are kept
+    along with their expiry time, and must be storable by the backing store.
+
+    Args:
+        store (MutableMapping): Backing store.
+        ttl (float, optional): Seconds an entry stays valid. Default None (no expiry).
+        prefix (str, optional): Prepended to keys, to share a store with other data.
+        Default "webgrid:".
+        max_tracked_keys (int, optional): Most keys remembered for `clear`, the least
+        recently set being forgotten first. Default 10000.
+    """
+
+    def __init__(self, store, ttl=None, prefix='webgrid:', max_tracked_keys=10000):
+        self.store = store
+        self.ttl = ttl
+        self.prefix = prefix
+        self._keys = LRUCache(maxsize=max_tracked_keys)
+
+    def get(self, key):
+        try:
+            expires_at, value = self.store[self.prefix + key]
+        except KeyError:
+            return None
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            return None
+        return value
+
+    def set(self, key, value):
+        expires_at = None if self.ttl is None else time.time() + self.ttl
+        self.store[self.prefix + key] = (expires_at, value)
+        self._keys.set(key, True)
+
+    def delete(self, key):
+        with contextlib.suppress(KeyError):
+            del self.store[self.prefix + key]
+        self._keys.delete(key)
+
+    def clear(self):
+        """Drop the most recently set entries, up to `max_tracked_keys`, set through this
+        instance. Other entries, including other writers', expire by TTL."""
+        tracked = self._keys.keys()
+        for key in tracked:
+            self.delete(key)
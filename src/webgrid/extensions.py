@@ -3,6 +3,7 @@ import datetime
 from decimal import Decimal
 import json
 from pathlib import Path
+import random
 import re
 from typing import Any
 import warnings
@@ -12,6 +13,7 @@ import jinja2 as jinja
 from werkzeug.datastructures import MultiDict
 
 from . import types
+from .session_store import WebSessionStore
 
 
 MORPHI_PACKAGE_NAME = 'webgrid'
@@ -180,6 +182,8 @@ class WebSessionArgsLoader(ArgsLoader):
 
     In the reset case, ignore most args, and return only the reset flag and session key (if any).
     And clear the session store for the given grid.
+
+    Grid sessions are kept in the manager's ``session_store``.
     """
 
     _session_exclude_keys = (
@@ -212,7 +216,7 @@ class WebSessionArgsLoader(ArgsLoader):
         Returns:
             bool: True if at least one page arg is present.
         """
-        regex = re.compile('(onpage|perpage)')
+        regex = re.compile('(onpage|perpage|cursor)')
         return any(regex.match(a) for a in args)
 
     def args_have_sort(self, args):
@@ -233,15 +237,13 @@ class WebSessionArgsLoader(ArgsLoader):
             )
         ]
 
-    def remove_grid_session(self, session_key):
-        # Remove a grid session from the cookie entirely
-        if 'dgsessions' not in self.manager.web_session():
-            return
-        if session_key not in self.manager.web_session()['dgsessions']:
-            return
+    @property
+    def session_store(self):
+        return self.manager.session_store
 
-        self.manager.web_session()['dgsessions'].pop(session_key)
-        self.manager.persist_web_session()
+    def remove_grid_session(self, session_key):
+        # Remove a grid session from the store entirely
+        self.session_store.delete(self.manager, session_key)
 
     def apply_session_overrides(self, session_args, previous_args):
         """Update session args as needed from the incoming request.
@@ -278,6 +280,7 @@ class WebSessionArgsLoader(ArgsLoader):
             if self.args_have_page(previous_args):
                 session_args['onpage'] = previous_args.get('onpage')
                 session_args['perpage'] = previous_args.get('perpage')
+                session_args['cursor'] = previous_args.get('cursor')
             # Override sorting if it exists in the query
             for sort_arg in self.args_have_sort(previous_args):
                 session_args[sort_arg] = previous_args.get(sort_arg)
@@ -294,22 +297,68 @@ class WebSessionArgsLoader(ArgsLoader):
 
         Configurable at the manager level, with the session_max_hours attribute. If
         None, cleanup is disabled.
+
+        The web session records when the oldest grid session was saved, so stored sessions are
+        only gone through once one of them may have expired. The share of requests checking
+        at all is set by the manager's session_cleanup_rate.
         """
         if self.manager.session_max_hours is None:
             return
+        rate = self.manager.session_cleanup_rate
+        if rate < 1 and random.random() >= rate:
+            return
 
-        cutoff = arrow.utcnow().shift(hours=-self.manager.session_max_hours)
-        modified = False
-
+        now = arrow.utcnow()
+        cutoff = now.shift(hours=-self.manager.session_max_hours)
         web_session = self.manager.web_session()
-        for session_key in tuple(web_session.get('dgsessions', {}).keys()):
-            grid_session = self.get_session_store(None, {'session_key': session_key})
-            if arrow.get(grid_session.get('session_timestamp', cutoff)) < cutoff:
-                modified = True
-                web_session['dgsessions'].pop(session_key, None)
+        oldest = web_session.get('dgsessions_oldest')
+        if oldest is not None and oldest >= cutoff.int_timestamp:
+            return
 
-        if modified:
-            self.manager.persist_web_session()
+        oldest = now.int_timestamp
+        for session_key in self.session_store.keys(self.manager):
+            saved_at = self.session_saved_at(self.session_store.get(self.manager, session_key))
+            if saved_at is None:
+                # stored before timestamps were kept alongside the args
+                grid_session = self.get_session_store(None, {'session_key': session_key})
+                if 'session_timestamp' not in grid_session:
+                    continue
+                saved_at = arrow.get(grid_session['session_timestamp']).int_timestamp
+            if saved_at < cutoff.int_timestamp:
+                self.session_store.delete(self.manager, session_key)
+            else:
+                oldest = min(oldest, saved_at)
+        web_session['dgsessions_oldest'] = oldest
+        self.manager.persist_web_session()
+
+    def session_saved_at(self, stored):
+        """Return the timestamp a stored grid session was saved at, without decoding its args.
+
+        Args:
+            stored (str): Value from the session store.
+
+        Returns:
+            int: Seconds since the epoch, or None if the value has no timestamp.
+        """
+        if isinstance(stored, str) and not stored.startswith('['):
+            timestamp, sep, _args_json = stored.partition('|')
+            if sep:
+                return int(timestamp)
+        return None
+
+    def get_unexpired(self, session_key):
+        """Return the value stored under `session_key`, or None if missing or expired.
+
+        Expired values are ignored even when cleanup has not yet removed them, as happens when
+        the manager's session_cleanup_rate is below 1.
+        """
+        stored = self.session_store.get(self.manager, session_key)
+        saved_at = self.session_saved_at(stored)
+        if saved_at is not None and self.manager.session_max_hours is not None:
+            cutoff = arrow.utcnow().shift(hours=-self.manager.session_max_hours)
+            if saved_at < cutoff.int_timestamp:
+                return None
+        return stored
 
     def get_session_store(self, grid, args):
         """Load args from session by session_key, and return as MultiDict.
@@ -325,17 +374,15 @@ class WebSessionArgsLoader(ArgsLoader):
         #   look it up in the session and use the saved args
         #   (if they have been saved under that key). If not,
         #   look up the class name for a default arg store.
-        web_session = self.manager.web_session()
-        if 'dgsessions' not in web_session:
-            return args
-        dgsessions = web_session['dgsessions']
-
         # session is stored as a JSON-serialized list of tuples, which we can turn into MultiDict
-        session_key = grid.default_session_key if grid else None
         grid_session_key = args.get('session_key', None)
-        if grid_session_key and dgsessions.get(grid_session_key):
-            session_key = grid_session_key
-        stored_args_json = dgsessions.get(session_key, '[]')
+        stored_args_json = self.get_unexpired(grid_session_key) if grid_session_key else None
+        if not stored_args_json and grid:
+            stored_args_json = self.get_unexpired(grid.default_session_key)
+        if not stored_args_json:
+            return args
+        if self.session_saved_at(stored_args_json) is not None:
+            stored_args_json = stored_args_json.partition('|')[2]
         if isinstance(stored_args_json, MultiDict):
             stored_args_json = json.dumps(list(stored_args_json.items(multi=True)))
         elif isinstance(stored_args_json, dict):
@@ -352,10 +399,7 @@ class WebSessionArgsLoader(ArgsLoader):
         """
         # save the args in the session under the session key
         #   and also as the default args for this grid
-        web_session = self.manager.web_session()
-        if 'dgsessions' not in web_session:
-            web_session['dgsessions'] = {}
-        dgsessions = web_session['dgsessions']
+        store = self.session_store
         grid_session_key = args.get('session_key') or grid.session_key
         # work with a copy here
         args = MultiDict(args)
@@ -367,29 +411,31 @@ class WebSessionArgsLoader(ArgsLoader):
 
         # if we're only storing the bare minimal case, remove the store, including the default
         if not args:
-            dgsessions.pop(grid_session_key, None)
-            dgsessions.pop(grid.default_session_key, None)
-            return self.manager.persist_web_session()
+            store.delete(self.manager, grid_session_key)
+            store.delete(self.manager, grid.default_session_key)
+            return None
 
+        now = arrow.utcnow()
         args['datagrid'] = grid.default_session_key
-        args['session_timestamp'] = existing_default_store['session_timestamp'] = (
-            arrow.utcnow().isoformat()
-        )
+        args['session_timestamp'] = existing_default_store['session_timestamp'] = now.isoformat()
 
         # if we're pulling a grid matching the default session, but with a different key,
         # no need to store the sepearate session
         if args == existing_default_store:
-            dgsessions.pop(grid_session_key, None)
-            return self.manager.persist_web_session()
+            store.delete(self.manager, grid_session_key)
+            return None
 
-        # serialize the args so we can enforce the correct MultiDict type on the other side
-        args_json = json.dumps(list(args.items(multi=True)))
+        # serialize the args so we can enforce the correct MultiDict type on the other side,
+        # prefixed with the timestamp for cleanup_expired_sessions to read cheaply
+        args_json = f'{now.int_timestamp}|' + json.dumps(list(args.items(multi=True)))
         # save in store under grid default and session key
-        dgsessions[grid_session_key] = args_json
-        dgsessions[grid.default_session_key] = args_json
+        store.set(self.manager, grid_session_key, args_json)
+        store.set(self.manager, grid.default_session_key, args_json)
 
-        # some frameworks/sessions need these changes manually persisted
-        self.manager.persist_web_session()
+        web_session = self.manager.web_session()
+        if web_session.get('dgsessions_oldest') is None:
+            web_session['dgsessions_oldest'] = now.int_timestamp
+            self.manager.persist_web_session()
 
     def get_args(self, grid, previous_args):
         """Retrieve args from session and override as appropriate.
@@ -464,6 +510,13 @@ class FrameworkManager(ABC):
         session_max_hours (int): Hours to hold a given grid session in storage. Set to None to
         disable. Default 12.
 
+        session_store (GridSessionStore): Storage for grid sessions. Default is a
+        `webgrid.session_store.WebSessionStore`, keeping them in the web session.
+
+        session_cleanup_rate (float): Share of requests checking for expired grid sessions,
+        from 0 to 1. The check itself is cheap until a session may have expired. Set to 0 to
+        leave expiry to a background job, such as a store's ``purge``. Default 1.
+
     """
 
     jinja_loader = lambda self: jinja.PackageLoader('webgrid', 'templates')
@@ -472,8 +525,18 @@ class FrameworkManager(ABC):
         WebSessionArgsLoader,
     )
     session_max_hours = 12
-
-    def __init__(self, db=None, jinja_loader=None, args_loaders=None, session_max_hours=None):
+    session_store = None
+    session_cleanup_rate = 1
+
+    def __init__(
+        self,
+        db=None,
+        jinja_loader=None,
+        args_loaders=None,
+        session_max_hours=None,
+        *,
+        session_store=None,
+    ):
         self.init_db(db)
 
         self.jinja_loader = jinja_loader or self.jinja_loader
@@ -483,6 +546,7 @@ class FrameworkManager(ABC):
         if session_max_hours is not None:
             # condition must account for possibility of 0 being passed in
             self.session_max_hours = session_max_hours
+        self.session_store = session_store or self.session_store or WebSessionStore()
 
         self.init_jinja()
 
@@ -495,16 +559,35 @@ class FrameworkManager(ABC):
 
     def init_jinja(self):
         """Configure grid-specific jinja environment."""
+        from .renderers import init_jinja_environment
+
         self.jinja_environment = jinja.Environment(
             loader=self.jinja_loader,
             finalize=lambda x: x if x is not None else '',
             autoescape=True,
         )
+        init_jinja_environment(self.jinja_environment)
 
     def static_path(self):
         """Path where static files are located on the filesystem."""
         return str(Path(__file__).resolve().parent / 'static')
 
+    def filter_row_url(self, grid):
+        """URL serving HTML filter rows for the grid, or None if the manager has none.
+
+        Grids with ``lazy_filters`` fetch rows for inactive filters from this URL, passing
+        the column key in the ``key`` query arg.
+        """
+        return None
+
+    def filter_options_url(self, grid, column_key):
+        """URL serving searched pages of a filter's options as JSON, or None if unavailable.
+
+        Multiselects for filters with an ``options_query`` load their options from this URL
+        as the user searches, rather than having every option rendered.
+        """
+        return None
+
     def get_args(self, grid):
         args = MultiDict()
         """Run request args through manager's args loaders, and return the result."""
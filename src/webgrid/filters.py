@@ -14,8 +14,10 @@ from sqlalchemy.sql import and_, or_
 from werkzeug.datastructures import ImmutableDict
 
 from . import types, validators
+from .cache import make_key
 from .extensions import gettext
 from .extensions import lazy_gettext as _
+from .utils import lookup_set
 
 
 try:
@@ -186,6 +188,10 @@ class FilterBase:
         self._op_keys = None
         self.error = False
 
+        if '_vargs' in self.__dict__:
+            # constructed by new_instance, which already knows the arguments
+            return
+
         # find the outermost call to a subclass's init method so we can store the exact arguments
         # used to construct it
         outermost = None
@@ -350,7 +356,11 @@ class FilterBase:
         compatibility in future
         """
         cls = self.__class__
-        new_filter = cls(*self._vargs, **self._kwargs)
+        # skip the argument discovery in __init__, the arguments are the same as ours
+        new_filter = cls.__new__(cls)
+        new_filter._vargs = self._vargs
+        new_filter._kwargs = self._kwargs
+        new_filter.__init__(*self._vargs, **self._kwargs)
         new_filter.dialect = kwargs.get('dialect')
         if 'col' in kwargs and new_filter.sa_col is None:
             new_filter.sa_col = kwargs['col']
@@ -385,6 +395,17 @@ class OptionsFilterBase(FilterBase):
         Options are expected to be tuples of the form (key, value). `key` is the part that will
         be validated on input and used in the filter query clause. `value` is displayed in UI.
 
+        options_query (callable): Method returning a SQLAlchemy query of (key, label) columns,
+        used in place of `options_from` for large option sets. Searching, paging, and
+        validating submitted keys are then done by the database, and the HTML multiselect can
+        load options from the manager as the user searches. Labels should be strings. Default
+        None.
+
+        options_cache (cache backend): Cache for resolved options, shared by every grid using
+        the filter class, such as ``webgrid.cache.LRUCache(ttl=300)``. Indexes of the option
+        keys and labels are kept with them. Entries are keyed by `options_cache_key`,
+        and `invalidate_options_cache` drops them early. Default None.
+
     """
 
     operators = ops.is_, ops.not_is, ops.empty, ops.not_empty
@@ -392,6 +413,8 @@ class OptionsFilterBase(FilterBase):
     input_types = 'select'
     receives_list = True
     options_from = ()
+    options_query = None
+    options_cache = None
 
     def __init__(
         self,
@@ -414,6 +437,7 @@ class OptionsFilterBase(FilterBase):
         # attributes that will start fresh for each instance
         self._options_seq = None
         self._options_keys = None
+        self._options_index = None
 
     def serialize_filter_spec(self):
         base_spec = super().serialize_filter_spec()
@@ -433,17 +457,137 @@ class OptionsFilterBase(FilterBase):
         """Resolver for `options_from` that caches the options values.
 
         Tries to treat `options_from` as a callable first, and if that fails, refers to it
-        as an attribute/property value instead.
+        as an attribute/property value instead. With `options_cache`, options are resolved
+        once and shared between filter instances until the cache entry expires.
         """
         if self._options_seq is None:
-            try:
-                self._options_seq = self.options_from()
-            except TypeError as e:
-                if 'is not callable' not in str(e):
-                    raise
-                self._options_seq = self.options_from
+            if self.options_cache is not None:
+                self._options_seq, self._options_index = self._cached_options()
+            else:
+                options = self._load_options()
+                if not isinstance(options, list | tuple):
+                    # queries and generators are only read once
+                    options = list(options)
+                self._options_seq = options
         return self._options_seq
 
+    def _load_options(self):
+        if self.uses_options_query:
+            return [tuple(row) for row in self.options_query()]
+        try:
+            return self.options_from()
+        except TypeError as e:
+            if 'is not callable' not in str(e):
+                raise
+            return self.options_from
+
+    def _cached_options(self):
+        cache_key = self.options_cache_key()
+        cached = self.options_cache.get(cache_key)
+        if cached is None:
+            options = [tuple(option) for option in self._load_options()]
+            cached = (options, self._index_options(options))
+            self.options_cache.set(cache_key, cached)
+        return cached
+
+    @staticmethod
+    def _index_options(options):
+        try:
+            return frozenset(key for key, _label in options), dict(options)
+        except (TypeError, ValueError):
+            # unhashable keys are left to list scans (and to setup_validator)
+            return None, None
+
+    @property
+    def _option_index(self):
+        options = self.options_seq
+        if self._options_index is None:
+            self._options_index = self._index_options(options)
+        return self._options_index
+
+    @property
+    def option_key_set(self):
+        """Frozen set of the option keys, or None if the keys are not hashable."""
+        return self._option_index[0]
+
+    @property
+    def option_labels(self):
+        """Dict of option labels by key, or None if the keys are not hashable."""
+        return self._option_index[1]
+
+    def options_cache_key(self):
+        """Key for storing this filter's options in `options_cache`.
+
+        Built from the filter class and its column. Override to add anything else the options
+        depend on, such as the current tenant, or a version to invalidate entries with.
+
+        Returns:
+            str: Cache key.
+        """
+        cls = type(self)
+        return make_key('options', cls.__module__, cls.__qualname__, str(self.sa_col))
+
+    def invalidate_options_cache(self):
+        """Drop this filter's options from `options_cache`, e.g. after the options change.
+
+        May be called on the filter given in the column definition, or on a grid's instance.
+        """
+        if self.options_cache is not None:
+            self.options_cache.delete(self.options_cache_key())
+
+    @property
+    def uses_options_query(self):
+        """Indicates whether options come from `options_query` and are searched by the database."""
+        return self.options_query is not None
+
+    def _options_query_columns(self, query):
+        key_desc, label_desc = query.column_descriptions
+        return key_desc['expr'], label_desc['expr']
+
+    def search_options(self, term, offset=0, limit=None):
+        """Return a page of (key, label) options with labels containing `term`.
+
+        Matching ignores case. With `options_query`, the database does the matching and
+        paging, ordering options by label.
+
+        Args:
+            term (str): Text to look for in labels. Empty matches all options.
+            offset (int, optional): Matching options to skip. Default 0.
+            limit (int, optional): Maximum number of options to return. Default None.
+
+        Returns:
+            list: Option tuples.
+        """
+        if self.uses_options_query:
+            query = self.options_query()
+            key_expr, label_expr = self._options_query_columns(query)
+            if term:
+                query = query.filter(
+                    sa.func.lower(label_expr).contains(term.lower(), autoescape=True),
+                )
+            query = query.order_by(label_expr, key_expr).offset(offset).limit(limit)
+            return [tuple(row) for row in query]
+
+        term = term.lower()
+        matches = [option for option in self.options_seq if term in str(option[1]).lower()]
+        return matches[offset : None if limit is None else offset + limit]
+
+    def options_for_keys(self, keys):
+        """Return the (key, label) options having the given keys.
+
+        With `options_query`, options are looked up with a single query on the keys.
+        """
+        if not keys:
+            return []
+        if self.uses_options_query:
+            query = self.options_query()
+            key_expr, _label_expr = self._options_query_columns(query)
+            return [tuple(row) for row in query.filter(key_expr.in_(keys))]
+        labels = self.option_labels
+        if labels is None:
+            return [option for option in self.options_seq if option[0] in keys]
+        return [(key, labels[key]) for key in dict.fromkeys(keys) if key in labels]
+
     @property
     def option_keys(self):
         """Extract a keys list from the options tuples."""
@@ -451,12 +595,24 @@ class OptionsFilterBase(FilterBase):
             self._options_keys = [k for k, v in self.options_seq]
         return self._options_keys
 
-    def setup_validator(self):
-        """Select a validator by type if `value_modifier` is "auto", or wrap a callable."""
+    def setup_validator(self, lazy=True):
+        """Select a validator by type if `value_modifier` is "auto", or wrap a callable.
+
+        With `options_query`, an "auto" validator is selected when first needed, so grids not
+        using the filter skip the options query. Pass ``lazy=False`` to select it now.
+        """
         # make an educated guess about what type the unicode values sent in on
         # a set() operation should be converted to
         if self.value_modifier == 'auto' or self.value_modifier is None:
-            if self.value_modifier and len(self.option_keys) == 0:
+            if self.uses_options_query:
+                if lazy and self.value_modifier == 'auto':
+                    return
+                # only one option is needed to pick the type
+                first_option = self.options_query().first()
+                option_keys = [first_option[0]] if first_option else []
+            else:
+                option_keys = self.option_keys
+            if self.value_modifier and len(option_keys) == 0:
                 raise ValueError(
                     _(
                         'value_modifier argument set to "auto", but '
@@ -465,7 +621,7 @@ class OptionsFilterBase(FilterBase):
                         name=self.__class__.__name__,
                     ),
                 )
-            first_key = self.option_keys[0]
+            first_key = option_keys[0]
             if isinstance(first_key, six.string_types) or self.value_modifier is None:
                 self.value_modifier = validators.StringValidator()
             elif isinstance(first_key, int):
@@ -528,6 +684,10 @@ class OptionsFilterBase(FilterBase):
                     # so if we encounter an Invalid exception, we are going to
                     # assume the value is erronious and just ignore it
                     pass
+        if self.uses_options_query and self.value_modifier is not None and self.value1:
+            # check the values are options with one query, rather than loading all options
+            valid_keys = {key for key, _label in self.options_for_keys(self.value1)}
+            self.value1 = [value for value in self.value1 if value in valid_keys]
 
         # if there are no values after processing, the operator is irrelevent
         # and should be set to None so that it is as if the filter
@@ -542,26 +702,54 @@ class OptionsFilterBase(FilterBase):
 
     def process(self, value):
         """Apply the `value_modifier` to a value."""
+        if self.value_modifier == 'auto':
+            self.setup_validator(lazy=False)
         if self.value_modifier is not None:
             validator = self.value_modifier
             if inspect.isclass(self.value_modifier):
                 validator = validator()
             value = validator.process(value)
-            if value not in self.option_keys:
+            # with an options query, values are checked together in `set`
+            if not self.uses_options_query and not self._is_option_key(value):
                 return _NoValue
             if self.default_op and value == -1:
                 return _NoValue
         return value
 
+    def selected_option_keys(self, options):
+        """Return the keys among `options` to mark as selected for the current values.
+
+        Processed values are option keys already, so they are looked up directly. When a
+        subclass overrides `process`, each option key is processed and compared instead.
+
+        Args:
+            options (iterable): Option tuples being rendered.
+
+        Returns:
+            Collection of option keys supporting `in` tests.
+        """
+        values = lookup_set(self.value1 or [])
+        if self.value_modifier == 'auto':
+            self.setup_validator(lazy=False)
+        if type(self).process is OptionsFilterBase.process or self.value_modifier is None:
+            return values
+        validator = self.value_modifier
+        if inspect.isclass(validator):
+            validator = validator()
+        return lookup_set([key for key, *_ in options if validator.process(key) in values])
+
+    def _is_option_key(self, value):
+        key_set = self.option_key_set
+        if key_set is not None:
+            try:
+                return value in key_set
+            except TypeError:
+                pass
+        return value in self.option_keys
+
     def match_keys_for_value(self, value):
         """Used for single-search to match search value to part of an option's display string."""
-        return [
-            key
-            for (key, _) in filter(
-                lambda item: value.lower() in str(item[1]).lower(),
-                self.options_seq,
-            )
-        ]
+        return [key for key, _label in self.search_options(value)]
 
     def get_search_expr(self):
         """Match up a search value to option display, grab the corresponding keys, and search."""
@@ -683,6 +871,15 @@ class OptionsEnumFilter(OptionsFilterBase):
 
         return self.value_modifier.process(value)
 
+    def selected_option_keys(self, options):
+        """Option keys are member names, so look up the names of the selected members."""
+        return lookup_set(
+            [
+                value.name if isinstance(value, self.enum_type) else value
+                for value in self.value1 or []
+            ],
+        )
+
 
 class OptionsEnumArrayFilter(OptionsEnumFilter):
     """Handle filtering array fields having an enum type.
@@ -1,6 +1,12 @@
+import contextlib
 import json
+import os
+import time
+import unicodedata
+import urllib.parse
 
 import flask
+from werkzeug.exceptions import HTTPException
 
 from webgrid import extensions, renderers
 
@@ -11,6 +17,22 @@ except ImportError:
     configure_jinja_environment = lambda *args, **kwargs: None
 
 
+def _attachment_filename_options(file_name):
+    """Content-Disposition filename option(s), quoted/encoded as ``flask.send_file`` does.
+
+    Non-ASCII names get an RFC 6266 ``filename*`` option, with an ASCII fallback.
+    """
+    try:
+        file_name.encode('ascii')
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize('NFKD', file_name).encode('ascii', 'ignore').decode()
+        return {
+            'filename': simple,
+            'filename*': "UTF-8''" + urllib.parse.quote(file_name, safe='!#$&+^`|~'),
+        }
+    return {'filename': file_name}
+
+
 class WebGrid(extensions.FrameworkManager):
     """Grid manager for connecting grids to Flask webapps.
 
@@ -34,13 +56,34 @@ class WebGrid(extensions.FrameworkManager):
         session_max_hours (int): Hours to hold a given grid session in storage. Set to None to
         disable. Default 12.
 
+        session_store (GridSessionStore): Storage for grid sessions. Default is a
+        `webgrid.session_store.WebSessionStore`, keeping them in the Flask session.
+
+        session_cleanup_rate (float): Share of requests checking for expired grid sessions,
+        from 0 to 1. Default 1.
+
         blueprint_name (string): Identifier to use for the Flask blueprint on this extension.
         Default "webgrid". Needs to be unique if multiple managers are initialized as flask
         extensions.
+
+        enable_filter_routes (bool): Serve filter rows to grids with ``lazy_filters``, and
+        options to filters with an ``options_query``, for grids given to ``register_grid``.
+        These GET routes show filter options, such as customer names, to anyone able to reach
+        them, so restrict access in the grids' ``check_auth`` before enabling. Default False.
+
+        filter_route_prefix (string): Prefix for the URL routes serving filter rows and
+        options. Default "/webgrid-filter". Grids are found by the ident given to
+        ``register_grid``, which should match the grid's own ident.
+
+        filter_options_max_limit (int): Most options returned in one response by the filter
+        options view. Default 100.
     """
 
     blueprint_name = 'webgrid'
     blueprint_class = flask.Blueprint
+    enable_filter_routes = False
+    filter_route_prefix = '/webgrid-filter'
+    filter_options_max_limit = 100
 
     def __init__(
         self,
@@ -50,6 +93,8 @@ class WebGrid(extensions.FrameworkManager):
         session_max_hours=None,
         blueprint_name=None,
         blueprint_class=None,
+        *,
+        session_store=None,
     ):
         self.blueprint_name = blueprint_name or self.blueprint_name
         self.blueprint_class = blueprint_class or self.blueprint_class
@@ -59,6 +104,7 @@ class WebGrid(extensions.FrameworkManager):
             jinja_loader=jinja_loader,
             args_loaders=args_loaders,
             session_max_hours=session_max_hours,
+            session_store=session_store,
         )
 
     def init_db(self, db):
@@ -112,13 +158,117 @@ class WebGrid(extensions.FrameworkManager):
         return flask.url_for(f'{self.blueprint_name}.static', filename=url_tail)
 
     def init_blueprint(self, app):
-        """Create a blueprint for webgrid assets."""
-        return self.blueprint_class(
+        """Create a blueprint for webgrid assets, and the filter endpoints if enabled."""
+        blueprint = self.blueprint_class(
             self.blueprint_name,
             __name__,
             static_folder='static',
             static_url_path=app.static_url_path + '/webgrid',
         )
+        if self.enable_filter_routes:
+            blueprint.route(self.filter_route, methods=('GET',))(self.filter_row_view_method)
+            blueprint.route(self.filter_route + '/options', methods=('GET',))(
+                self.filter_options_view_method,
+            )
+        return blueprint
+
+    @property
+    def filter_route(self):
+        """URL route to bind on the manager's blueprint for serving filter rows."""
+        return self.filter_route_prefix + '/<grid_ident>'
+
+    def register_grid(self, grid_ident, grid_cls_or_creator):
+        """Identify a grid class for use by the manager's views via an identifying string.
+
+        The identifier provided here will be used in route matching to init the
+        requested grid. Identifiers are enforced as unique.
+
+        ``grid_cls_or_creator`` may be a grid class or some other callable returning
+        a grid instance.
+        """
+        if grid_ident in self._registered_grids:
+            raise Exception('API grid_ident must be unique')
+
+        self._registered_grids[grid_ident] = grid_cls_or_creator
+
+    def _serves_filters(self, grid):
+        return (
+            self.enable_filter_routes
+            and grid.ident in self._registered_grids
+            and getattr(self, 'blueprint', None) is not None
+        )
+
+    def filter_row_url(self, grid):
+        """URL of the filter row view, if enabled and the grid is registered under its ident."""
+        if not self._serves_filters(grid):
+            return None
+        return flask.url_for(
+            f'{self.blueprint_name}.filter_row_view_method',
+            grid_ident=grid.ident,
+        )
+
+    def filter_options_url(self, grid, column_key):
+        """URL of the filter options view, if enabled and the grid is registered under its
+        ident."""
+        if not self._serves_filters(grid):
+            return None
+        return flask.url_for(
+            f'{self.blueprint_name}.filter_options_view_method',
+            grid_ident=grid.ident,
+            key=column_key,
+        )
+
+    def _registered_grid_filter(self, grid_ident):
+        # grid and filtered column for a filter view, after checking auth
+        if grid_ident not in self._registered_grids:
+            flask.abort(404)
+
+        grid = self._registered_grids[grid_ident]()
+        grid.check_auth()
+
+        col = grid.filtered_cols.get(flask.request.args.get('key'))
+        if col is None:
+            flask.abort(404)
+        return grid, col
+
+    def filter_options_view_method(self, grid_ident):
+        """Return a page of options for the filter on the column given in the ``key`` arg.
+
+        Options with labels containing the ``q`` arg are returned as JSON, starting at the
+        ``offset`` arg and limited by the ``limit`` arg (at most ``filter_options_max_limit``).
+        The ``more`` flag in the response tells whether another page is available. Keys are
+        given as strings, as they would be rendered in HTML.
+
+        If the ``grid_ident`` is not registered or the column has no options filter, response
+        is 404.
+        """
+        _grid, col = self._registered_grid_filter(grid_ident)
+        if not hasattr(col.filter, 'search_options'):
+            flask.abort(404)
+
+        args = flask.request.args
+        offset = max(args.get('offset', 0, type=int), 0)
+        limit = min(
+            max(args.get('limit', self.filter_options_max_limit, type=int), 1),
+            self.filter_options_max_limit,
+        )
+        # ask for one more than the limit, to know if there is another page
+        options = col.filter.search_options(args.get('q', ''), offset=offset, limit=limit + 1)
+        return flask.jsonify(
+            options=[{'key': str(key), 'label': str(label)} for key, label in options[:limit]],
+            more=len(options) > limit,
+        )
+
+    def filter_row_view_method(self, grid_ident):
+        """Return the HTML filter row for the column given in the ``key`` query arg.
+
+        The row is rendered as for an inactive filter, so no grid args are applied. As with
+        the API views, authorization is left to the grid's ``check_auth``.
+
+        If the ``grid_ident`` is not registered or the column has no filter, response is 404.
+        """
+        grid, col = self._registered_grid_filter(grid_ident)
+        return grid.html.filtering_table_row(col)
 
     def init_app(self, app):
         """Register a blueprint for webgrid assets, and configure jinja templates."""
@@ -127,7 +277,25 @@ class WebGrid(extensions.FrameworkManager):
         configure_jinja_environment(app.jinja_env, extensions.translation_manager)
 
     def file_as_response(self, data_stream, file_name, mime_type):
-        """Return response from framework for sending a file."""
+        """Return response from framework for sending a file.
+
+        ``data_stream`` may be a file path, a file-like object, or an iterable of bytes
+        chunks. Iterables are sent as a streamed response, keeping the request context
+        available while they are consumed.
+        """
+        if not isinstance(data_stream, str | os.PathLike) and not hasattr(data_stream, 'read'):
+            response = flask.Response(
+                flask.stream_with_context(data_stream),
+                mimetype=mime_type,
+            )
+            if file_name is not None:
+                response.headers.set(
+                    'Content-Disposition',
+                    'attachment',
+                    **_attachment_filename_options(file_name),
+                )
+            return response
+
         as_attachment = file_name is not None
         return flask.send_file(
             data_stream,
@@ -163,12 +331,22 @@ class WebGridAPI(WebGrid):
         api_route_prefix (string): Prefix for URL route to bind on the manager's blueprint.
         Default "/webgrid-api". By default, ``api_route`` uses this to construct
         "/webgrid-api/<grid_ident>".
+
+        metrics (GridMetrics): Collects per-grid metrics for API requests, such as a
+        ``webgrid.metrics.GridMetrics()``. Requests are labeled by the registered ident, and
+        queries/renders by the grid's ident, so register grids under their own ident. Default
+        None (no metrics).
+
+        metrics_route (string): URL route serving ``metrics`` in the Prometheus text format,
+        bound only if ``metrics`` is set. Default "/webgrid-metrics".
     """
 
     blueprint_name = 'webgrid-api'
     api_route_prefix = '/webgrid-api'
     args_loaders = (extensions.RequestJsonLoader,)
     csrf_protection = False
+    metrics = None
+    metrics_route = '/webgrid-metrics'
 
     def __init__(
         self,
@@ -179,14 +357,19 @@ class WebGridAPI(WebGrid):
         blueprint_name=None,
         blueprint_class=None,
         api_route_prefix=None,
+        *,
+        session_store=None,
+        metrics=None,
     ):
         self.api_route_prefix = api_route_prefix or self.api_route_prefix
-        self._registered_grids = {}
+        if metrics is not None:
+            self.metrics = metrics
         super().__init__(
             db=db,
             jinja_loader=jinja_loader,
             args_loaders=args_loaders,
             session_max_hours=session_max_hours,
+            session_store=session_store,
             blueprint_name=blueprint_name,
             blueprint_class=blueprint_class,
         )
@@ -201,6 +384,8 @@ class WebGridAPI(WebGrid):
 
         blueprint.route(self.api_route, methods=('POST',))(self.api_view_method)
         blueprint.route(self.api_route + '/count', methods=('POST',))(self.api_count_view_method)
+        if self.metrics is not None:
+            blueprint.route(self.metrics_route, methods=('GET',))(self.metrics_view_method)
 
         if app.config.get('TESTING'):
 
@@ -217,20 +402,6 @@ class WebGridAPI(WebGrid):
         """URL route to bind on the manager's blueprint for serving grids."""
         return self.api_route_prefix + '/<grid_ident>'
 
-    def register_grid(self, grid_ident, grid_cls_or_creator):
-        """Identify a grid class for API use via an identifying string.
-
-        The identifier provided here will be used in route matching to init the
-        requested grid. Identifiers are enforced as unique.
-
-        ``grid_cls_or_creator`` may be a grid class or some other callable returning
-        a grid instance.
-        """
-        if grid_ident in self._registered_grids:
-            raise Exception('API grid_ident must be unique')
-
-        self._registered_grids[grid_ident] = grid_cls_or_creator
-
     def api_init_grid(self, grid_cls_or_creator):
         """Create the grid instance from the registered class/creator."""
         return grid_cls_or_creator()
@@ -247,16 +418,57 @@ class WebGridAPI(WebGrid):
         import webgrid
 
         try:
-            return grid.export_as_response()
+            response = grid.export_as_response()
         except webgrid.renderers.RenderLimitExceeded:
+            if self.metrics is not None:
+                self.metrics.increment('webgrid_render_limit_exceeded_total', grid.ident)
             return self.api_on_render_limit_exceeded(grid)
 
+        if self.metrics is not None:
+            # streamed exports have neither loaded records nor a known length
+            if grid._records is not None:
+                self.metrics.increment(
+                    'webgrid_rows_rendered_total',
+                    grid.ident,
+                    len(grid._records),
+                    target=grid.export_to,
+                )
+            if response.content_length is not None:
+                self.metrics.increment(
+                    'webgrid_export_bytes_total',
+                    grid.ident,
+                    response.content_length,
+                    target=grid.export_to,
+                )
+        return response
+
+    @contextlib.contextmanager
+    def request_metrics(self, grid_ident):
+        """Count and time the enclosed handling of a grid request in ``metrics``."""
+        # unregistered idents get a 404, and are left out to keep the label values bounded
+        if self.metrics is None or grid_ident not in self._registered_grids:
+            yield
+            return
+        t0 = time.perf_counter()
+        try:
+            yield
+        except HTTPException:
+            raise
+        except Exception:
+            self.metrics.increment('webgrid_errors_total', grid_ident)
+            raise
+        finally:
+            self.metrics.increment('webgrid_requests_total', grid_ident)
+            self.metrics.observe('webgrid_request_seconds', grid_ident, time.perf_counter() - t0)
+
     def generate_requested_grid(self, grid_ident):
         if grid_ident not in self._registered_grids:
             flask.abort(404)
 
         grid = self.api_init_grid(self._registered_grids.get(grid_ident))
         self.api_init_grid_post(grid)
+        if self.metrics is not None:
+            grid.timing_listeners.append(self.metrics.timing_listener)
 
         # Make the API as flexible as possible to accept JSON post requests for grids
         # that may be used in other areas of the application, hence managed by a different
@@ -277,17 +489,26 @@ class WebGridAPI(WebGrid):
 
         If the ``grid_ident`` is not registered, response is 404.
         """
-        grid = self.generate_requested_grid(grid_ident)
-
-        if grid.export_to:
-            return self.api_export_response(grid)
-
-        # Be as flexible as possible here. If the grid has a JSON renderer, use it. But,
-        # provide a default if it does not.
-        renderer = getattr(grid, 'json', renderers.JSON(grid))
-
-        # not using jsonify here because the JSON renderer returns a string
-        return flask.Response(renderer(), mimetype='application/json')
+        with self.request_metrics(grid_ident):
+            grid = self.generate_requested_grid(grid_ident)
+
+            if grid.export_to:
+                return self.api_export_response(grid)
+
+            # Be as flexible as possible here. If the grid has a JSON renderer, use it. But,
+            # provide a default if it does not.
+            renderer = getattr(grid, 'json', renderers.JSON(grid))
+
+            # not using jsonify here because the JSON renderer returns a string
+            response = flask.Response(renderer(), mimetype='application/json')
+            if self.metrics is not None:
+                self.metrics.increment(
+                    'webgrid_rows_rendered_total',
+                    grid.ident,
+                    len(grid.records),
+                    target='json',
+                )
+            return response
 
     def api_count_view_method(self, grid_ident):
         """API view method to count records without returning the records and other grid info.
@@ -298,7 +519,19 @@ class WebGridAPI(WebGrid):
 
         If the ``grid_ident`` is not registered, response is 404.
         """
-        grid = self.generate_requested_grid(grid_ident)
+        with self.request_metrics(grid_ident):
+            grid = self.generate_requested_grid(grid_ident)
+
+            # not using jsonify here because the JSON renderer returns a string
+            return flask.Response(
+                json.dumps({'count': grid.record_count}),
+                mimetype='application/json',
+            )
 
-        # not using jsonify here because the JSON renderer returns a string
-        return flask.Response(json.dumps({'count': grid.record_count}), mimetype='application/json')
+    def metrics_view_method(self):
+        """Serve ``metrics`` in the Prometheus text format.
+
+        No authentication/authorization is applied. Wrap/override this method, or keep the
+        route from public access, if metrics should not be exposed.
+        """
+        return flask.Response(self.metrics.render(), mimetype='text/plain; version=0.0.4')
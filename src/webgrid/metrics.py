@@ -0,0 +1,138 @@
+"""In-process metrics for grids, exposed in the Prometheus text format.
+
+`GridMetrics` collects counters and histograms labeled by grid ident. Grids feed query and
+render durations to it through their ``timing_listeners``, and ``webgrid.flask.WebGridAPI``
+serves it from a metrics route when given an instance.
+"""
+
+import bisect
+import threading
+from typing import ClassVar
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels, extra=()):
+    pairs = [*labels, *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape_label(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class GridMetrics:
+    """Thread-safe collection of per-grid counters and latency histograms.
+
+    Counters:
+
+    - ``webgrid_requests_total``: grid requests served
+    - ``webgrid_errors_total``: grid requests failing with an exception
+    - ``webgrid_render_limit_exceeded_total``: exports refused for having too many records
+    - ``webgrid_rows_rendered_total``: records rendered, by target
+    - ``webgrid_export_bytes_total``: size of export responses, by target
+
+    Histograms, in seconds:
+
+    - ``webgrid_request_seconds``: grid request duration
+    - ``webgrid_query_seconds``: count/data/totals query duration, by query
+    - ``webgrid_render_seconds``: render duration, by target
+
+    Args:
+        buckets (tuple, optional): Upper bounds of the histogram buckets, in seconds.
+        Default `DEFAULT_BUCKETS`.
+    """
+
+    help_text: ClassVar[dict[str, str]] = {
+        'webgrid_requests_total': 'Grid requests served.',
+        'webgrid_errors_total': 'Grid requests failing with an exception.',
+        'webgrid_render_limit_exceeded_total': 'Exports refused for having too many records.',
+        'webgrid_rows_rendered_total': 'Records rendered.',
+        'webgrid_export_bytes_total': 'Size of export responses in bytes.',
+        'webgrid_request_seconds': 'Grid request duration in seconds.',
+        'webgrid_query_seconds': 'Grid query duration in seconds.',
+        'webgrid_render_seconds': 'Grid render duration in seconds.',
+    }
+
+    # grid timing phases recorded as query durations
+    query_phases = ('count', 'data', 'totals')
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._counters = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def increment(self, name, grid_ident, amount=1, **labels):
+        """Add `amount` to a counter."""
+        key = (name, (('grid', grid_ident), *sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name, grid_ident, seconds, **labels):
+        """Record a duration in a histogram."""
+        key = (name, (('grid', grid_ident), *sorted(labels.items())))
+        bucket = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                # per-bucket counts, with the last for values above every bound, then sum
+                histogram = self._histograms[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            histogram[0][bucket] += 1
+            histogram[1] += seconds
+
+    def timing_listener(self, grid, phase, seconds):
+        """Grid timing listener recording query and render durations."""
+        if phase in self.query_phases:
+            self.observe('webgrid_query_seconds', grid.ident, seconds, query=phase)
+        elif phase.startswith('render_'):
+            self.observe('webgrid_render_seconds', grid.ident, seconds, target=phase[7:])
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self):
+        """Return all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {
+                key: (list(counts), total) for key, (counts, total) in self._histograms.items()
+            }
+
+        lines = []
+        for name in sorted({name for name, _labels in counters}):
+            self._render_header(lines, name, 'counter')
+            for (metric, labels), value in sorted(counters.items()):
+                if metric == name:
+                    lines.append(f'{name}{_format_labels(labels)} {_format_value(value)}')
+
+        for name in sorted({name for name, _labels in histograms}):
+            self._render_header(lines, name, 'histogram')
+            for (metric, labels), (counts, total) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, count in zip((*self.buckets, float('inf')), counts, strict=True):
+                    cumulative += count
+                    bucket_labels = _format_labels(labels, [('le', _format_value(float(bound)))])
+                    lines.append(f'{name}_bucket{bucket_labels} {cumulative}')
+                lines.append(f'{name}_sum{_format_labels(labels)} {_format_value(total)}')
+                lines.append(f'{name}_count{_format_labels(labels)} {cumulative}')
+
+        return ''.join(f'{line}\n' for line in lines)
+
+    def _render_header(self, lines, name, metric_type):
+        if name in self.help_text:
+            lines.append(f'# HELP {name} {self.help_text[name]}')
+        lines.append(f'# TYPE {name} {metric_type}')
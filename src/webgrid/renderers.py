@@ -1,13 +1,19 @@
 from abc import ABC, abstractmethod
 from collections import defaultdict
+import contextlib
 import csv
 from dataclasses import asdict
-import inspect
+import functools
 import io
+import itertools
 import json
 from operator import itemgetter
 import re
+import tempfile
+import threading
+import time
 import typing
+import weakref
 
 from blazeutils.containers import HTMLAttributes, LazyDict
 from blazeutils.functional import identity
@@ -24,7 +30,7 @@ from werkzeug.routing import Map, Rule
 from . import extensions, types
 from .extensions import CustomJsonEncoder, ngettext, translation_manager
 from .extensions import gettext as _
-from .utils import current_url
+from .utils import current_url, lookup_set
 
 
 if openpyxl:
@@ -44,6 +50,13 @@ except ImportError:
     is_lazy_string = lambda value: False
 
 
+def _batches(records, size):
+    """Split an iterable of records into lists of at most `size` records."""
+    records = iter(records)
+    while batch := list(itertools.islice(records, size)):
+        yield batch
+
+
 def fix_xls_value(value):
     """
     Perform any data type fixes that must be made
@@ -55,6 +68,62 @@ def fix_xls_value(value):
     return value
 
 
+# compiled inline templates, by jinja environment and then by source
+_template_cache = weakref.WeakKeyDictionary()
+_template_cache_lock = threading.Lock()
+
+
+def _template_gettext(message):
+    translations = translation_manager.translations
+    return message if translations is None else translations.gettext(message)
+
+
+def _template_ngettext(singular, plural, num):
+    translations = translation_manager.translations
+    if translations is None:
+        return singular if num == 1 else plural
+    return translations.ngettext(singular, plural, num)
+
+
+def init_jinja_environment(jinja_env):
+    """Register the filters and extensions used by grid templates on a jinja environment."""
+    jinja_env.filters['wg_safe'] = jinja.filters.do_mark_safe
+    jinja_env.filters['wg_attributes'] = render_html_attributes
+    jinja_env.filters['wg_gettext'] = _
+    configure_jinja_environment(jinja_env, translation_manager)
+    if translation_manager is not None:
+        # the manager replaces its translations when the locale changes, so rather than
+        # installing the current ones, look them up each time a template translates
+        jinja_env.install_gettext_callables(_template_gettext, _template_ngettext)
+
+
+@functools.cache
+def default_jinja_environment():
+    """Jinja environment shared by grids rendered without a manager."""
+    jinja_env = jinja.Environment(
+        loader=jinja.PackageLoader('webgrid', 'templates'),
+        finalize=lambda x: x if x is not None else '',
+        autoescape=True,
+    )
+    init_jinja_environment(jinja_env)
+    return jinja_env
+
+
+def compiled_template(jinja_env, source):
+    """Compile template source in the environment, or return the copy compiled before.
+
+    Compiled templates are shared by all renderers in the process, and safe to use from
+    multiple threads.
+    """
+    templates = _template_cache.get(jinja_env)
+    if templates is None or source not in templates:
+        with _template_cache_lock:
+            templates = _template_cache.setdefault(jinja_env, {})
+            if source not in templates:
+                templates[source] = jinja_env.from_string(source)
+    return templates[source]
+
+
 class RenderLimitExceeded(Exception):
     pass
 
@@ -93,7 +162,24 @@ class Renderer(ABC):
             self.init()
 
     def __call__(self):
-        return self.render()
+        with self.rendering():
+            return self.render()
+
+    @contextlib.contextmanager
+    def render_target(self):
+        """Set the grid's `render_target` to this renderer for the enclosed block."""
+        previous = self.grid.render_target
+        self.grid.render_target = self.name
+        try:
+            yield
+        finally:
+            self.grid.render_target = previous
+
+    @contextlib.contextmanager
+    def rendering(self):
+        """Set the grid's `render_target` and time the enclosed render."""
+        with self.render_target(), self.grid.timed(f'render_{self.name}'):
+            yield
 
     def can_render(self):
         """Guard method for preventing a renderer from overflowing the target format.
@@ -111,6 +197,26 @@ class Renderer(ABC):
     def render(self):
         """Main renderer method returning the output."""
 
+    def rendered_rows(self, records, batch_size=1000):
+        """Yield a tuple of rendered column values for each record.
+
+        Records are taken in batches, and each column renders a whole batch through its
+        `render_batch` method.
+
+        Args:
+            records (Iterable): Records to render, may be a generator.
+            batch_size (int, optional): Records rendered per batch. Default 1000.
+
+        Yields:
+            tuple: Rendered values, in the order of `columns`.
+        """
+        columns = self.columns
+        for batch in _batches(records, batch_size):
+            if not columns:
+                yield from (() for _ in batch)
+                continue
+            yield from zip(*(col.render_batch(self.name, batch) for col in columns), strict=True)
+
 
 class GroupMixin:
     def has_groups(self):
@@ -165,6 +271,10 @@ def _safe_id(idstring):
     return idstring
 
 
+# Boundaries recognized by str.splitlines, which reindent uses
+_line_break_re = re.compile('[\n\r\v\f\x1c\x1d\x1e\x85\u2028\u2029]')
+
+
 def render_html_attributes(attrs):
     """Escapes attrs for HTML markup."""
     if not attrs:
@@ -239,7 +349,10 @@ class JSON(Renderer):
         return {col.key: col.render('json', record) for col in self.columns}
 
     def serialized_records(self):
-        return [self.serialize_record(record) for record in self.grid.records]
+        if type(self).serialize_record is not JSON.serialize_record:
+            return [self.serialize_record(record) for record in self.grid.records]
+        keys = [col.key for col in self.columns]
+        return [dict(zip(keys, row, strict=True)) for row in self.rendered_rows(self.grid.records)]
 
     def serialize_totals_record(self, record):
         cols = filter(lambda col: col.key in self.grid.subtotal_cols, self.columns)
@@ -272,6 +385,7 @@ class JSON(Renderer):
                     pager_on=self.grid.pager_on,
                     per_page=self.grid.per_page,
                     on_page=self.grid.on_page,
+                    cursor=self.grid.page_cursor,
                 ),
                 sort=self.serialized_order_by(),
                 export_to=None,
@@ -289,7 +403,11 @@ class JSON(Renderer):
             state=types.GridState(
                 page_count=self.grid.page_count,
                 record_count=self.grid.record_count,
+                record_count_is_approximate=self.grid.record_count_is_approximate,
                 warnings=self.grid.user_warnings,
+                cursor_prev=self.grid.cursor_prev,
+                cursor_next=self.grid.cursor_next,
+                timings=dict(self.grid.timings) if self.grid.debug_timings else None,
             ),
             records=self.serialized_records(),
             totals=self.serialized_totals(),
@@ -302,7 +420,8 @@ class JSON(Renderer):
     def as_response(self):
         """Return a response via the grid's manager."""
         buffer = io.BytesIO()
-        buffer.write(self.render())
+        with self.rendering():
+            buffer.write(self.render())
         buffer.seek(0)
         return self.grid.manager.file_as_response(buffer, None, self.mime_type)
 
@@ -320,31 +439,35 @@ class HTML(GroupMixin, Renderer):
         self.manager = self.grid.manager
         if self.manager:
             self.jinja_env = self.manager.jinja_environment
+            # managers set up their environment in init_jinja, but one may have been
+            # swapped in afterwards
+            if 'wg_attributes' not in self.jinja_env.filters:
+                init_jinja_environment(self.jinja_env)
         else:
             # if the grid is unmanaged for any reason (e.g. just not in a request/response
             # cycle and used only for render), fall back to a default jinja environment
-            self.jinja_env = jinja.Environment(
-                loader=jinja.PackageLoader('webgrid', 'templates'),
-                finalize=lambda x: x if x is not None else '',
-                autoescape=True,
-            )
-        self.jinja_env.filters['wg_safe'] = jinja.filters.do_mark_safe
-        self.jinja_env.filters['wg_attributes'] = render_html_attributes
-        self.jinja_env.filters['wg_gettext'] = _
-        self._template_cache = {}
-
-        configure_jinja_environment(self.jinja_env, translation_manager)
+            self.jinja_env = default_jinja_environment()
+        self._td_attrs_cache = {}
 
     def _render_jinja(self, source, **kwargs):
-        if source not in self._template_cache:
-            self._template_cache[source] = self.jinja_env.from_string(source)
-        template = self._template_cache[source]
+        template = compiled_template(self.jinja_env, source)
         return Markup(template.render(**kwargs))
 
     def render(self):
         if not self.can_render():
             raise RenderLimitExceeded('Unable to render HTML table')
-        return self.load_content('grid.html')
+        content = self.load_content('grid.html')
+        if self.grid.debug_timings:
+            # managers may render the template to a plain string, which is safe markup
+            content = Markup(content) + self.timings_comment()
+        return content
+
+    def timings_comment(self):
+        """HTML comment listing the grid's `timings` so far, for `debug_timings`."""
+        timings = ' '.join(
+            f'{phase}={seconds * 1000:.1f}ms' for phase, seconds in self.grid.timings.items()
+        )
+        return Markup(f'\n<!-- webgrid timings: {timings} -->')
 
     def grid_attrs(self):
         """HTML attributes to render on the main grid div element."""
@@ -382,8 +505,17 @@ class HTML(GroupMixin, Renderer):
         """HTML attributes to render on the grid filter table element."""
         kwargs.setdefault('cellpadding', 1)
         kwargs.setdefault('cellspacing', 0)
+        filter_row_url = self.filtering_lazy_url()
+        if filter_row_url:
+            kwargs.setdefault('data-filter-url', filter_row_url)
         return kwargs
 
+    def filtering_lazy_url(self):
+        """URL for fetching inactive filter rows, if the grid renders them lazily."""
+        if not self.grid.lazy_filters or not self.manager:
+            return None
+        return self.manager.filter_row_url(self.grid)
+
     def filtering_session_key(self):
         """Hidden input to preserve the session key on form submission."""
         return self._render_jinja(
@@ -392,9 +524,14 @@ class HTML(GroupMixin, Renderer):
         )
 
     def filtering_fields(self):
-        """Table rows for the filter area."""
+        """Table rows for the filter area.
+
+        With lazy filters, only rows for active filters are rendered."""
+        lazy = self.filtering_lazy_url() is not None
         rows = []
         for col in six.itervalues(self.grid.filtered_cols):
+            if lazy and not col.filter.is_display_active:
+                continue
             rows.append(self.filtering_table_row(col))
         rows = Markup('\n'.join(rows))
 
@@ -467,21 +604,41 @@ class HTML(GroupMixin, Renderer):
             )
         if 'select' in filter.input_types:
             current_selected = tolist(filter.value1) or []
+            options_url = self.filtering_options_url(col)
+            if options_url:
+                # the multiselect loads other options as the user searches
+                options = filter.options_for_keys(current_selected)
+                select_attrs = {'data-remote-url': options_url}
+            else:
+                options = filter.options_seq
+                select_attrs = {}
             inputs += self.render_select(
-                filter.options_seq,
+                options,
                 current_selection=current_selected,
                 placeholder=None,
                 multiple=filter.receives_list,
                 name=field_name,
+                **select_attrs,
             )
             if filter.receives_list:
                 inputs += self.filtering_multiselect(
                     field_name,
                     current_selected,
-                    self.filtering_filter_options_multi(filter, field_name),
+                    self.filtering_filter_options_multi(filter, field_name, options),
                 )
         return inputs
 
+    def filtering_options_url(self, col):
+        """URL for loading the column filter's options remotely, if it has an options query.
+
+        Only multiselects load options remotely. Others render all options."""
+        filter = col.filter
+        if not getattr(filter, 'uses_options_query', False) or not filter.receives_list:
+            return None
+        if not self.manager:
+            return None
+        return self.manager.filter_options_url(self.grid, col.key)
+
     def filtering_multiselect(self, field_name, current_selected, options):
         """Almost all selects are rendered with multiselect UI. Render that here.
 
@@ -525,20 +682,17 @@ class HTML(GroupMixin, Renderer):
             options=options,
         )
 
-    def filtering_filter_options_multi(self, filter, field_name):
-        """Render the multiselect options."""
-        # Assume the multiselect filter has been set up with OptionsFilterBase.setup_validator
-        selected = filter.value1 or []
-        validator = filter.value_modifier
-        if inspect.isclass(validator):
-            validator = validator()
+    def filtering_filter_options_multi(self, filter, field_name, options=None):
+        """Render the multiselect options. Defaults to all of the filter's options."""
+        options = filter.options_seq if options is None else options
+        selected = filter.selected_option_keys(options)
         return self._render_jinja(
             """
-            {% for value, label in filter.options_seq %}
+            {% for value, label in options %}
                 <li>
                     <label>
                         <input
-                            {% if transform(value) in selected %}checked{% endif %}
+                            {% if value in selected %}checked{% endif %}
                             type="checkbox"
                             value="{{value}}"
                             name="selectItem{{field_name}}"
@@ -548,10 +702,9 @@ class HTML(GroupMixin, Renderer):
                 </li>
             {% endfor %}
             """,
-            filter=filter,
+            options=options,
             field_name=field_name,
             selected=selected,
-            transform=validator.process if validator else lambda x: x,
         )
 
     def filtering_col_inputs2(self, col):
@@ -666,7 +819,7 @@ class HTML(GroupMixin, Renderer):
             </select>
             """,
             options=((tuple(opt) if len(opt) == 3 else (tuple(opt) + (None,))) for opt in options),  # noqa: RUF005
-            current_selection=current_selection,
+            current_selection=lookup_set(current_selection),
             placeholder=placeholder,
             attrs=kwargs,
         )
@@ -730,9 +883,21 @@ class HTML(GroupMixin, Renderer):
         """Render the paging area of the grid header."""
         return self.load_content('header_paging.html')
 
+    def header_record_count(self):
+        """Render the record count, marked as an estimate if it is approximate."""
+        count = self.grid.record_count
+        if self.grid.record_count_is_approximate:
+            return _('about {count}', count=count)
+        return count
+
     def paging_select(self):
         """Render the page selection input."""
         op_qsk = self.grid.prefix_qs_arg_key('onpage')
+        page_count = self.grid.page_count
+        if self.grid.record_count_is_approximate:
+            text = _('of about {page_count}', page_count=page_count)
+        else:
+            text = _('of {page_count}', page_count=page_count)
         return self._render_jinja(
             """
             <span>
@@ -741,9 +906,9 @@ class HTML(GroupMixin, Renderer):
             </span>
             """,
             name=op_qsk,
-            page_count=self.grid.page_count,
+            page_count=page_count,
             page=self.grid.on_page,
-            text=_('of {page_count}', page_count=self.grid.page_count),
+            text=text,
         )
 
     def paging_input(self):
@@ -757,6 +922,8 @@ class HTML(GroupMixin, Renderer):
 
     def paging_url_first(self):
         """Generate a URL for the first page of the grid."""
+        if self.grid.uses_keyset_paging:
+            return self.current_url(cursor=None, perpage=self.grid.per_page)
         return self.current_url(onpage=1, perpage=self.grid.per_page)
 
     def _page_image(self, url, width, height, alt):
@@ -780,6 +947,8 @@ class HTML(GroupMixin, Renderer):
 
     def paging_url_prev(self):
         """Generate a URL for the previous page of the grid."""
+        if self.grid.uses_keyset_paging:
+            return self.current_url(cursor=self.grid.cursor_prev, perpage=self.grid.per_page)
         prev_page = self.grid.on_page - 1
         return self.current_url(onpage=prev_page, perpage=self.grid.per_page)
 
@@ -795,6 +964,8 @@ class HTML(GroupMixin, Renderer):
 
     def paging_url_next(self):
         """Generate a URL for the next page of the grid."""
+        if self.grid.uses_keyset_paging:
+            return self.current_url(cursor=self.grid.cursor_next, perpage=self.grid.per_page)
         next_page = self.grid.on_page + 1
         return self.current_url(onpage=next_page, perpage=self.grid.per_page)
 
@@ -810,6 +981,8 @@ class HTML(GroupMixin, Renderer):
 
     def paging_url_last(self):
         """Generate a URL for the last page of the grid."""
+        if self.grid.uses_keyset_paging:
+            return self.current_url(cursor=self.grid.cursor_last, perpage=self.grid.per_page)
         return self.current_url(onpage=self.grid.page_count, perpage=self.grid.per_page)
 
     def paging_img_last(self):
@@ -919,6 +1092,8 @@ class HTML(GroupMixin, Renderer):
         """Combine rows rendered from grid records, return as Markup.
 
         Page/Grand totals are included here as rows if enabled in the grid."""
+        # column attributes may have changed since the last render
+        self._td_attrs_cache = {}
         rows = []
         # loop through rows
         for rownum, record in enumerate(self.grid.records):
@@ -961,15 +1136,14 @@ class HTML(GroupMixin, Renderer):
     def table_tr_output(self, cells, row_hah):
         """Combine rendered cells and output a TR tag."""
         # do some formatting so that the source code is properly indented
-        tds_str = '\n'.join(cells)
-        tds_str = reindent(tds_str, 12)
+        if all(cells) and not any(_line_break_re.search(cell) for cell in cells):
+            # same result as reindent, which is only needed for multi-line cells
+            tds_str = '\n'.join(f'            {cell.strip()}' for cell in cells)
+        else:
+            tds_str = reindent('\n'.join(cells), 12)
         tds_str = f'\n{tds_str}\n        '
 
-        return self._render_jinja(
-            '<tr{{attrs|wg_attributes}}>{{tds}}</tr>',
-            attrs=row_hah,
-            tds=Markup(tds_str),
-        )
+        return Markup('<tr{}>{}</tr>').format(render_html_attributes(row_hah), Markup(tds_str))
 
     def table_tr(self, rownum, record):
         """Generate rendered cells and pass to table_tr_output for rendered result."""
@@ -1035,16 +1209,19 @@ class HTML(GroupMixin, Renderer):
         Value is obtained for render from the grid column's `render` method. To
         override how a column's data is rendered specifically for HTML, supply a
         `render_html` method on the column."""
-        col_hah = HTMLAttributes(col.body.hah)
+        attrs = self._static_td_attrs(col)
+        if attrs is None:
+            col_hah = HTMLAttributes(col.body.hah)
 
-        # allow column stylers to set attributes
-        for styler, cname in self.grid._colstylers:
-            for_column = self.grid.column(cname)
-            if col.key == for_column.key:
+            # allow column stylers to set attributes
+            for styler in self.grid._column_stylers(col):
                 styler(self.grid, col_hah, record)
 
-        # extract the value from the record for this column and prep
-        col_value = col.render('html', record, col_hah)
+            # extract the value from the record for this column and prep
+            col_value = col.render('html', record, col_hah)
+            attrs = render_html_attributes(col_hah)
+        else:
+            col_value = col.render('html', record)
 
         # turn empty values into a non-breaking space so table cells don't
         # collapse
@@ -1055,11 +1232,18 @@ class HTML(GroupMixin, Renderer):
         else:
             styled_value = col_value
 
-        return self._render_jinja(
-            '<td{{attrs|wg_attributes}}>{{value}}</td>',
-            attrs=col_hah,
-            value=styled_value,
-        )
+        return Markup('<td{}>{}</td>').format(attrs, styled_value)
+
+    def _static_td_attrs(self, col):
+        """Rendered attributes shared by all of a column's cells, if they cannot vary by record.
+
+        That is the case when no column styler targets the column, and the column has no
+        `render_html` (which is given the attributes to modify). Otherwise, returns None.
+        """
+        if col.key not in self._td_attrs_cache:
+            static = not hasattr(col, 'render_html') and not self.grid._column_stylers(col)
+            self._td_attrs_cache[col.key] = render_html_attributes(col.body.hah) if static else None
+        return self._td_attrs_cache[col.key]
 
     def footer(self):
         """Render the grid footer area from template."""
@@ -1286,6 +1470,29 @@ class XLSXWriterWorkbookManager:
         xlh.awrite(fix_xls_value(value), style)
 
 
+class XLSXWriterStreamingWorkbookManager(XLSXWriterWorkbookManager):
+    """xlsxwriter workbook manager for exports too large to hold in memory.
+
+    The workbook uses xlsxwriter's ``constant_memory`` mode, in which each row is flushed
+    to disk as soon as a later row is written, and the finished file is assembled in an
+    anonymous temporary file rather than a memory buffer.
+
+    Because rows cannot be revisited in this mode, merged cells are not available. Group
+    headings and the totals label are written to the first cell of their span instead.
+    """
+
+    def create_workbook(self):
+        # file is handed off to the response, which closes (and thereby removes) it
+        buf = tempfile.TemporaryFile()  # noqa: SIM115
+        return xlsxwriter.Workbook(buf, options={'constant_memory': True})
+
+    def merged_totals_cell(self, xlh, value, style, colspan):
+        xlh.ws.write(xlh.rownum, xlh.colnum, value, style)
+
+    def merged_heading_cell(self, xlh, value, style, col_index, colspan):
+        xlh.ws.write(0, col_index, value, style)
+
+
 class OpenpyxlWorkbookManager:
     def __init__(self, *args, **kwargs):
         self._workbook = openpyxl.Workbook()
@@ -1423,9 +1630,16 @@ class OpenpyxlWorkbookManager:
 
 
 class XLSX(GroupMixin, Renderer):
-    """Renderer for Excel XLSX output."""
+    """Renderer for Excel XLSX output.
+
+    Class Attributes:
+        stream_batch_size (int): When set, records are fetched in batches of this many rows
+        and, if xlsxwriter is installed, written through `XLSXWriterStreamingWorkbookManager`
+        so that neither the records nor the worksheet are held in memory. Default None.
+    """
 
     mime_type = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    stream_batch_size = None
 
     def __init__(self, grid):
         self._manager_cls = None
@@ -1445,6 +1659,8 @@ class XLSX(GroupMixin, Renderer):
     def create_workbook(self):
         if self._manager_cls:
             return self._manager_cls()
+        if self.stream_batch_size and xlsxwriter:
+            return XLSXWriterStreamingWorkbookManager()
         if openpyxl:
             return OpenpyxlWorkbookManager()
         if xlsxwriter:
@@ -1563,6 +1779,9 @@ class XLSX(GroupMixin, Renderer):
     def body_records(self, xlh, wb):
         """Render records and totals rows.
 
+        Records are rendered a batch at a time through the columns' `render_batch` methods,
+        unless `record_row` is overridden, in which case it is called for each record.
+
         Args:
             xlh (WriterX): Helper for writing worksheet cells.
             wb (Workbook): xlsxwriter Workbook object for direct usage.
@@ -1570,9 +1789,22 @@ class XLSX(GroupMixin, Renderer):
         # turn off paging
         self.grid.set_paging(None, None)
 
+        if self.stream_batch_size:
+            records = self.grid.iter_records(self.stream_batch_size)
+        else:
+            records = self.grid.records
+
         rownum = 0
-        for rownum, record in enumerate(self.grid.records):
-            self.record_row(xlh, rownum, record, wb)
+        if type(self).record_row is not XLSX.record_row:
+            for rownum, record in enumerate(records):
+                self.record_row(xlh, rownum, record, wb)
+        else:
+            batch_size = self.stream_batch_size or 1000
+            for values in self.rendered_rows(records, batch_size):
+                self.write_row(xlh, values, wb)
+                rownum += 1
+            # leave rownum at the last record's index, as the loop above does
+            rownum = max(rownum - 1, 0)
 
         # totals
         if rownum and self.grid.subtotals != 'none' and self.grid.subtotal_cols:
@@ -1591,8 +1823,17 @@ class XLSX(GroupMixin, Renderer):
             record (Any): Object containing row data.
             wb (Workbook): xlsxwriter Workbook object for direct usage.
         """
-        for col in self.columns:
-            value = col.render('xlsx', record)
+        self.write_row(xlh, [col.render('xlsx', record) for col in self.columns], wb)
+
+    def write_row(self, xlh, values, wb):
+        """Write a row of rendered values, one per column.
+
+        Args:
+            xlh (WriterX): Helper for writing worksheet cells.
+            values (Sequence): Rendered values, in the order of `columns`.
+            wb (Workbook): xlsxwriter Workbook object for direct usage.
+        """
+        for col, value in zip(self.columns, values, strict=True):
             style = wb.style_for_column(col)
             xlh.awrite(fix_xls_value(value), style)
             self.update_column_width(col, value)
@@ -1642,17 +1883,25 @@ class XLSX(GroupMixin, Renderer):
 
     def as_response(self, wb=None, sheet_name=None):
         """Return an attachment file via the grid's manager."""
-        wb = self.build_sheet(wb, sheet_name)
-        if not wb.fileclosed:
-            wb.close()
+        with self.rendering():
+            wb = self.build_sheet(wb, sheet_name)
+            if not wb.fileclosed:
+                wb.close()
         wb.filename.seek(0)
         return self.grid.manager.file_as_response(wb.filename, self.file_name(), self.mime_type)
 
 
 class CSV(Renderer):
-    """Renderer for CSV output."""
+    """Renderer for CSV output.
+
+    Class Attributes:
+        stream_batch_size (int): When set, `as_response` streams the export rather than
+        building it in memory. Records are fetched in batches of this many rows, and each
+        batch is encoded and sent as one chunk of the response. Default None.
+    """
 
     mime_type = 'text/csv'
+    stream_batch_size = None
 
     @property
     def name(self):
@@ -1680,6 +1929,51 @@ class CSV(Renderer):
         byte_data.write(self.output.getvalue().encode('utf-8'))
         return byte_data
 
+    def iter_csv(self, batch_size=None):
+        """Render grid output as CSV, yielding UTF-8 encoded chunks.
+
+        Records are streamed from the database via the grid's `iter_records`, so only one
+        batch of rows is held in memory at a time.
+
+        Args:
+            batch_size (int, optional): Rows per fetch and per yielded chunk. Defaults to
+            `stream_batch_size`, or 1000 if that is not set.
+
+        Yields:
+            bytes: Encoded CSV content.
+        """
+        # time the render like `rendering` does, leaving out time spent sending chunks
+        elapsed = 0
+        t0 = time.perf_counter()
+        batch_size = batch_size or self.stream_batch_size or 1000
+        self.output = six.StringIO()
+        self.writer = csv.writer(self.output, delimiter=',', quotechar='"')
+        self.body_headings()
+
+        # turn off paging
+        self.grid.set_paging(None, None)
+
+        with self.render_target():
+            rows = self.rendered_rows(self.grid.iter_records(batch_size), batch_size)
+            for rownum, row in enumerate(rows, start=1):
+                self.writer.writerow(row)
+                if rownum % batch_size == 0:
+                    chunk = self.flush_output()
+                    elapsed += time.perf_counter() - t0
+                    yield chunk
+                    t0 = time.perf_counter()
+            chunk = self.flush_output()
+        elapsed += time.perf_counter() - t0
+        self.grid.record_timing(f'render_{self.name}', elapsed)
+        yield chunk
+
+    def flush_output(self):
+        """Return buffered CSV content as bytes and empty the buffer."""
+        chunk = self.output.getvalue().encode('utf-8')
+        self.output.seek(0)
+        self.output.truncate()
+        return chunk
+
     def body_headings(self):
         """Render the column headers.
 
@@ -1693,20 +1987,25 @@ class CSV(Renderer):
     def body_records(self):
         """Render all rows from grid records.
 
-        Value is obtained for render from each grid column's `render` method. To
-        override how a column's data is rendered specifically for CSV, supply a
-        `render_csv` method on the column."""
+        Values are obtained a batch of records at a time from each grid column's
+        `render_batch` method. To override how a column's data is rendered specifically
+        for CSV, supply a `render_csv` method on the column."""
         # turn off paging
         self.grid.set_paging(None, None)
 
-        for record in self.grid.records:
-            row = []
-            for col in self.columns:
-                row.append(col.render('csv', record))
-            self.writer.writerow(row)
+        self.writer.writerows(self.rendered_rows(self.grid.records))
 
     def as_response(self):
-        """Return an attachment file via the grid's manager."""
-        buffer = self.build_csv()
+        """Return an attachment file via the grid's manager.
+
+        If `stream_batch_size` is set, the response body is a generator of CSV chunks."""
+        if self.stream_batch_size:
+            return self.grid.manager.file_as_response(
+                self.iter_csv(),
+                self.file_name(),
+                self.mime_type,
+            )
+        with self.rendering():
+            buffer = self.build_csv()
         buffer.seek(0)
         return self.grid.manager.file_as_response(buffer, self.file_name(), self.mime_type)
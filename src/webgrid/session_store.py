@@ -0,0 +1,324 @@
+"""Storage for grid sessions, the args a grid keeps between requests.
+
+A store holds JSON-serialized args by session key, for the user of the current request.
+`WebSessionStore` keeps them in the web session itself. The other stores keep them on the
+server, and put only an opaque id in the web session, which keeps cookie sessions small.
+
+Assign a store to the manager's ``session_store``::
+
+    class Grid(BaseGrid):
+        manager = WebGrid(session_store=MemorySessionStore())
+"""
+
+from abc import ABC, abstractmethod
+import datetime as dt
+import json
+import os
+from pathlib import Path
+import secrets
+import tempfile
+import threading
+import time
+
+import sqlalchemy as sa
+
+from .cache import LRUCache, make_key
+
+
+def _utcnow():
+    # naive UTC, as stored in the table's DateTime column
+    return dt.datetime.now(dt.timezone.utc).replace(tzinfo=None)
+
+
+class GridSessionStore(ABC):
+    """Base class for grid session storage.
+
+    One store serves every request to a manager. Methods are given the manager, to reach the
+    current request's web session.
+    """
+
+    @abstractmethod
+    def get(self, manager, session_key):
+        """Return the value stored under `session_key`, or None."""
+
+    @abstractmethod
+    def set(self, manager, session_key, value):
+        """Store `value` under `session_key`."""
+
+    @abstractmethod
+    def delete(self, manager, session_key):
+        """Drop the value stored under `session_key`. Missing keys are ignored."""
+
+    @abstractmethod
+    def keys(self, manager):
+        """Return the session keys having stored values."""
+
+
+class WebSessionStore(GridSessionStore):
+    """Keeps grid sessions in the web session, under "dgsessions". The default store."""
+
+    def _sessions(self, manager):
+        web_session = manager.web_session()
+        if 'dgsessions' not in web_session:
+            web_session['dgsessions'] = {}
+        return web_session['dgsessions']
+
+    def get(self, manager, session_key):
+        return manager.web_session().get('dgsessions', {}).get(session_key)
+
+    def set(self, manager, session_key, value):
+        self._sessions(manager)[session_key] = value
+        # some frameworks/sessions need these changes manually persisted
+        manager.persist_web_session()
+
+    def delete(self, manager, session_key):
+        sessions = self._sessions(manager)
+        if session_key in sessions:
+            sessions.pop(session_key)
+            manager.persist_web_session()
+
+    def keys(self, manager):
+        return tuple(manager.web_session().get('dgsessions', {}).keys())
+
+
+class ServerSessionStore(GridSessionStore):
+    """Base class for stores keeping grid sessions on the server.
+
+    The web session holds only a random id under "dgsession_id", created when a grid
+    session is first stored. Subclasses implement `read`, `write`, `remove` and `stored_keys`
+    by that id.
+    """
+
+    id_key = 'dgsession_id'
+
+    def session_id(self, manager, create=False):
+        """Return the id for the current web session's grid sessions, or None if not set."""
+        web_session = manager.web_session()
+        sid = web_session.get(self.id_key)
+        if sid is None and create:
+            sid = secrets.token_urlsafe(24)
+            web_session[self.id_key] = sid
+            manager.persist_web_session()
+        return sid
+
+    def get(self, manager, session_key):
+        sid = self.session_id(manager)
+        return None if sid is None else self.read(sid, session_key)
+
+    def set(self, manager, session_key, value):
+        self.write(self.session_id(manager, create=True), session_key, value)
+
+    def delete(self, manager, session_key):
+        sid = self.session_id(manager)
+        if sid is not None:
+            self.remove(sid, session_key)
+
+    def keys(self, manager):
+        sid = self.session_id(manager)
+        return () if sid is None else self.stored_keys(sid)
+
+    @abstractmethod
+    def read(self, sid, session_key):
+        """Return the value stored for `sid` under `session_key`, or None."""
+
+    @abstractmethod
+    def write(self, sid, session_key, value):
+        """Store `value` for `sid` under `session_key`."""
+
+    @abstractmethod
+    def remove(self, sid, session_key):
+        """Drop the value stored for `sid` under `session_key`, if any."""
+
+    @abstractmethod
+    def stored_keys(self, sid):
+        """Return the session keys having values stored for `sid`."""
+
+
+class MemorySessionStore(ServerSessionStore):
+    """Keeps grid sessions in process memory.
+
+    Sessions are lost on restart and not shared between processes, so this suits a single
+    process server, or sticky sessions.
+
+    Args:
+        maxsize (int, optional): Most web sessions to hold grid sessions for. The least
+        recently used are dropped first. Default 10000.
+        ttl (float, optional): Seconds a web session's grid sessions are kept after last
+        being stored. Default None (no expiry).
+    """
+
+    def __init__(self, maxsize=10000, ttl=None):
+        self.cache = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def read(self, sid, session_key):
+        return (self.cache.get(sid) or {}).get(session_key)
+
+    def write(self, sid, session_key, value):
+        with self._lock:
+            # copy on write, so readers never see a dict being changed
+            self.cache.set(sid, {**(self.cache.get(sid) or {}), session_key: value})
+
+    def remove(self, sid, session_key):
+        with self._lock:
+            sessions = self.cache.get(sid)
+            if sessions and session_key in sessions:
+                sessions = {key: value for key, value in sessions.items() if key != session_key}
+                self.cache.set(sid, sessions)
+
+    def stored_keys(self, sid):
+        return tuple(self.cache.get(sid) or ())
+
+
+class SQLAlchemySessionStore(ServerSessionStore):
+    """Keeps grid sessions in a database table, one row per grid session.
+
+    The store uses its own connections from `engine`, so application transactions are not
+    affected. Call `create_table` to create the table if needed, or include `metadata` in the
+    application's migrations.
+
+    Args:
+        engine (sqlalchemy.engine.Engine): Engine for the database holding the table.
+        table_name (str, optional): Default "webgrid_sessions".
+        metadata (sqlalchemy.MetaData, optional): Metadata to define the table in. Default is
+        a new instance.
+    """
+
+    def __init__(self, engine, table_name='webgrid_sessions', metadata=None):
+        self.engine = engine
+        self.metadata = metadata if metadata is not None else sa.MetaData()
+        self.table = sa.Table(
+            table_name,
+            self.metadata,
+            sa.Column('session_id', sa.String(64), primary_key=True),
+            sa.Column('session_key', sa.String(255), primary_key=True),
+            sa.Column('args', sa.Text, nullable=False),
+            sa.Column('updated_at', sa.DateTime, nullable=False, index=True),
+        )
+
+    def create_table(self):
+        self.table.create(self.engine, checkfirst=True)
+
+    def _row_clause(self, sid, session_key):
+        return sa.and_(self.table.c.session_id == sid, self.table.c.session_key == session_key)
+
+    def read(self, sid, session_key):
+        with self.engine.connect() as conn:
+            return conn.scalar(
+                sa.select(self.table.c.args).where(self._row_clause(sid, session_key)),
+            )
+
+    def _update(self, sid, session_key, value):
+        with self.engine.begin() as conn:
+            result = conn.execute(
+                self.table.update()
+                .where(self._row_clause(sid, session_key))
+                .values(args=value, updated_at=_utcnow()),
+            )
+            return result.rowcount > 0
+
+    def write(self, sid, session_key, value):
+        # update first, so concurrent requests for a web session never find the row missing
+        if self._update(sid, session_key, value):
+            return
+        try:
+            with self.engine.begin() as conn:
+                conn.execute(
+                    self.table.insert().values(
+                        session_id=sid,
+                        session_key=session_key,
+                        args=value,
+                        updated_at=_utcnow(),
+                    ),
+                )
+        except sa.exc.IntegrityError:
+            # another request inserted the row since our update
+            self._update(sid, session_key, value)
+
+    def remove(self, sid, session_key):
+        with self.engine.begin() as conn:
+            conn.execute(self.table.delete().where(self._row_clause(sid, session_key)))
+
+    def stored_keys(self, sid):
+        with self.engine.connect() as conn:
+            return tuple(
+                conn.scalars(
+                    sa.select(self.table.c.session_key).where(self.table.c.session_id == sid),
+                ),
+            )
+
+    def purge(self, max_hours):
+        """Delete grid sessions not stored within `max_hours`, for all web sessions.
+
+        Web sessions that are never used again leave their rows behind, so run this
+        periodically.
+        """
+        cutoff = _utcnow() - dt.timedelta(hours=max_hours)
+        with self.engine.begin() as conn:
+            conn.execute(self.table.delete().where(self.table.c.updated_at < cutoff))
+
+
+class FileSessionStore(ServerSessionStore):
+    """Keeps grid sessions in files, one JSON file per web session.
+
+    Files are replaced atomically, but concurrent writes for the same web session from
+    several processes may lose one of the changes.
+
+    Args:
+        directory (str or Path): Directory for the files, created if missing.
+    """
+
+    def __init__(self, directory):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _path(self, sid):
+        # the id comes from the web session, so never use it in a path directly
+        return self.directory / f'{make_key(sid)}.json'
+
+    def _read_all(self, sid):
+        try:
+            with self._path(sid).open(encoding='utf-8') as fp:
+                return json.load(fp)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write_all(self, sid, sessions):
+        path = self._path(sid)
+        if not sessions:
+            path.unlink(missing_ok=True)
+            return
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w', encoding='utf-8') as fp:
+            json.dump(sessions, fp)
+        Path(temp_path).replace(path)
+
+    def read(self, sid, session_key):
+        return self._read_all(sid).get(session_key)
+
+    def write(self, sid, session_key, value):
+        with self._lock:
+            sessions = self._read_all(sid)
+            sessions[session_key] = value
+            self._write_all(sid, sessions)
+
+    def remove(self, sid, session_key):
+        with self._lock:
+            sessions = self._read_all(sid)
+            if sessions.pop(session_key, None) is not None:
+                self._write_all(sid, sessions)
+
+    def stored_keys(self, sid):
+        return tuple(self._read_all(sid))
+
+    def purge(self, max_hours):
+        """Delete files of web sessions not stored within `max_hours`.
+
+        Web sessions that are never used again leave their files behind, so run this
+        periodically.
+        """
+        cutoff = time.time() - max_hours * 3600
+        for path in self.directory.glob('*.json'):
+            if path.stat().st_mtime < cutoff:
+                path.unlink(missing_ok=True)
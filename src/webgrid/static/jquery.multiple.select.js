@@ -51,6 +51,7 @@ if (typeof _ === "undefined") {
             });
         }
 
+        this.name = name;
         this.selectAllName = 'name="selectAll' + name + '"';
         this.selectGroupName = 'name="selectGroup' + name + '"';
         this.selectItemName = 'name="selectItem' + name + '"';
@@ -72,6 +73,12 @@ if (typeof _ === "undefined") {
             this.events();
             this.update();
 
+            if (this.options.remoteUrl) {
+                this.remoteOffset = 0;
+                this.remoteHasMore = true;
+                this.remoteLoaded = false;
+            }
+
             if (this.options.isOpen) {
                 this.open();
             }
@@ -97,6 +104,14 @@ if (typeof _ === "undefined") {
             this.$searchInput.off('keyup').on('keyup', function() {
                 that.filter();
             });
+            if (this.options.remoteUrl) {
+                this.$drop.find('ul').off('scroll').on('scroll', function() {
+                    // load the next page when scrolled near the bottom
+                    if (this.scrollTop + this.clientHeight >= this.scrollHeight - 20) {
+                        that.remoteSearch(true);
+                    }
+                });
+            }
             this.$selectAll.off('click').on('click', function() {
                 var checked = $(this).prop('checked'),
                     $items = that.$selectItems.filter(':visible');
@@ -143,6 +158,9 @@ if (typeof _ === "undefined") {
             this.$choice.find('>div').addClass('open');
             this.$drop.find('input').show();
             this.$drop.show();
+            if (this.options.remoteUrl && !this.remoteLoaded) {
+                this.remoteSearch(false);
+            }
             if (this.options.container) {
                 var offset = this.$drop.offset();
                 this.$drop.appendTo($(this.options.container));
@@ -290,9 +308,72 @@ if (typeof _ === "undefined") {
             this.init();
         },
 
+        /*
+         Load options matching the search text from the server, for selects having
+         a data-remote-url. A new search replaces the unchecked options, while
+         `append` loads the next page of the current search.
+         */
+        remoteSearch: function(append) {
+            var that = this,
+                offset = append ? this.remoteOffset : 0;
+            if (append && (!this.remoteHasMore || this.remoteRequest)) {
+                return;
+            }
+            if (this.remoteRequest) {
+                this.remoteRequest.abort();
+            }
+            this.remoteLoaded = true;
+            this.remoteRequest = $.getJSON(this.options.remoteUrl, {
+                q: $.trim(this.$searchInput.val()),
+                offset: offset,
+                limit: this.options.remotePageSize
+            }, function(data) {
+                that.remoteRequest = null;
+                that.remoteOffset = offset + data.options.length;
+                that.remoteHasMore = data.more;
+                that.setRemoteOptions(data.options, append);
+            });
+        },
+
+        setRemoteOptions: function(options, append) {
+            var that = this,
+                selector = 'input[' + this.selectItemName + ']';
+            if (!append) {
+                // checked options stay, so selections survive a new search
+                this.$drop.find(selector + ':not(:checked)').closest('li').remove();
+            }
+            $.each(options, function(i, option) {
+                var value = option.key,
+                    is_value = function() { return this.value === value; };
+                if (that.$drop.find(selector).filter(is_value).length) {
+                    return;
+                }
+                var $input = $('<input type="checkbox" />')
+                    .attr('name', 'selectItem' + that.name)
+                    .val(value);
+                $('<li></li>').append(
+                    $('<label></label>').append($input, ' ', document.createTextNode(option.label))
+                ).insertBefore(that.$noResults);
+                if (!that.$el.find('option').filter(is_value).length) {
+                    that.$el.append($('<option></option>').val(value).text(option.label));
+                }
+            });
+            this.$selectItems = this.$drop.find(selector + ':enabled');
+            this.events();
+            this.$selectAll.parent()[this.$selectItems.length ? 'show' : 'hide']();
+            this.$noResults[this.$selectItems.length ? 'hide' : 'show']();
+            this.updateSelectAll();
+        },
+
         filter: function() {
             var that = this,
                 text = $.trim(this.$searchInput.val()).toLowerCase();
+            if (this.options.remoteUrl) {
+                // let the server match options, once typing pauses
+                clearTimeout(this.remoteTimer);
+                this.remoteTimer = setTimeout(function() { that.remoteSearch(false); }, 250);
+                return;
+            }
             if (text.length === 0) {
                 this.$selectItems.parent().show();
                 this.$disableItems.parent().show();
@@ -379,6 +460,8 @@ if (typeof _ === "undefined") {
         container: null,
         position: 'bottom',
         keepOpen: false,
+        remoteUrl: null,
+        remotePageSize: 50,
 
         styler: function() {return false;},
 
@@ -23,14 +23,16 @@ function datagrid_on_doc_ready() {
     $('.datagrid .filters .operator select').change(datagrid_on_operator_change);
     $('.datagrid .filters .add-filter select').change(datagrid_add_filter);
 
-    $('.inputs1 select').change(function() {
-        $(this).siblings('input').val($(this).val());
-    });
+    $('.inputs1 select').change(datagrid_copy_select_to_input);
     $('.datagrid .export-link').click(verify_export);
     $('.datagrid form.header').submit(datagrid_cleanup_before_form_submission);
     _datagrid_is_loaded = true;
 }
 
+function datagrid_copy_select_to_input() {
+    $(this).siblings('input').val($(this).val());
+}
+
 /*
  datagrid_activate_mselect_ui()
 
@@ -117,6 +119,13 @@ function datagrid_activate_filter(filter_key) {
     // Added _filter to address CSS collision with Bootstrap
     // Ref: https://github.com/level12/webgrid/issues/28
     var jq_tr = $('.datagrid .filters tr.' + filter_key+ "_filter");
+    var filter_url = $('.datagrid table.filters').data('filter-url');
+
+    if (jq_tr.length == 0 && filter_url) {
+        // the grid only rendered active filters, fetch this one's row first
+        datagrid_load_filter(filter_url, filter_key);
+        return;
+    }
 
     if (_datagrid_is_loaded) {
         // move user-selected filter to the end of the list, so it shows up right where it was selected
@@ -141,6 +150,28 @@ function datagrid_activate_filter(filter_key) {
     jq_option.attr('disabled', 'disabled');
 }
 
+/*
+ datagrid_load_filter()
+
+ Called for grids rendering filters lazily, when a filter is added that was not
+ rendered with the page. Fetches the filter's row of controls from the grid
+ manager, sets it up like the rows prepared on page load, and activates it.
+
+*/
+function datagrid_load_filter(filter_url, filter_key) {
+    $.get(filter_url, {key: filter_key}, function(row_html) {
+        var jq_tr = $($.parseHTML($.trim(row_html))).filter('tr');
+        if (jq_tr.length == 0) {
+            return;
+        }
+        jq_tr.hide().appendTo('.datagrid .filters tbody');
+        jq_tr.find('.operator select').change(datagrid_on_operator_change);
+        jq_tr.find('.inputs1 select').change(datagrid_copy_select_to_input);
+        datagrid_toggle_filter_inputs(jq_tr);
+        datagrid_activate_filter(filter_key);
+    });
+}
+
 /*
  datagrid_on_operator_change()
 
@@ -2,6 +2,8 @@
 A collection of utilities for testing webgrid functionality in client applications
 """
 
+from collections import Counter
+import contextlib
 import re
 from unittest import mock
 import urllib
@@ -138,6 +140,96 @@ def assert_not_in_query(obj, test_for):
     assert test_for not in query_str, query_str
 
 
+def statement_shape(statement):
+    """Normalize SQL text so that statements differing only in literals/params compare equal.
+
+    Whitespace is collapsed, literal numbers and strings become placeholders, and lists of
+    placeholders (e.g. from expanding IN params) collapse to a single one.
+    """
+    shape = re.sub(r'\s+', ' ', statement).strip()
+    shape = re.sub(r"'(?:[^']|'')*'", '?', shape)
+    shape = re.sub(r'\b\d+(?:\.\d+)?\b', '?', shape)
+    shape = re.sub(r'(?:%\(\w+\)s|:\w+|%s|\?)', '?', shape)
+    return re.sub(r'\?(?:\s*,\s*\?)+', '?', shape)
+
+
+class QueryRecorder:
+    """Context manager recording the SQL statements executed within its block.
+
+    Statements are captured through SQLAlchemy's ``before_cursor_execute`` engine event, so
+    everything sent to the database is included: grid count/data/totals queries, options
+    queries, and lazy loads triggered while rendering.
+
+    Args:
+        bind (Engine or Connection, optional): Only record statements run on this engine or
+        connection. Default records statements on all engines.
+
+    Attributes:
+        statements (list(str)): SQL text of the recorded statements, in order.
+    """
+
+    def __init__(self, bind=None):
+        self.target = bind if bind is not None else sqlalchemy.engine.Engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        self.statements = []
+        sqlalchemy.event.listen(self.target, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        sqlalchemy.event.remove(self.target, 'before_cursor_execute', self._record)
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def duplicates(self):
+        """Return (shape, count) pairs for statement shapes run more than once.
+
+        Repeated shapes are the usual sign of an N+1 pattern, such as a column touching a
+        lazy-loaded relationship for every record.
+        """
+        counts = Counter(statement_shape(statement) for statement in self.statements)
+        return [(shape, count) for shape, count in counts.most_common() if count > 1]
+
+    def report(self):
+        """Describe the recorded statements, duplicate shapes first, for assertion messages."""
+        lines = [f'{self.count} statement(s) executed.']
+        duplicates = self.duplicates()
+        if duplicates:
+            lines.append('Repeated statements:')
+            lines.extend(f'  {count}x {shape}' for shape, count in duplicates)
+        lines.append('Statements:')
+        lines.extend(
+            f'  {index}. {statement_shape(statement)}'
+            for index, statement in enumerate(self.statements, start=1)
+        )
+        return '\n'.join(lines)
+
+
+@contextlib.contextmanager
+def assert_max_queries(max_queries, bind=None):
+    """Context manager asserting its block runs at most `max_queries` SQL statements.
+
+    Args:
+        max_queries (int): Statement budget for the block.
+        bind (Engine or Connection, optional): Only count statements on this engine or
+        connection. Default counts all engines.
+
+    Yields:
+        QueryRecorder: Recorder holding the statements run so far.
+    """
+    with QueryRecorder(bind) as recorder:
+        yield recorder
+    assert recorder.count <= max_queries, (
+        f'Expected at most {max_queries} statement(s). {recorder.report()}'
+    )
+
+
 def assert_list_equal(list1, list2):
     """
     A list-specific equality assertion.
@@ -227,11 +319,15 @@ class GridBase:
 
         sort_tests: Iterable of (name, expected) tuples to check for sort logic. `name` is
         the column key. `expected` is a SQL string to find when the sort is enabled.
+
+        max_queries: Most SQL statements the grid may run to render HTML with default args.
+        Checked by `test_max_queries` when set. Default None (no budget).
     """
 
     grid_cls = None
     filters = ()
     sort_tests = ()
+    max_queries = None
 
     @classmethod
     def setup_class(cls):
@@ -414,6 +510,84 @@ class GridBase:
             self.check_sort(col, expect, True)
             self.check_sort(col, expect, False)
 
+    def record_queries(self, grid=None, export_to=None, _query_string=None, **kwargs):
+        """Render the grid and return a `QueryRecorder` holding the statements it ran.
+
+        The grid is built before recording starts, so the recorded statements are those run
+        by the render itself.
+
+        Args:
+            grid (BaseGrid, optional): Grid to use instead of `self.get_session_grid`.
+            Defaults to None.
+
+            export_to (str, optional): Export target to render, e.g. "xlsx" or "csv".
+            Default renders HTML.
+
+            kwargs (dict, optional): Additional args passed to `self.get_session_grid`.
+
+        Returns:
+            QueryRecorder
+        """
+        grid = grid or self.get_session_grid(_query_string=_query_string, **kwargs)
+        if export_to:
+            grid.set_export_to(export_to)
+
+        def render():
+            result = grid.export_as_response() if export_to else grid.html()
+            if hasattr(result, 'response'):
+                # consume streamed responses, so their queries run while recording
+                for _chunk in result.response:
+                    pass
+
+        with QueryRecorder() as recorder:
+            if grid.manager.request():
+                # request context already exists
+                render()
+            else:
+                url = f'/?{_query_string}' if _query_string else '/'
+                with grid.manager.test_request_context(url=url):
+                    render()
+        return recorder
+
+    def assert_max_queries(
+        self,
+        max_queries,
+        grid=None,
+        export_to=None,
+        _query_string=None,
+        **kwargs,
+    ):
+        """Verify rendering the grid runs at most `max_queries` SQL statements.
+
+        On failure, the message lists the statements run, with repeated statement shapes
+        (likely N+1 queries) first.
+
+        Args:
+            max_queries (int): Statement budget for the render.
+
+            grid (BaseGrid, optional): Grid to use instead of `self.get_session_grid`.
+            Defaults to None.
+
+            export_to (str, optional): Export target to render, e.g. "xlsx" or "csv".
+            Default renders HTML.
+
+            kwargs (dict, optional): Additional args passed to `self.get_session_grid`.
+        """
+        recorder = self.record_queries(
+            grid,
+            export_to=export_to,
+            _query_string=_query_string,
+            **kwargs,
+        )
+        assert recorder.count <= max_queries, (
+            f'Expected at most {max_queries} statement(s). {recorder.report()}'
+        )
+
+    def test_max_queries(self):
+        """Use max_queries attribute to assert the HTML render's statement budget."""
+        if self.max_queries is not None:
+            self.assert_max_queries(self.max_queries)
+
     def _compare_table_block(self, block_selector, tag, expect):
         print(block_selector)
         assert len(block_selector) == len(expect)
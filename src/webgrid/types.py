@@ -24,12 +24,15 @@ class Paging:
     pager_on: bool = False
     per_page: int | None = None
     on_page: int | None = None
+    cursor: str | None = None
 
     def __post_init__(self):
         if self.per_page is not None and not isinstance(self.per_page, int):
             raise FieldValidationError('per_page', self.per_page, 'int')
         if self.on_page is not None and not isinstance(self.on_page, int):
             raise FieldValidationError('on_page', self.on_page, 'int')
+        if self.cursor is not None and not isinstance(self.cursor, str):
+            raise FieldValidationError('cursor', self.cursor, 'str')
 
 
 @dataclass
@@ -118,6 +121,9 @@ class GridSettings:
             'export_to': self.export_to,
         }
 
+        if self.paging.cursor:
+            args['cursor'] = self.paging.cursor
+
         for key, filter_ in self.filters.items():
             args[f'op({key})'] = filter_.op
             args[f'v1({key})'] = filter_.value1
@@ -148,6 +154,10 @@ class GridState:
     page_count: int
     record_count: int
     warnings: list[str]
+    record_count_is_approximate: bool = False
+    cursor_prev: str | None = None
+    cursor_next: str | None = None
+    timings: dict[str, float] | None = None
 
 
 @dataclass
@@ -1,3 +1,10 @@
+import base64
+import binascii
+import datetime as dt
+import decimal
+import json
+
+
 def current_url(
     manager,
     root_only=False,
@@ -50,3 +57,76 @@ def current_url(
             retval = retval.replace('https://', 'http://', 1)
 
     return retval
+
+
+_cursor_value_types = (
+    ('dt', dt.datetime, dt.datetime.fromisoformat),
+    ('d', dt.date, dt.date.fromisoformat),
+    ('t', dt.time, dt.time.fromisoformat),
+    ('n', decimal.Decimal, decimal.Decimal),
+)
+
+
+def lookup_set(values):
+    """Frozen set of `values` for membership tests, or `values` itself if any are unhashable."""
+    try:
+        return frozenset(values)
+    except TypeError:
+        return values
+
+
+def encode_cursor(direction, sort_signature, values=()):
+    """Pack keyset paging state into an opaque, URL-safe string.
+
+    Args:
+        direction (str): Paging direction the cursor represents (e.g. "next", "prev").
+        sort_signature (list(str)): Sort keys in effect when the cursor was produced.
+        values (Iterable(Any)): Ordering values of the boundary record.
+
+    Returns:
+        str: Encoded cursor.
+    """
+    packed = []
+    for value in values:
+        for tag, type_, _ in _cursor_value_types:
+            if isinstance(value, type_):
+                value = [tag, str(value) if tag == 'n' else value.isoformat()]
+                break
+        else:
+            if hasattr(value, 'isoformat'):
+                # arrow and similar datetime wrappers
+                value = ['dt', value.isoformat()]
+        packed.append(value)
+    data = json.dumps([direction, sort_signature, packed], separators=(',', ':'))
+    return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Unpack a cursor created by `encode_cursor`.
+
+    Args:
+        cursor (str): Encoded cursor.
+
+    Raises:
+        ValueError: Cursor is malformed.
+
+    Returns:
+        tuple: (direction, sort_signature, values)
+    """
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        direction, sort_signature, packed = json.loads(data)
+        type_map = {tag: factory for tag, _, factory in _cursor_value_types}
+        values = [
+            type_map[value[0]](value[1]) if isinstance(value, list) else value for value in packed
+        ]
+    except (
+        binascii.Error,
+        decimal.InvalidOperation,
+        IndexError,
+        KeyError,
+        TypeError,
+        ValueError,
+    ) as e:
+        raise ValueError(f'invalid cursor: {cursor}') from e
+    return direction, sort_signature, values
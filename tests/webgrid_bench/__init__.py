@@ -0,0 +1,11 @@
+"""Benchmarks for grid construction and rendering, using the webgrid_ta model.
+
+Run from the repo root with the tests directory on the path (or use ``nox -e bench``)::
+
+    PYTHONPATH=tests python -m webgrid_bench run --sizes 1k,100k --output before.json
+    PYTHONPATH=tests python -m webgrid_bench run --sizes 1k,100k --output after.json
+    PYTHONPATH=tests python -m webgrid_bench compare before.json after.json --threshold 0.1
+
+Each dataset size drops and recreates the test app's tables. The default is in-memory SQLite;
+any other database must be given explicitly with ``--db-url``, and should be a scratch one.
+"""
@@ -0,0 +1,81 @@
+import json
+from pathlib import Path
+import sys
+
+import click
+import flask
+
+from webgrid_bench.runner import compare, parse_size, result_document, run_cases
+from webgrid_ta.app import create_app
+
+
+@click.group()
+@click.option(
+    '--db-url',
+    default='sqlite:///',
+    help=(
+        'Scratch database, tables are dropped and recreated for each dataset. '
+        'Default is in-memory SQLite.'
+    ),
+)
+def main(db_url):
+    """Run the WebGrid benchmarks."""
+    app = create_app('Test', database_url=db_url)
+    flask.ctx.AppContext(app).push()
+
+
+@main.command('run')
+@click.option('--sizes', default='1k', help='Comma-separated dataset sizes, e.g. 1k,100k,1M.')
+@click.option('--case', 'case_names', multiple=True, help='Case(s) to run. Default all.')
+@click.option('--repeat', default=5, help='Timed calls per case.')
+@click.option('--warmup', default=1, help='Untimed calls per case.')
+@click.option('--export-rows', default=1000, help='Rows included in export cases.')
+@click.option('--output', type=click.Path(dir_okay=False), help='Write results JSON here.')
+def run(sizes, case_names, repeat, warmup, export_rows, output):
+    from webgrid_bench.cases import CASES
+    from webgrid_bench.data import load_dataset
+    from webgrid_ta.model import db
+
+    names = case_names or list(CASES)
+    unknown = set(names) - set(CASES)
+    if unknown:
+        raise click.BadParameter(', '.join(sorted(unknown)), param_hint='--case')
+
+    results = []
+    for size_label in sizes.split(','):
+        size = parse_size(size_label)
+        click.echo(f'Loading {size} rows...', err=True)
+        load_dataset(size)
+        for result in run_cases(names, size, repeat, warmup, min(export_rows, size)):
+            click.echo(
+                f'{result["name"]:<20} {size:>9} {result["median"] * 1000:>10.3f} ms',
+                err=True,
+            )
+            results.append(result)
+
+    document = json.dumps(result_document(db.engine.dialect.name, results), indent=2)
+    if output:
+        Path(output).write_text(document)
+    else:
+        click.echo(document)
+
+
+@main.command('compare')
+@click.argument('baseline', type=click.File())
+@click.argument('current', type=click.File())
+@click.option('--threshold', default=0.1, help='Relative slowdown that counts as a regression.')
+def compare_runs(baseline, current, threshold):
+    """Compare two result files, exiting with an error if any case regressed."""
+    comparisons = compare(json.load(baseline), json.load(current), threshold)
+    for item in comparisons:
+        flag = 'REGRESSED' if item['regressed'] else ''
+        click.echo(
+            f'{item["name"]:<20} {item["dataset"]:>9} {item["baseline"] * 1000:>10.3f} ms'
+            f' {item["current"] * 1000:>10.3f} ms {item["change"]:>+8.1%} {flag}',
+        )
+    if any(item['regressed'] for item in comparisons):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""Benchmark cases.
+
+A case is a function taking the run options and returning a ``(func, rows)`` tuple. Any setup
+happens in the case function itself, so only calls to ``func`` are timed. ``rows`` is the number
+of records ``func`` handles, for per-row figures, or None.
+
+Cases run inside a request context, with mutable request args.
+"""
+
+import flask
+from werkzeug.datastructures import MultiDict
+
+from webgrid.renderers import CSV, JSON, XLSX
+from webgrid_ta.grids import PeopleGrid
+from webgrid_ta.model import db
+from webgrid_ta.model.entities import Person
+
+
+CASES = {}
+
+# Filter and sort args representative of an interactive grid view
+VIEW_ARGS = (
+    ('op(firstname)', 'contains'),
+    ('v1(firstname)', 'fn'),
+    ('op(createdts)', 'past'),
+    ('sort1', '-numericcol'),
+    ('sort2', 'firstname'),
+    ('perpage', '50'),
+)
+
+
+def case(name):
+    def decorator(func):
+        CASES[name] = func
+        return func
+
+    return decorator
+
+
+def set_args(*args):
+    flask.request.args = MultiDict(args)
+
+
+def view_grid():
+    set_args(*VIEW_ARGS)
+    grid = PeopleGrid()
+    grid.apply_qs_args()
+    return grid
+
+
+def export_grid(rows):
+    """Grid limited to the first `rows` people, so exports have a predictable size."""
+
+    class ExportGrid(PeopleGrid):
+        query_filter = (Person.sortorder <= rows,)
+
+    return ExportGrid
+
+
+@case('grid_init')
+def grid_init(options):
+    return PeopleGrid, None
+
+
+@case('apply_qs_args')
+def apply_qs_args(options):
+    set_args(*VIEW_ARGS)
+    return lambda: PeopleGrid().apply_qs_args(), None
+
+
+@case('build_query')
+def build_query(options):
+    grid = view_grid()
+    dialect = db.engine.dialect
+    return lambda: str(grid.build_query().statement.compile(dialect=dialect)), None
+
+
+@case('html_table_rows')
+def html_table_rows(options):
+    grid = view_grid()
+    return grid.html.table_rows, len(grid.records)
+
+
+@case('json_asdict')
+def json_asdict(options):
+    grid = view_grid()
+    return JSON(grid).asdict, len(grid.records)
+
+
+@case('csv_export')
+def csv_export(options):
+    grid_cls = export_grid(options['export_rows'])
+    set_args()
+    rows = grid_cls().record_count
+    return lambda: CSV(grid_cls()).build_csv(), rows
+
+
+@case('xlsx_export')
+def xlsx_export(options):
+    grid_cls = export_grid(options['export_rows'])
+    set_args()
+    rows = grid_cls().record_count
+    return lambda: XLSX(grid_cls()).build_sheet(), rows
+
+
+@case('session_load')
+def session_load(options):
+    grid = view_grid()
+    set_args(('session_key', grid.session_key))
+    return lambda: PeopleGrid().apply_qs_args(), None
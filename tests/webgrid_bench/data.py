@@ -0,0 +1,71 @@
+"""Generated datasets for benchmarks."""
+
+import datetime as dt
+from decimal import Decimal as D
+
+import sqlalchemy as sa
+
+from webgrid_ta.model import db
+from webgrid_ta.model.entities import AccountType, Email, Person, Status, Stopwatch
+
+
+def load_dataset(size, chunk_size=10_000):
+    """Recreate the test app's tables and fill them with `size` people.
+
+    Every person has two emails, and statuses cycle the same way as the test app's own
+    data. A few stopwatches are added so every model in the app has records.
+    """
+    db.drop_all()
+    db.create_all()
+
+    status_ids = []
+    for label, flag_closed in (('open', 0), ('pending', 0), ('closed', 1)):
+        status = Status(label=label, flag_closed=flag_closed)
+        db.session.add(status)
+        db.session.flush()
+        status_ids.append(status.id)
+    status_ids.append(None)
+
+    account_types = list(AccountType)
+    created = dt.datetime(2020, 1, 1)
+    for start in range(1, size + 1, chunk_size):
+        ids = range(start, min(start + chunk_size, size + 1))
+        db.session.execute(
+            sa.insert(Person),
+            [
+                {
+                    'id': x,
+                    'firstname': f'fn{x:07d}',
+                    'lastname': f'ln{x:07d}',
+                    'inactive': int(x % 7 == 0),
+                    'sortorder': x,
+                    'numericcol': D('29.26') * (x % 1000) / D('.9'),
+                    'floatcol': x / 3,
+                    'createdts': created + dt.timedelta(minutes=x),
+                    'due_date': (created + dt.timedelta(days=x % 365)).date(),
+                    'status_id': status_ids[x % 4],
+                    'account_type': account_types[x % len(account_types)],
+                }
+                for x in ids
+            ],
+        )
+        db.session.execute(
+            sa.insert(Email),
+            [
+                {'person_id': x, 'email': f'email{x:07d}@{domain}'}
+                for x in ids
+                for domain in ('example.com', 'gmail.com')
+            ],
+        )
+
+    for x in range(1, 10):
+        start_time = dt.datetime(2019, 1, 1) + dt.timedelta(hours=x)
+        db.session.add(
+            Stopwatch(
+                label=f'Watch {x}',
+                category='Sports',
+                start_time_lap1=start_time,
+                stop_time_lap1=start_time + dt.timedelta(hours=1),
+            ),
+        )
+    db.session.commit()
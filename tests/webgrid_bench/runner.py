@@ -0,0 +1,143 @@
+"""Timing, result documents, and comparison of benchmark runs."""
+
+import datetime as dt
+import platform
+import statistics
+import subprocess
+import time
+
+import flask
+import sqlalchemy as sa
+
+import webgrid
+
+
+# Bumped when the result document layout changes incompatibly
+FORMAT_VERSION = 1
+
+SIZE_SUFFIXES = {'k': 1_000, 'm': 1_000_000}
+
+
+def parse_size(value):
+    """Turn a dataset size like "1k", "100k", or "1M" into a row count."""
+    value = value.strip().lower()
+    multiplier = SIZE_SUFFIXES.get(value[-1:], 1)
+    if multiplier != 1:
+        value = value[:-1]
+    return int(value) * multiplier
+
+
+def measure(func, repeat=5, warmup=1):
+    """Call `func` `warmup` times untimed, then `repeat` times timed.
+
+    Returns:
+        list(float): Duration of each timed call, in seconds.
+    """
+    for _ in range(warmup):
+        func()
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - t0)
+    return timings
+
+
+def summarize(name, dataset, timings, rows=None):
+    """Build the result entry for one case run against one dataset size."""
+    median = statistics.median(timings)
+    return {
+        'name': name,
+        'dataset': dataset,
+        'rows': rows,
+        'repeat': len(timings),
+        'min': min(timings),
+        'median': median,
+        'mean': statistics.fmean(timings),
+        'per_row': median / rows if rows else None,
+    }
+
+
+def run_cases(names, dataset, repeat=5, warmup=1, export_rows=1000):
+    """Run the named cases against whatever data is loaded, returning result entries."""
+    # cases import the model, which needs the app context
+    from .cases import CASES
+
+    options = {'export_rows': export_rows}
+    results = []
+    for name in names:
+        with flask.current_app.test_request_context('/'):
+            func, rows = CASES[name](options)
+            timings = measure(func, repeat=repeat, warmup=warmup)
+        results.append(summarize(name, dataset, timings, rows))
+    return results
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment(dialect_name):
+    """Describe what produced a set of results, so runs can be matched up later."""
+    return {
+        'webgrid': webgrid.__version__,
+        'sqlalchemy': sa.__version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'dialect': dialect_name,
+        'revision': git_revision(),
+        'created': dt.datetime.now(dt.timezone.utc).isoformat(),
+    }
+
+
+def result_document(dialect_name, results):
+    return {
+        'format': FORMAT_VERSION,
+        'environment': environment(dialect_name),
+        'results': results,
+    }
+
+
+def compare(baseline, current, threshold=0.1):
+    """Pair up results of two runs by case and dataset size, and compare median timings.
+
+    Args:
+        baseline (dict): Result document of the reference run.
+        current (dict): Result document of the run being checked.
+        threshold (float): Relative slowdown tolerated before a case counts as regressed,
+        e.g. 0.1 for 10%.
+
+    Returns:
+        list(dict): One entry per case present in both runs, with the baseline and current
+        medians, the relative ``change``, and a ``regressed`` flag.
+    """
+    for doc in (baseline, current):
+        if doc.get('format') != FORMAT_VERSION:
+            raise ValueError(f'unsupported result format: {doc.get("format")}')
+
+    baseline_map = {(r['name'], r['dataset']): r for r in baseline['results']}
+    comparisons = []
+    for result in current['results']:
+        reference = baseline_map.get((result['name'], result['dataset']))
+        if reference is None:
+            continue
+        change = (result['median'] - reference['median']) / reference['median']
+        comparisons.append(
+            {
+                'name': result['name'],
+                'dataset': result['dataset'],
+                'baseline': reference['median'],
+                'current': result['median'],
+                'change': change,
+                'regressed': change > threshold,
+            },
+        )
+    return comparisons
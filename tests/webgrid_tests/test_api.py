@@ -7,8 +7,12 @@ import flask_wtf
 import pytest
 
 from webgrid import BaseGrid, Column
+from webgrid.filters import OptionsFilterBase, TextFilter
 from webgrid.flask import WebGrid, WebGridAPI
+from webgrid.metrics import GridMetrics
 from webgrid.renderers import JSON, Renderer
+from webgrid_ta.model import db
+from webgrid_ta.model.entities import Person, Status
 
 
 @pytest.fixture
@@ -38,6 +42,26 @@ def api_manager(app):
     yield manager
 
 
+@pytest.fixture
+def default_manager(app):
+    # filters need a database dialect
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///'
+    db.init_app(app)
+    manager = WebGrid(db=db)
+    manager.init_app(app)
+    yield manager
+
+
+@pytest.fixture
+def manager(app):
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///'
+    db.init_app(app)
+    manager = WebGrid(db=db)
+    manager.enable_filter_routes = True
+    manager.init_app(app)
+    yield manager
+
+
 @pytest.fixture
 def api_manager_with_csrf(csrf, app):
     """Technically, this is the same as having ``csrf, api_manager`` as fixtures on
@@ -245,3 +269,228 @@ class TestFlaskAPI:
         post_data = self.post_data(export_to='xlsx')
         resp = test_app.post_json('/webgrid-api/foo', post_data)
         assert resp.json['error'] == 'too many records for render target'
+
+
+class TestFlaskAPIMetrics:
+    @pytest.fixture
+    def metrics_manager(self, app):
+        manager = WebGridAPI(metrics=GridMetrics())
+        manager.init_app(app)
+        yield manager
+
+    def test_route_only_with_metrics(self, api_manager, test_app):
+        test_app.get('/webgrid-metrics', status=404)
+
+    def test_request_metrics(self, metrics_manager, test_app):
+        register_grid(metrics_manager, 'foo', create_grid_cls(metrics_manager))
+        test_app.post_json('/webgrid-api/foo', {})
+        test_app.post_json('/webgrid-api/foo/count', {})
+        test_app.post_json('/webgrid-api/bar', {}, status=404)
+
+        resp = test_app.get('/webgrid-metrics')
+        assert resp.content_type == 'text/plain'
+        assert 'webgrid_requests_total{grid="foo"} 2' in resp.text
+        assert 'webgrid_request_seconds_count{grid="foo"} 2' in resp.text
+        assert 'webgrid_rows_rendered_total{grid="grid",target="json"} 1' in resp.text
+        assert 'webgrid_render_seconds_count{grid="grid",target="json"} 1' in resp.text
+        assert 'errors' not in resp.text
+        assert 'bar' not in resp.text
+
+    def test_error_metrics(self, metrics_manager, test_app):
+        class Grid(DummyMixin, BaseGrid):
+            manager = metrics_manager
+
+            def check_auth(self):
+                if b'bad' in flask.request.query_string:
+                    flask.abort(403)
+                raise ValueError('broken')
+
+        register_grid(metrics_manager, 'foo', Grid)
+        test_app.post_json('/webgrid-api/foo?bad', {}, status=403)
+        with pytest.raises(ValueError, match='broken'):
+            test_app.post_json('/webgrid-api/foo', {})
+
+        resp = test_app.get('/webgrid-metrics')
+        assert 'webgrid_requests_total{grid="foo"} 2' in resp.text
+        assert 'webgrid_errors_total{grid="foo"} 1' in resp.text
+
+    def test_export_metrics(self, metrics_manager, test_app):
+        class Grid(DummyMixin, BaseGrid):
+            manager = metrics_manager
+
+            @property
+            def record_count(self):
+                return 2000000 if b'many' in flask.request.query_string else 1
+
+        register_grid(metrics_manager, 'foo', Grid)
+        post_data = TestFlaskAPI().post_data(export_to='xlsx')
+        resp = test_app.post_json('/webgrid-api/foo', post_data)
+        assert 'spreadsheetml' in resp.headers['Content-Type']
+        test_app.post_json('/webgrid-api/foo?many', post_data)
+
+        resp = test_app.get('/webgrid-metrics')
+        assert 'webgrid_requests_total{grid="foo"} 2' in resp.text
+        assert 'webgrid_export_bytes_total{grid="grid",target="xlsx"}' in resp.text
+        assert 'webgrid_render_seconds_count{grid="grid",target="xlsx"} 2' in resp.text
+        assert 'webgrid_render_limit_exceeded_total{grid="grid"} 1' in resp.text
+
+
+class TestFlaskFilterRows:
+    def create_grid_cls(self, grid_manager):
+        class Grid(BaseGrid):
+            identifier = 'people'
+            manager = grid_manager
+            lazy_filters = True
+
+            Column('First Name', Person.firstname, TextFilter)
+            Column('Last Name', Person.lastname, TextFilter)
+
+        return Grid
+
+    def test_only_active_rows_rendered(self, app, manager):
+        Grid = self.create_grid_cls(manager)
+        manager.register_grid('people', Grid)
+        with app.test_request_context('/'):
+            grid = Grid()
+            grid.column('firstname').filter.set('eq', 'bob')
+            rows = grid.html.filtering_fields()
+            attrs = grid.html.filtering_table_attrs()
+
+        assert 'firstname_filter' in rows
+        assert 'lastname_filter' not in rows
+        # all filters can still be added
+        assert 'value="lastname"' in rows
+        assert attrs['data-filter-url'] == '/webgrid-filter/people'
+
+    def test_unregistered_grid_renders_all_rows(self, app, manager):
+        Grid = self.create_grid_cls(manager)
+        with app.test_request_context('/'):
+            grid = Grid()
+            rows = grid.html.filtering_fields()
+            attrs = grid.html.filtering_table_attrs()
+
+        assert 'firstname_filter' in rows
+        assert 'lastname_filter' in rows
+        assert 'data-filter-url' not in attrs
+
+    def test_filter_row_view(self, manager, test_app):
+        manager.register_grid('people', self.create_grid_cls(manager))
+        resp = test_app.get('/webgrid-filter/people', {'key': 'lastname'})
+        assert '<tr class="lastname_filter">' in resp.text
+        assert 'name="op(lastname)"' in resp.text
+
+        test_app.get('/webgrid-filter/people', {'key': 'nope'}, status=404)
+        test_app.get('/webgrid-filter/other', {'key': 'lastname'}, status=404)
+
+    def test_filter_row_view_auth(self, manager, test_app):
+        class Grid(self.create_grid_cls(manager)):
+            def check_auth(self):
+                flask.abort(403)
+
+        manager.register_grid('people', Grid)
+        test_app.get('/webgrid-filter/people', {'key': 'lastname'}, status=403)
+
+    def test_routes_off_by_default(self, app, default_manager, test_app):
+        Grid = self.create_grid_cls(default_manager)
+        default_manager.register_grid('people', Grid)
+        with app.test_request_context('/'):
+            grid = Grid()
+            rows = grid.html.filtering_fields()
+            assert default_manager.filter_options_url(grid, 'firstname') is None
+
+        assert 'lastname_filter' in rows
+        test_app.get('/webgrid-filter/people', {'key': 'lastname'}, status=404)
+        test_app.get('/webgrid-filter/people/options', {'key': 'lastname'}, status=404)
+
+
+class StatusFilter(OptionsFilterBase):
+    def options_query(self):
+        return db.session.query(Status.id, Status.label)
+
+
+class StateFilter(OptionsFilterBase):
+    options_from = (('in', 'Indiana'), ('ky', 'Kentucky'), ('oh', 'Ohio'))
+
+
+class TestFlaskFilterOptions:
+    @pytest.fixture
+    def statuses(self, app, manager):
+        # the app's own in-memory database, separate from the one used by other tests
+        with app.app_context():
+            db.create_all()
+            statuses = [Status.testing_create(label) for label in ('open', 'closed', 'opened')]
+            yield {status.label: status.id for status in statuses}
+
+    def create_grid_cls(self, grid_manager):
+        class Grid(BaseGrid):
+            identifier = 'people'
+            manager = grid_manager
+
+            Column('Status', Person.status_id, StatusFilter)
+            Column('State', Person.state, StateFilter)
+
+        return Grid
+
+    def test_remote_multiselect(self, app, manager, statuses):
+        Grid = self.create_grid_cls(manager)
+        manager.register_grid('people', Grid)
+        with app.test_request_context('/'):
+            grid = Grid()
+            grid.column('status_id').filter.set('is', [str(statuses['closed'])])
+            status_inputs = grid.html.filtering_col_inputs1(grid.column('status_id'))
+            state_inputs = grid.html.filtering_col_inputs1(grid.column('state'))
+
+        # only the selected status is rendered, the rest are loaded by the multiselect
+        assert 'data-remote-url="/webgrid-filter/people/options?key=status_id"' in status_inputs
+        assert '>closed</option>' in status_inputs
+        assert '>open</option>' not in status_inputs
+        assert 'data-remote-url' not in state_inputs
+        assert '>Ohio</option>' in state_inputs
+
+    def test_unregistered_grid_renders_all_options(self, app, manager, statuses):
+        Grid = self.create_grid_cls(manager)
+        with app.test_request_context('/'):
+            grid = Grid()
+            inputs = grid.html.filtering_col_inputs1(grid.column('status_id'))
+
+        assert 'data-remote-url' not in inputs
+        assert '>open</option>' in inputs
+
+    def test_options_view(self, manager, test_app, statuses):
+        manager.register_grid('people', self.create_grid_cls(manager))
+        url = '/webgrid-filter/people/options'
+
+        resp = test_app.get(url, {'key': 'status_id', 'q': 'OPEN'})
+        assert resp.json == {
+            'options': [
+                {'key': str(statuses['open']), 'label': 'open'},
+                {'key': str(statuses['opened']), 'label': 'opened'},
+            ],
+            'more': False,
+        }
+
+        resp = test_app.get(url, {'key': 'status_id', 'limit': 1, 'offset': 1})
+        assert resp.json == {
+            'options': [{'key': str(statuses['open']), 'label': 'open'}],
+            'more': True,
+        }
+
+        resp = test_app.get(url, {'key': 'state', 'q': 'o'})
+        assert [option['key'] for option in resp.json['options']] == ['oh']
+
+        test_app.get(url, {'key': 'nope'}, status=404)
+        test_app.get('/webgrid-filter/other/options', {'key': 'state'}, status=404)
+
+    def test_options_view_limit(self, manager, test_app, statuses):
+        manager.filter_options_max_limit = 2
+        manager.register_grid('people', self.create_grid_cls(manager))
+        resp = test_app.get('/webgrid-filter/people/options', {'key': 'state', 'limit': 50})
+        assert len(resp.json['options']) == 2
+        assert resp.json['more'] is True
+
+    def test_options_view_not_options_filter(self, manager, test_app, statuses):
+        class Grid(self.create_grid_cls(manager)):
+            Column('Name', Person.firstname, TextFilter)
+
+        manager.register_grid('people', Grid)
+        test_app.get('/webgrid-filter/people/options', {'key': 'firstname'}, status=404)
@@ -0,0 +1,50 @@
+import pytest
+
+from webgrid_bench.cases import CASES
+from webgrid_bench.runner import compare, measure, parse_size, result_document, run_cases
+
+
+def test_parse_size():
+    assert parse_size('500') == 500
+    assert parse_size('1k') == 1_000
+    assert parse_size('100K') == 100_000
+    assert parse_size('1M') == 1_000_000
+
+
+def test_measure():
+    calls = []
+    timings = measure(lambda: calls.append(1), repeat=3, warmup=2)
+    assert len(timings) == 3
+    assert len(calls) == 5
+
+
+class TestCompare:
+    def document(self, **medians):
+        return result_document(
+            'sqlite',
+            [{'name': name, 'dataset': 1000, 'median': median} for name, median in medians.items()],
+        )
+
+    def test_regression(self):
+        comparisons = compare(
+            self.document(grid_init=1.0, build_query=1.0, csv_export=1.0),
+            self.document(grid_init=1.05, build_query=1.5, html_table_rows=1.0),
+            threshold=0.1,
+        )
+        assert [(c['name'], c['regressed']) for c in comparisons] == [
+            ('grid_init', False),
+            ('build_query', True),
+        ]
+        assert comparisons[1]['change'] == pytest.approx(0.5)
+
+    def test_format_mismatch(self):
+        baseline = self.document(grid_init=1.0)
+        baseline['format'] = 0
+        with pytest.raises(ValueError, match='unsupported result format'):
+            compare(baseline, self.document(grid_init=1.0))
+
+
+def test_cases_run():
+    results = run_cases(list(CASES), 0, repeat=1, warmup=0, export_rows=5)
+    assert [result['name'] for result in results] == list(CASES)
+    assert all(result['median'] > 0 for result in results)
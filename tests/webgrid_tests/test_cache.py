@@ -0,0 +1,91 @@
+from unittest import mock
+
+from webgrid.cache import LRUCache, MappingCache, make_key
+
+
+class TestMakeKey:
+    def test_stable_and_distinct(self):
+        assert make_key('select 1', [('a', 1)]) == make_key('select 1', [('a', 1)])
+        assert make_key('select 1', [('a', 1)]) != make_key('select 1', [('a', 2)])
+        assert len(make_key(object)) == 40
+
+
+class TestLRUCache:
+    def test_get_set(self):
+        cache = LRUCache()
+        assert cache.get('foo') is None
+        cache.set('foo', 0)
+        assert cache.get('foo') == 0
+        cache.delete('foo')
+        assert cache.get('foo') is None
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        assert cache.get('b') is None
+        assert cache.get('a') == 1
+        assert cache.get('c') == 3
+        assert len(cache) == 2
+
+    @mock.patch('webgrid.cache.time.monotonic')
+    def test_ttl(self, m_monotonic):
+        cache = LRUCache(ttl=10)
+        m_monotonic.return_value = 100
+        cache.set('a', 1)
+        m_monotonic.return_value = 109
+        assert cache.get('a') == 1
+        m_monotonic.return_value = 110
+        assert cache.get('a') is None
+        assert len(cache) == 0
+
+    def test_clear(self):
+        cache = LRUCache()
+        cache.set('a', 1)
+        cache.clear()
+        assert cache.get('a') is None
+
+
+class TestMappingCache:
+    def test_get_set(self):
+        store = {}
+        cache = MappingCache(store)
+        cache.set('foo', 5)
+        assert store == {'webgrid:foo': (None, 5)}
+        assert cache.get('foo') == 5
+        assert cache.get('bar') is None
+
+    def test_shared_store(self):
+        store = {}
+        MappingCache(store, prefix='x:').set('foo', 5)
+        assert MappingCache(store, prefix='x:').get('foo') == 5
+        assert MappingCache(store, prefix='y:').get('foo') is None
+
+    @mock.patch('webgrid.cache.time.time')
+    def test_ttl(self, m_time):
+        store = {}
+        cache = MappingCache(store, ttl=10)
+        m_time.return_value = 100
+        cache.set('a', 1)
+        m_time.return_value = 110
+        assert cache.get('a') is None
+        assert store == {}
+
+    def test_clear(self):
+        store = {'other': 1}
+        cache = MappingCache(store)
+        cache.set('a', 1)
+        cache.clear()
+        assert store == {'other': 1}
+
+    def test_tracked_keys_bounded(self):
+        store = {}
+        cache = MappingCache(store, max_tracked_keys=2)
+        for key in 'abc':
+            cache.set(key, 1)
+        assert len(cache._keys) == 2
+        cache.clear()
+        # the forgotten key is left to expire
+        assert store == {'webgrid:a': (None, 1)}
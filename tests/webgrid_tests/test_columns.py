@@ -3,6 +3,7 @@ from decimal import Decimal as D
 
 from blazeutils.containers import HTMLAttributes
 from blazeutils.datastructures import BlankObject
+from blazeutils.numbers import decimalfmt
 import pytest
 
 from webgrid import (
@@ -10,13 +11,15 @@ from webgrid import (
     Column,
     DateColumn,
     DateTimeColumn,
+    EnumColumn,
+    ExtractionError,
     LinkColumnBase,
     NumericColumn,
     YesNoColumn,
 )
 from webgrid.filters import DateFilter, IntFilter, TextFilter
 from webgrid_ta.grids import Grid
-from webgrid_ta.model.entities import Person
+from webgrid_ta.model.entities import AccountType, Person
 
 
 class FirstNameColumn(LinkColumnBase):
@@ -135,6 +138,37 @@ class TestColumn:
         data = col.extract_data(record)
         assert data == 'bar'
 
+    def test_extraction_accessor_reused(self):
+        col = Column('Foo', 'foo')
+        assert col.extract_data({'foo': 'bar'}) == 'bar'
+        assert col._accessor_shape is dict
+        assert col.extract_data({'foo': 'baz'}) == 'baz'
+
+        # a record missing the key still gets the full search
+        with pytest.raises(ExtractionError):
+            col.extract_data({'other': 'value'})
+
+        # a different shape of record picks a new accessor
+        assert col.extract_data(BlankObject(foo='bar')) == 'bar'
+        assert col._accessor_shape is BlankObject
+
+    def test_extraction_from_rows(self):
+        class TG(Grid):
+            Column('First Name', Person.firstname)
+            Column('Last Name', Person.lastname.label('surname'))
+
+        Person.delete_cascaded()
+        Person.testing_create('bob', lastname='smith')
+        Person.testing_create('al', lastname='jones')
+        grid = TG()
+        grid.set_sort('firstname')
+        first, last = grid.columns
+        assert [(first.extract_data(r), last.extract_data(r)) for r in grid.records] == [
+            ('al', 'jones'),
+            ('bob', 'smith'),
+        ]
+        assert first._accessor_shape is grid.records[0]._parent
+
     def test_nonkeyed_not_sort(self):
         class TG(Grid):
             FullNameColumn('Full Name')
@@ -341,6 +375,36 @@ class TestColumn:
         c.format_as = 'percent'
         assert c.render_html(record, None) == '16.7%'
 
+    def test_format_numbers(self):
+        class TG(Grid):
+            NumericColumn('C1', Person.numericcol, places=1)
+
+        c = TG().columns[0]
+        values = [D('1234567.25'), D('-0.004'), D('-1234.16'), 2.675, -3, 0, None, '']
+        settings = [
+            {},
+            {'format_as': 'accounting'},
+            {'format_as': 'percent', 'places': 2},
+            {'places': 0, 'sep': '.', 'dp': '', 'neg': '', 'trailneg': '-'},
+            {'sep': ' ', 'dp': ',', 'curr': '€', 'pos': '+'},
+        ]
+        for attrs in settings:
+            for attr, value in attrs.items():
+                setattr(c, attr, value)
+            formatted, negatives = c.format_numbers(values)
+
+            expected = []
+            for value in values:
+                if not value and value != 0:
+                    expected.append(value)
+                    continue
+                if c.format_as == 'percent':
+                    value = value * 100
+                text = decimalfmt(value, *c.html_decimal_format_opts(value))
+                expected.append(text + '%' if c.format_as == 'percent' else text)
+            assert formatted == expected
+            assert negatives == [False, True, True, False, True, False, False, False]
+
     def test_number_formatting_for_excel(self):
         class TG(Grid):
             NumericColumn('C1', Person.numericcol, places=2)
@@ -373,6 +437,53 @@ class TestColumn:
         )
         assert c.xls_construct_format(c.xls_fmt_percent) == '0%;-0%'
 
+    def test_render_batch(self):
+        class ShoutColumn(Column):
+            def format_data(self, value):
+                return value.upper()
+
+        class CSVColumn(Column):
+            def render_csv(self, record):
+                return 'csv-' + record['firstname']
+
+        class TG(Grid):
+            ShoutColumn('C1', Person.firstname)
+            CSVColumn('C2', Person.firstname.label('fn2'))
+            BoolColumn('C3', Person.inactive)
+            YesNoColumn('C4', Person.inactive.label('yesno'), reverse=True)
+            EnumColumn('C5', Person.account_type)
+            DateColumn('C6', Person.due_date)
+            DateTimeColumn('C7', Person.createdts)
+            NumericColumn('C8', Person.numericcol)
+
+        records = [
+            {
+                'firstname': 'bob',
+                'fn2': 'bob',
+                'inactive': True,
+                'yesno': True,
+                'account_type': AccountType.admin,
+                'due_date': dt.date(2024, 3, 1),
+                'createdts': dt.datetime(2024, 3, 1, 10, 30, tzinfo=dt.timezone.utc),
+                'numericcol': D('1.5'),
+            },
+            {
+                'firstname': 'al',
+                'fn2': 'al',
+                'inactive': False,
+                'yesno': False,
+                'account_type': None,
+                'due_date': None,
+                'createdts': None,
+                'numericcol': None,
+            },
+        ]
+        for col in TG().columns:
+            for render_type in ('csv', 'xlsx', 'json'):
+                assert col.render_batch(render_type, records) == [
+                    col.render(render_type, record) for record in records
+                ]
+
     def test_post_init(self):
         class TG(Grid):
             NumericColumn('C1', Person.numericcol, places=2)
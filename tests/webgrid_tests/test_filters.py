@@ -1,10 +1,12 @@
 from collections import namedtuple
 import datetime as dt
 from decimal import Decimal as D
+from unittest import mock
 
 import pytest
 
 from webgrid import validators
+from webgrid.cache import LRUCache
 from webgrid.filters import (
     AggregateIntFilter,
     DateFilter,
@@ -1797,6 +1799,187 @@ class TestOptionsFilter(CheckFilterBase):
         filter.set(None, None)
         self.assert_filter_query(filter, 'WHERE persons.sortorder IN 1, 2')
 
+    def test_option_indexes(self):
+        calls = []
+
+        class GeneratorFilter(OptionsFilterBase):
+            def options_from(self):
+                calls.append(None)
+                return ((key, key.upper()) for key in ('in', 'ky'))
+
+        filter = GeneratorFilter(Person.state).new_instance()
+        assert filter.option_key_set == frozenset({'in', 'ky'})
+        assert filter.option_labels == {'in': 'IN', 'ky': 'KY'}
+        assert filter.options_seq == [('in', 'IN'), ('ky', 'KY')]
+        assert filter.options_for_keys(['ky', 'foo', 'ky']) == [('ky', 'KY')]
+        assert len(calls) == 1
+
+    def test_unhashable_option_keys(self):
+        filter = BadTypeFilter(Person.boolcol, value_modifier=lambda x: x)
+        assert filter.option_key_set is None
+        assert filter.option_labels is None
+        assert filter.options_for_keys([[]]) == [([], 'Empty List')]
+
+    def test_selected_option_keys(self):
+        filter = SortOrderFilter(Person.sortorder).new_instance()
+        filter.set('is', ['2'])
+        assert filter.selected_option_keys(filter.options_seq) == frozenset({2})
+
+        class ProcessFilter(SortOrderFilter):
+            def process(self, value):
+                return super().process(value) * 1
+
+        filter = ProcessFilter(Person.sortorder).new_instance()
+        filter.set('is', ['2'])
+        assert filter.selected_option_keys(filter.options_seq) == frozenset({2})
+
+
+class TestOptionsCache(CheckFilterBase):
+    def create_filter_cls(self, cache):
+        calls = []
+
+        class CachedFilter(OptionsFilterBase):
+            options_cache = cache
+
+            def options_from(self):
+                calls.append(None)
+                return [('in', 'IN'), ('ky', 'KY')]
+
+        return CachedFilter, calls
+
+    def test_options_shared_between_instances(self):
+        CachedFilter, calls = self.create_filter_cls(LRUCache())
+        static = CachedFilter(Person.state)
+        filter = static.new_instance()
+        filter.set('is', ['ky', 'foo'])
+        assert filter.value1 == ['ky']
+        assert filter.option_key_set == frozenset({'in', 'ky'})
+
+        other = static.new_instance()
+        assert other.options_seq == [('in', 'IN'), ('ky', 'KY')]
+        assert len(calls) == 1
+
+        static.invalidate_options_cache()
+        static.new_instance()
+        assert len(calls) == 2
+
+    def test_cache_key(self):
+        CachedFilter, calls = self.create_filter_cls(LRUCache())
+        CachedFilter(Person.state).new_instance()
+        CachedFilter(Person.firstname).new_instance()
+        assert len(calls) == 2
+        cache_key = CachedFilter(Person.state).options_cache_key()
+        assert cache_key != StateFilter(Person.state).options_cache_key()
+
+    def test_cache_expires(self):
+        CachedFilter, calls = self.create_filter_cls(LRUCache(ttl=60))
+        with mock.patch('webgrid.cache.time.monotonic', return_value=1000):
+            CachedFilter(Person.state).new_instance()
+            CachedFilter(Person.state).new_instance()
+        with mock.patch('webgrid.cache.time.monotonic', return_value=1061):
+            CachedFilter(Person.state).new_instance()
+        assert len(calls) == 2
+
+    def test_query_options_materialized(self):
+        class CachedStatusFilter(OptionsFilterBase):
+            options_cache = LRUCache()
+            options_from = ents.Status.pairs
+
+        status = ents.Status.testing_create('optc cached')
+        try:
+            filter = CachedStatusFilter(Person.status_id).new_instance()
+            assert (status.id, 'optc cached') in filter.options_seq
+            cached = CachedStatusFilter.options_cache.get(filter.options_cache_key())
+            assert cached[0] == filter.options_seq
+            filter.set('is', [str(status.id)])
+            assert filter.value1 == [status.id]
+        finally:
+            db.session.delete(status)
+            db.session.commit()
+
+
+class StatusQueryFilter(OptionsFilterBase):
+    def options_query(self):
+        return db.session.query(ents.Status.id, ents.Status.label)
+
+
+class TestOptionsQueryFilter(CheckFilterBase):
+    @classmethod
+    def setup_class(cls):
+        super().setup_class()
+        cls.statuses = [
+            ents.Status.testing_create(f'optq {label}')
+            for label in ('beta', 'alpha', 'gamma', '50%_off')
+        ]
+
+    @classmethod
+    def teardown_class(cls):
+        for status in cls.statuses:
+            db.session.delete(status)
+        db.session.commit()
+        super().teardown_class()
+
+    def test_options_seq(self):
+        filter = StatusQueryFilter(Person.status_id).new_instance()
+        assert (self.statuses[1].id, 'optq alpha') in filter.options_seq
+
+    def test_validator_selected_on_first_use(self):
+        with mock.patch.object(
+            StatusQueryFilter,
+            'options_query',
+            side_effect=StatusQueryFilter.options_query,
+            autospec=True,
+        ) as m_options_query:
+            filter = StatusQueryFilter(Person.status_id).new_instance()
+            assert filter.value_modifier == 'auto'
+            assert not m_options_query.called
+
+            filter.set('is', [str(self.statuses[0].id)])
+        assert isinstance(filter.value_modifier, validators.IntValidator)
+        assert filter.value1 == [self.statuses[0].id]
+
+    def test_search_options(self):
+        filter = StatusQueryFilter(Person.status_id).new_instance()
+        labels = [label for _key, label in filter.search_options('OPTQ ')]
+        assert labels == ['optq 50%_off', 'optq alpha', 'optq beta', 'optq gamma']
+
+        labels = [label for _key, label in filter.search_options('optq', offset=1, limit=2)]
+        assert labels == ['optq alpha', 'optq beta']
+
+        # like wildcards are matched literally
+        assert filter.search_options('0%_') == [(self.statuses[3].id, 'optq 50%_off')]
+        assert filter.search_options('optq_') == []
+
+    def test_options_for_keys(self):
+        filter = StatusQueryFilter(Person.status_id).new_instance()
+        keys = [self.statuses[0].id, self.statuses[2].id]
+        assert sorted(filter.options_for_keys(keys)) == [
+            (self.statuses[0].id, 'optq beta'),
+            (self.statuses[2].id, 'optq gamma'),
+        ]
+        assert filter.options_for_keys([]) == []
+
+    def test_set_validates_with_query(self):
+        filter = StatusQueryFilter(Person.status_id).new_instance()
+        status_id = self.statuses[0].id
+        filter.set('is', [str(status_id), '999999', 'foo'])
+        assert filter.value1 == [status_id]
+        assert filter._options_seq is None
+
+        filter.set('is', ['999999'])
+        assert not filter.is_active
+
+    def test_search_expr(self):
+        filter = StatusQueryFilter(Person.status_id).new_instance()
+        expr = filter.get_search_expr()('OPTQ G')
+        assert expr.right.value == [self.statuses[2].id]
+
+    def test_python_options_search(self):
+        filter = StateFilter(Person.state).new_instance()
+        assert filter.search_options('K') == [('ky', 'KY')]
+        assert filter.search_options('', offset=1, limit=5) == [('ky', 'KY')]
+        assert filter.options_for_keys(['ky', 'foo']) == [('ky', 'KY')]
+
 
 class TestEnumFilter(CheckFilterBase):
     def test_create_without_enum_type(self):
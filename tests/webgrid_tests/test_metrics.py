@@ -0,0 +1,46 @@
+from types import SimpleNamespace
+
+from webgrid.metrics import GridMetrics
+
+
+class TestGridMetrics:
+    def test_counters(self):
+        metrics = GridMetrics()
+        metrics.increment('webgrid_requests_total', 'people')
+        metrics.increment('webgrid_requests_total', 'people')
+        metrics.increment('webgrid_rows_rendered_total', 'say "hi"', 5, target='csv')
+        assert metrics.render() == (
+            '# HELP webgrid_requests_total Grid requests served.\n'
+            '# TYPE webgrid_requests_total counter\n'
+            'webgrid_requests_total{grid="people"} 2\n'
+            '# HELP webgrid_rows_rendered_total Records rendered.\n'
+            '# TYPE webgrid_rows_rendered_total counter\n'
+            'webgrid_rows_rendered_total{grid="say \\"hi\\"",target="csv"} 5\n'
+        )
+
+    def test_histogram(self):
+        metrics = GridMetrics(buckets=(0.1, 1))
+        metrics.observe('webgrid_request_seconds', 'people', 0.1)
+        metrics.observe('webgrid_request_seconds', 'people', 0.5)
+        metrics.observe('webgrid_request_seconds', 'people', 2)
+        assert metrics.render().splitlines()[2:] == [
+            'webgrid_request_seconds_bucket{grid="people",le="0.1"} 1',
+            'webgrid_request_seconds_bucket{grid="people",le="1.0"} 2',
+            'webgrid_request_seconds_bucket{grid="people",le="+Inf"} 3',
+            'webgrid_request_seconds_sum{grid="people"} 2.6',
+            'webgrid_request_seconds_count{grid="people"} 3',
+        ]
+
+    def test_timing_listener(self):
+        metrics = GridMetrics(buckets=(1,))
+        grid = SimpleNamespace(ident='people')
+        metrics.timing_listener(grid, 'data', 0.5)
+        metrics.timing_listener(grid, 'render_xlsx', 0.5)
+        metrics.timing_listener(grid, 'build_query', 0.5)
+        output = metrics.render()
+        assert 'webgrid_query_seconds_count{grid="people",query="data"} 1' in output
+        assert 'webgrid_render_seconds_count{grid="people",target="xlsx"} 1' in output
+        assert 'build_query' not in output
+
+        metrics.clear()
+        assert metrics.render() == ''
@@ -4,6 +4,7 @@ from enum import Enum
 import io
 import json
 from typing import ClassVar
+from unittest import mock
 
 import arrow
 from markupsafe import Markup
@@ -17,6 +18,7 @@ from webgrid import (
     BoolColumn,
     Column,
     ColumnGroup,
+    DateColumn,
     DateTimeColumn,
     LinkColumnBase,
     NumericColumn,
@@ -34,7 +36,10 @@ from webgrid.renderers import (
     XLSX,
     OpenpyxlWorkbookManager,
     RenderLimitExceeded,
+    XLSXWriterStreamingWorkbookManager,
     XLSXWriterWorkbookManager,
+    compiled_template,
+    default_jinja_environment,
     render_html_attributes,
 )
 from webgrid_ta.grids import (
@@ -189,6 +194,25 @@ class CarGrid(Grid):
         return value
 
 
+class ShoutColumn(Column):
+    def render(self, render_type, record, *args, **kwargs):
+        return super().render(render_type, record, *args, **kwargs).upper() + '!'
+
+
+class DueColumn(DateColumn):
+    def render(self, render_type, record, *args, **kwargs):
+        return f'due {super().render(render_type, record, *args, **kwargs)}'
+
+
+class ShoutGrid(Grid):
+    allowed_export_targets: ClassVar = {'csv': CSV, 'xlsx': XLSX}
+    ShoutColumn('First Name', Person.firstname)
+    DueColumn('Due Date', Person.due_date)
+
+    def query_prep(self, query, has_sort, has_filters):
+        return query.filter(Person.firstname == 'fn001')
+
+
 def find_tag(html, tag, id_=None, class_=None, **attrs):
     selector = tag
     if id_:
@@ -286,6 +310,37 @@ class TestHtmlRenderer:
             ],
         )
         tg.html()
+        assert tg.html.jinja_env is default_jinja_environment()
+
+    @_inrequest('/')
+    def test_templates_shared_between_renderers(self):
+        grid1 = PeopleGrid()
+        grid2 = PeopleGrid()
+        assert grid1.html.jinja_env is grid2.html.jinja_env
+        assert 'wg_attributes' in grid1.manager.jinja_environment.filters
+
+        source = '<th{{attrs|wg_attributes}}>{{label}}</th>'
+        template = compiled_template(grid1.html.jinja_env, source)
+        assert compiled_template(grid2.html.jinja_env, source) is template
+        assert grid2.html._render_jinja(source, attrs={'class': 'a'}, label='b') == (
+            '<th class="a">b</th>'
+        )
+
+        # a different environment compiles its own copy
+        assert compiled_template(default_jinja_environment(), source) is not template
+
+    @_inrequest('/')
+    def test_template_translations_follow_locale(self):
+        from morphi.registry import default_registry
+
+        assert 'first</' in PeopleGrid().html.footer()
+        default_registry.locales = 'es'
+        try:
+            # the same environment, so translations must not be fixed at setup
+            assert 'primero</' in PeopleGrid().html.footer()
+        finally:
+            default_registry.locales = 'en'
+        assert 'first</' in PeopleGrid().html.footer()
 
     def test_render_html_attributes(self):
         result = render_html_attributes({})
@@ -305,6 +360,76 @@ class TestHtmlRenderer:
         assert isinstance(result, Markup)
         assert result == ' bool1 empty="" esc&amp;="&lt;&gt;&#34;" text="abc"'
 
+    @_inrequest('/')
+    def test_table_rows_escaping_and_attrs(self):
+        class TG(Grid):
+            Column('Value', 'value', class_='val')
+
+        tg = TG()
+        tg.set_records([{'value': '<b>&'}, {'value': ' '}])
+        rows = tg.html.table_rows()
+        assert rows == (
+            '<tr class="odd">\n            <td class="val">&lt;b&gt;&amp;</td>\n        </tr>'
+            '\n        '
+            '<tr class="even">\n            <td class="val">&nbsp;</td>\n        </tr>'
+        )
+
+        # attributes are picked up again on the next render
+        tg.column('value').body.hah.class_ += 'other'
+        assert 'class="val other"' in tg.html.table_rows()
+
+    @_inrequest('/')
+    def test_column_stylers_and_filters(self):
+        class TG(Grid):
+            Column('Make', 'make')
+            Column('Model', 'model')
+
+            @col_styler('model')
+            def style_model(self, attrs, record):
+                attrs.class_ += 'model'
+
+            @col_styler('make')
+            def style_make(self, attrs, record):
+                attrs.class_ += 'make'
+
+            @col_filter('model')
+            def upper_model(self, value):
+                return value.upper()
+
+            @col_filter('model')
+            def mark_model(self, value):
+                return f'{value}!'
+
+        tg = TG()
+        tg.set_records([{'make': 'ford', 'model': 'f150'}, {'make': 'ram', 'model': '1500'}])
+        with mock.patch.object(tg, 'column', wraps=tg.column) as m_column:
+            html = tg.html.table_rows()
+        # handlers are matched to columns once, not per cell
+        assert m_column.call_count == 4
+        assert '<td class="make">ford</td>' in html
+        assert '<td class="model">F150!</td>' in html
+
+        tg.set_column_order(['model', 'make'])
+        tg.set_renderers()
+        assert '<td class="model">F150!</td>\n            <td class="make">' in tg.html.table_rows()
+
+        tg.add_column(Column('Dealer', 'dealer', class_='dealer'))
+        tg.set_records([{'make': 'ford', 'model': 'f150', 'dealer': 'bob'}])
+        tg.set_renderers()
+        assert '<td class="dealer">bob</td>' in tg.html.table_rows()
+
+    @_inrequest('/')
+    def test_table_tr_multiline_cell(self):
+        class TG(Grid):
+            Column('Value', 'value')
+
+        tg = TG()
+        tg.set_records([{'value': Markup('<p>\n  one\n</p>')}])
+        assert tg.html.table_rows() == (
+            '<tr class="odd">\n            <td><p>\n            one\n            </p></td>'
+            '\n        </tr>'
+        )
+
     @_inrequest('/')
     def test_no_filters(self):
         class TGrid(Grid):
@@ -875,6 +1000,11 @@ class TestJSONRenderer:
     def get_json(self, grid):
         return json.loads(JSON(grid).render())
 
+    def test_column_render_override(self):
+        assert self.get_json(ShoutGrid())['records'] == [
+            {'firstname': 'FN001!', 'due_date': 'due 2012-02-01'},
+        ]
+
     def test_json_format_records(self):
         status_options = [
             {'key': status.id, 'value': status.label} for status in reversed(Status.list())
@@ -883,7 +1013,7 @@ class TestJSONRenderer:
             'errors': [],
             'settings': {
                 'filters': {},
-                'paging': {'pager_on': True, 'on_page': 1, 'per_page': 50},
+                'paging': {'pager_on': True, 'on_page': 1, 'per_page': 50, 'cursor': None},
                 'search_expr': None,
                 'sort': [],
                 'export_to': None,
@@ -1157,6 +1287,10 @@ class TestJSONRenderer:
                 'page_count': 1,
                 'record_count': 3,
                 'warnings': [],
+                'record_count_is_approximate': False,
+                'cursor_prev': None,
+                'cursor_next': None,
+                'timings': None,
             },
             'records': [
                 {
@@ -1231,7 +1365,7 @@ class TestJSONRenderer:
             'filters': {
                 'firstname': {'op': 'eq', 'value1': 'bar', 'value2': 'baz'},
             },
-            'paging': {'pager_on': True, 'on_page': 2, 'per_page': 20},
+            'paging': {'pager_on': True, 'on_page': 2, 'per_page': 20, 'cursor': None},
             'search_expr': 'foo',
             'sort': [
                 {'key': 'firstname', 'flag_desc': False},
@@ -1248,7 +1382,7 @@ class TestJSONRenderer:
             'filters': {
                 'account_type': {'op': 'is', 'value1': ['admin', 'manager'], 'value2': None},
             },
-            'paging': {'pager_on': True, 'on_page': 1, 'per_page': 50},
+            'paging': {'pager_on': True, 'on_page': 1, 'per_page': 50, 'cursor': None},
             'search_expr': None,
             'sort': [],
             'export_to': None,
@@ -1262,6 +1396,13 @@ class TestJSONRenderer:
 
 
 class TestXLSXRenderer:
+    def test_column_render_override(self):
+        wb = ShoutGrid().xlsx()
+        wb.filename.seek(0)
+        sheet = openpyxl.load_workbook(wb.filename).active
+        assert sheet.cell(2, 1).value == 'FN001!'
+        assert sheet.cell(2, 2).value.startswith('due 2012-02-01')
+
     def test_using_xlsxwriter_library(self):
         g = render_in_grid(PeopleGrid, 'xlsx')(per_page=1)
         wb = g.xlsx(manager_cls=XLSXWriterWorkbookManager)
@@ -1332,6 +1473,23 @@ class TestXLSXRenderer:
         }
         assert sheet.max_column == 9
 
+    def test_record_row_override(self):
+        class RowXLSX(XLSX):
+            def record_row(self, xlh, rownum, record, wb):
+                xlh.awrite(f'row {rownum}')
+                xlh.nextrow()
+
+        class TG(PeopleGrid):
+            allowed_export_targets: ClassVar = {'xlsx': RowXLSX}
+
+        g = TG()
+        g.set_sort('firstname')
+        wb = g.xlsx()
+        wb.filename.seek(0)
+        sheet = openpyxl.load_workbook(wb.filename)[g.ident]
+        assert sheet.cell(2, 1).value == 'row 0'
+        assert sheet.cell(3, 1).value == 'row 1'
+
     def test_subtotals_with_no_records(self):
         g = PGGrandTotals()
         g.column('firstname').filter.op = 'eq'
@@ -1408,6 +1566,57 @@ class TestXLSXRenderer:
         assert sheet.cell(6, 1).value == 'Totals (4 records):'
         assert set(sheet.merged_cells.ranges) == set()
 
+    def test_streaming_totals(self):
+        class StreamingXLSX(XLSX):
+            stream_batch_size = 2
+
+        class TestGrid(PeopleGrid):
+            subtotals = 'grand'
+            allowed_export_targets: ClassVar = {'xlsx': StreamingXLSX}
+
+        g = TestGrid()
+        wb = g.xlsx()
+        assert isinstance(wb, XLSXWriterStreamingWorkbookManager)
+        assert g._records is None
+        wb.close()
+        wb.filename.seek(0)
+
+        book = openpyxl.load_workbook(wb.filename)
+        sheet = book[book.sheetnames[0]]
+        assert sheet.max_row == 5
+        assert sheet.cell(1, 1).value == 'First Name'
+        assert sheet.cell(4, 1).value == 'fn001'
+        assert sheet.cell(5, 1).value == 'Totals (3 records):'
+        assert sheet.cell(5, 9).value == 6.39
+        assert sheet.column_dimensions['A'].width > 0
+        # merged ranges are not available in constant memory mode
+        assert not sheet.merged_cells.ranges
+
+    def test_streaming_group_headings(self):
+        grid = StopwatchGrid()
+        wb = grid.xlsx(manager_cls=XLSXWriterStreamingWorkbookManager)
+        wb.close()
+        wb.filename.seek(0)
+
+        book = openpyxl.load_workbook(wb.filename)
+        sheet = book[book.sheetnames[0]]
+        row_values = [cell.value for cell in next(sheet.iter_rows(max_row=1))]
+        assert row_values == [None, None, 'Lap 1', None, None, 'Lap 2', None, 'Lap 3', None]
+        assert sheet.cell(3, 2).value == 'Watch 1'
+
+    @_inrequest('/')
+    def test_streaming_response(self):
+        class StreamingXLSX(XLSX):
+            stream_batch_size = 100
+
+        class TestGrid(PeopleGrid):
+            allowed_export_targets: ClassVar = {'xlsx': StreamingXLSX}
+
+        response = TestGrid().xlsx.as_response()
+        response.direct_passthrough = False
+        book = openpyxl.load_workbook(io.BytesIO(response.get_data()))
+        assert book[book.sheetnames[0]].cell(2, 1).value == 'fn004'
+
     def test_can_render(self):
         class FakeCountsGrid(PeopleGrid):
             def __init__(self, record_count, col_count, has_subtotals):
@@ -1477,6 +1686,12 @@ class TestXLSXRenderer:
 
 
 class TestCSVRenderer:
+    def test_column_render_override(self):
+        csv_data = ShoutGrid().csv.build_csv()
+        csv_data.seek(0)
+        data = list(csv.reader(io.StringIO(csv_data.read().decode('utf-8'))))
+        assert data[1] == ['FN001!', 'due 2012-02-01']
+
     def test_some_basics(self):
         g = render_in_grid(PeopleCSVGrid, 'csv')(per_page=1)
         csv_data = g.csv.build_csv()
@@ -1525,6 +1740,47 @@ class TestCSVRenderer:
         assert data[0][0] == 'Created'
         assert data[1][0] == '08/10/2016 01:02 AM'
 
+    def test_iter_csv_matches_build_csv(self):
+        g = PeopleCSVGrid()
+        expected = g.csv.build_csv().getvalue()
+
+        g = PeopleCSVGrid()
+        chunks = list(g.csv.iter_csv(batch_size=2))
+        assert b''.join(chunks) == expected
+        # heading row and first two records, then the rest, then the flushed remainder
+        assert chunks[0].count(b'\r\n') == 3
+        assert g._records is None
+
+    @_inrequest('/')
+    def test_streamed_response(self):
+        class StreamingCSV(CSV):
+            stream_batch_size = 2
+
+        class CSVGrid(PeopleCSVGrid):
+            allowed_export_targets: ClassVar = {'csv': StreamingCSV}
+
+        expected = PeopleCSVGrid().csv.build_csv().getvalue()
+        g = CSVGrid()
+        response = g.csv.as_response()
+        assert response.is_streamed
+        assert response.mimetype == 'text/csv'
+        assert response.headers['Content-Disposition'].startswith(
+            'attachment; filename=csv_grid_',
+        )
+        assert response.get_data() == expected
+
+    @_inrequest('/')
+    def test_streamed_response_file_name(self):
+        g = PeopleCSVGrid()
+        manager = g.manager
+        response = manager.file_as_response(iter([b'']), 'my; grid.csv', 'text/csv')
+        assert response.headers['Content-Disposition'] == 'attachment; filename="my; grid.csv"'
+
+        response = manager.file_as_response(iter([b'']), 'año.csv', 'text/csv')
+        assert response.headers['Content-Disposition'] == (
+            "attachment; filename=ano.csv; filename*=UTF-8''a%C3%B1o.csv"
+        )
+
 
 class TestHideSection:
     @_inrequest('/')
@@ -0,0 +1,145 @@
+import datetime as dt
+from unittest import mock
+
+import flask
+import pytest
+import sqlalchemy as sa
+from werkzeug.datastructures import MultiDict
+
+from webgrid.extensions import WebSessionArgsLoader
+from webgrid.session_store import (
+    FileSessionStore,
+    MemorySessionStore,
+    SQLAlchemySessionStore,
+    WebSessionStore,
+)
+from webgrid_ta.grids import PeopleGrid
+
+from .helpers import _inrequest
+
+
+@pytest.fixture
+def sqlalchemy_store():
+    engine = sa.create_engine('sqlite://', poolclass=sa.pool.StaticPool)
+    store = SQLAlchemySessionStore(engine)
+    store.create_table()
+    return store
+
+
+@pytest.fixture(params=['memory', 'sqlalchemy', 'file'])
+def server_store(request, tmp_path):
+    if request.param == 'memory':
+        return MemorySessionStore()
+    if request.param == 'sqlalchemy':
+        return request.getfixturevalue('sqlalchemy_store')
+    return FileSessionStore(tmp_path / 'sessions')
+
+
+class TestWebSessionStore:
+    @_inrequest('/foo')
+    def test_get_set_delete(self):
+        store = WebSessionStore()
+        manager = PeopleGrid.manager
+        assert store.get(manager, 'a') is None
+        assert store.keys(manager) == ()
+
+        store.set(manager, 'a', '[]')
+        assert flask.session['dgsessions'] == {'a': '[]'}
+        assert store.keys(manager) == ('a',)
+
+        store.delete(manager, 'a')
+        store.delete(manager, 'b')
+        assert flask.session['dgsessions'] == {}
+
+
+class TestServerSessionStores:
+    @_inrequest('/foo')
+    def test_get_set_delete(self, server_store):
+        manager = PeopleGrid.manager
+        assert server_store.get(manager, 'a') is None
+        assert server_store.keys(manager) == ()
+        assert 'dgsession_id' not in flask.session
+
+        server_store.set(manager, 'a', '[["perpage", "5"]]')
+        server_store.set(manager, 'b', '[]')
+        server_store.set(manager, 'b', '[["onpage", "2"]]')
+        assert server_store.get(manager, 'a') == '[["perpage", "5"]]'
+        assert server_store.get(manager, 'b') == '[["onpage", "2"]]'
+        assert sorted(server_store.keys(manager)) == ['a', 'b']
+
+        server_store.delete(manager, 'a')
+        server_store.delete(manager, 'c')
+        assert server_store.get(manager, 'a') is None
+        assert server_store.keys(manager) == ('b',)
+
+    def test_sessions_separate(self, server_store):
+        server_store.write('one', 'a', '[]')
+        assert server_store.read('two', 'a') is None
+        assert server_store.stored_keys('two') == ()
+
+    @_inrequest('/foo?op(firstname)=eq&v1(firstname)=bob&perpage=1&onpage=100')
+    def test_loader_keeps_only_id_in_web_session(self, server_store):
+        pg = PeopleGrid()
+        loader = WebSessionArgsLoader(pg.manager)
+        with mock.patch.object(pg.manager, 'session_store', server_store):
+            loader.get_args(pg, flask.request.args)
+            assert 'dgsessions' not in flask.session
+            assert set(flask.session.keys()) == {'dgsession_id', 'dgsessions_oldest'}
+            assert sorted(server_store.keys(pg.manager)) == sorted(
+                ['_PeopleGrid', pg.session_key],
+            )
+
+            args = loader.get_args(PeopleGrid(), MultiDict([('session_key', pg.session_key)]))
+            assert args['v1(firstname)'] == 'bob'
+            assert args['perpage'] == '1'
+
+
+class TestSQLAlchemySessionStore:
+    def test_write_row_inserted_concurrently(self, sqlalchemy_store):
+        # the row is stored by another request between our update and insert
+        sqlalchemy_store.write('one', 'a', '[]')
+        update = sqlalchemy_store._update
+        results = [False]
+
+        def racing_update(*args):
+            return results.pop() if results else update(*args)
+
+        with mock.patch.object(sqlalchemy_store, '_update', side_effect=racing_update) as m_update:
+            sqlalchemy_store.write('one', 'a', '[["perpage", "1"]]')
+        assert m_update.call_count == 2
+        assert sqlalchemy_store.read('one', 'a') == '[["perpage", "1"]]'
+
+    @_inrequest('/foo')
+    def test_loader_reads_without_listing_keys(self, sqlalchemy_store):
+        pg = PeopleGrid()
+        loader = WebSessionArgsLoader(pg.manager)
+        with (
+            mock.patch.object(pg.manager, 'session_store', sqlalchemy_store),
+            mock.patch.object(sqlalchemy_store, 'stored_keys') as m_stored_keys,
+        ):
+            args = MultiDict([('session_key', 'foo')])
+            assert loader.get_session_store(pg, args) is args
+        m_stored_keys.assert_not_called()
+
+
+class TestPurge:
+    def test_sqlalchemy(self, sqlalchemy_store):
+        sqlalchemy_store.write('one', 'a', '[]')
+        sqlalchemy_store.purge(1)
+        assert sqlalchemy_store.stored_keys('one') == ('a',)
+
+        with mock.patch('webgrid.session_store._utcnow', return_value=dt.datetime(2000, 1, 1)):
+            sqlalchemy_store.write('two', 'a', '[]')
+        sqlalchemy_store.purge(1)
+        assert sqlalchemy_store.stored_keys('one') == ('a',)
+        assert sqlalchemy_store.stored_keys('two') == ()
+
+    def test_file(self, tmp_path):
+        store = FileSessionStore(tmp_path)
+        store.write('one', 'a', '[]')
+        store.purge(1)
+        assert store.stored_keys('one') == ('a',)
+
+        with mock.patch('webgrid.session_store.time.time', return_value=10**10):
+            store.purge(1)
+        assert store.stored_keys('one') == ()
@@ -6,8 +6,8 @@ import pytest
 import xlsxwriter
 
 from webgrid import testing
-from webgrid_ta.grids import RadioGrid, TemporalGrid
-from webgrid_ta.model.entities import Person, db
+from webgrid_ta.grids import PeopleGrid, RadioGrid, TemporalGrid
+from webgrid_ta.model.entities import Email, Person, db
 
 
 def setup_module():
@@ -46,6 +46,59 @@ class TestAssertListEqual:
         testing.assert_list_equal([0, 1, 2], (x for x in range(3)))
 
 
+class TestQueryRecorder:
+    def test_statement_shape(self):
+        shape = testing.statement_shape(
+            "SELECT a\n  FROM t WHERE b = 'x' AND c IN (?, ?, ?) AND d = :d_1 LIMIT 10",
+        )
+        assert shape == 'SELECT a FROM t WHERE b = ? AND c IN (?) AND d = ? LIMIT ?'
+
+    def test_records_statements(self):
+        Person.delete_cascaded()
+        with testing.QueryRecorder(db.engine) as recorder:
+            db.session.execute(db.select(Person.id).where(Person.id == 1)).all()
+            db.session.execute(db.select(Person.id).where(Person.id == 2)).all()
+            db.session.execute(db.select(Email.id)).all()
+        # recording stops on exit
+        db.session.execute(db.select(Email.id)).all()
+
+        assert recorder.count == 3
+        assert len(recorder.duplicates()) == 1
+        assert recorder.duplicates()[0][1] == 2
+        assert 'FROM persons' in recorder.duplicates()[0][0]
+
+    def test_assert_max_queries(self):
+        with testing.assert_max_queries(1):
+            db.session.execute(db.select(Person.id)).all()
+
+        with (
+            pytest.raises(AssertionError, match=r'2x SELECT persons.id'),
+            testing.assert_max_queries(1),
+        ):
+            db.session.execute(db.select(Person.id)).all()
+            db.session.execute(db.select(Person.id)).all()
+
+
+class TestGridBaseQueryBudget(testing.GridBase):
+    grid_cls = PeopleGrid
+    # count and data queries, plus one lazy load of emails per person
+    max_queries = 5
+
+    def setup_method(self, _):
+        Person.delete_cascaded()
+        for num in range(3):
+            Email.add(person=Person.testing_create(), email=f'{num}@example.com')
+        db.session.expire_all()
+
+    def test_n_plus_one_reported(self):
+        with pytest.raises(AssertionError, match=r'Repeated statements:\n  3x SELECT emails'):
+            self.assert_max_queries(2)
+
+    def test_export(self):
+        recorder = self.record_queries(export_to='xlsx')
+        assert recorder.count == 5
+
+
 class TestAssertRenderedXlsxMatches:
     def setup_method(self):
         self.stream = BytesIO()
@@ -1,5 +1,6 @@
 import datetime as dt
 from decimal import Decimal
+import itertools
 import json
 from os import path
 import re
@@ -10,10 +11,13 @@ from unittest.mock import MagicMock
 import arrow
 import flask
 import pytest
+import sqlalchemy as sa
+import sqlalchemy.orm as saorm
 import sqlalchemy.sql as sasql
 from werkzeug.datastructures import MultiDict
 
-from webgrid import BoolColumn, Column, YesNoColumn
+from webgrid import BoolColumn, Column, NumericColumn, PostgresCountEstimator, YesNoColumn
+from webgrid.cache import LRUCache
 from webgrid.extensions import (
     CustomJsonEncoder,
     RequestArgsLoader,
@@ -25,10 +29,10 @@ from webgrid.extensions import (
     lazy_gettext as _,
 )
 from webgrid.filters import AggregateIntFilter, FilterBase, IntFilter, TextFilter
-from webgrid.renderers import CSV
-from webgrid.testing import assert_in_query, assert_not_in_query
-from webgrid_ta.grids import Grid, PeopleGrid, PeopleGridByConfig
-from webgrid_ta.model.entities import Person, Status, Stopwatch, db
+from webgrid.renderers import CSV, JSON
+from webgrid.testing import QueryRecorder, assert_in_query, assert_not_in_query
+from webgrid_ta.grids import EmailsColumn, Grid, PeopleGrid, PeopleGridByConfig
+from webgrid_ta.model.entities import Email, Person, Status, Stopwatch, db
 
 from .helpers import _inrequest
 
@@ -59,6 +63,50 @@ class TestGrid:
         g = self.TG()
         assert g.manager.static_path().endswith(f'webgrid{path.sep}static')
 
+    def test_columns_from_blueprint(self):
+        class TG(Grid):
+            Column('First Name', Person.firstname, TextFilter, class_='name')
+
+        TG()
+        with (
+            mock.patch('inspect.getfullargspec') as m_argspec,
+            mock.patch('inspect.currentframe') as m_frame,
+        ):
+            g = TG()
+            g2 = TG()
+        assert not m_argspec.called
+        assert not m_frame.called
+
+        col, col2 = g.columns[0], g2.columns[0]
+        assert col is not col2
+        assert col.grid is g
+        assert col.key == 'firstname'
+        assert col.filter is not col2.filter
+        assert col.filter.sa_col is Person.firstname
+        assert col.head.hah is not col2.head.hah
+        assert col.head.hah.class_ == 'name'
+        col.kwargs['foo'] = 'bar'
+        assert 'foo' not in col2.kwargs
+
+    def test_blueprint_containers_not_shared(self):
+        class StyledColumn(Column):
+            def __init__(self, *args, xls_style=None, **kwargs):
+                super().__init__(*args, **kwargs)
+                self.xls_style = xls_style or {'bold': False}
+
+        class TG(Grid):
+            StyledColumn('First Name', Person.firstname, render_in=['html', 'csv'], class_='name')
+
+        col, col2 = TG().columns[0], TG().columns[0]
+        col.head.hah['class_'] = 'changed'
+        col.xls_style['bold'] = True
+        col._render_in.append('xlsx')
+
+        assert col2.head.hah.class_ == 'name'
+        assert col2.xls_style == {'bold': False}
+        assert col2.render_in == ('html', 'csv')
+        assert TG().columns[0].render_in == ('html', 'csv')
+
     def test_column_key(self):
         g = self.TG()
         g.build_query()
@@ -215,6 +263,74 @@ class TestGrid:
         totals = g.grand_totals
         assert totals.something == Decimal('3.75'), totals
 
+    def test_page_totals_from_records(self):
+        class CTG(Grid):
+            subtotals = 'page'
+            per_page = 2
+            Column('First Name', Person.firstname)
+            Column('Sum', Person.numericcol.label('something'), has_subtotal='sum')
+            Column('Avg', Person.floatcol, has_subtotal='avg')
+            Column('Count', Person.sortorder, has_subtotal='count')
+
+        Person.delete_cascaded()
+        Person.testing_create(numericcol=5, floatcol=1, sortorder=1)
+        Person.testing_create(numericcol=10, floatcol=4, sortorder=None)
+        Person.testing_create(numericcol=20, floatcol=8, sortorder=3)
+        g = CTG()
+        g.set_sort('something')
+        g.records  # noqa: B018
+        with mock.patch('logging.Logger.debug') as m_debug:
+            totals = g.page_totals
+        assert not any('Totals query' in call[0][0] for call in m_debug.call_args_list)
+        assert totals.something == 15
+        assert totals['something'] == 15
+        assert totals.floatcol == 2.5
+        assert totals.sortorder == 1
+        assert totals.firstname is None
+
+        g.set_paging(2, 2)
+        assert g.page_totals.something == 20
+
+    def test_page_totals_expr_uses_query(self):
+        class CTG(Grid):
+            subtotals = 'page'
+            Column('Numeric', Person.numericcol.label('numeric_col'), has_subtotal=True)
+            Column('Float', Person.floatcol.label('float_col'), has_subtotal=True)
+            Column(
+                'Ratio',
+                Person.numericcol.label('something'),
+                has_subtotal='sum(numeric_col) / sum(float_col)',
+            )
+
+        Person.testing_create(numericcol=5, floatcol=1)
+        Person.testing_create(numericcol=10, floatcol=3)
+        with mock.patch('logging.Logger.debug') as m_debug:
+            assert CTG().page_totals.something == Decimal('3.75')
+        assert any('Totals query' in call[0][0] for call in m_debug.call_args_list)
+
+    def test_grand_totals_count(self):
+        class CTG(Grid):
+            subtotals = 'grand'
+            Column('Sum Total', Person.numericcol.label('something'), has_subtotal=True)
+
+        Person.delete_cascaded()
+        Person.testing_create(numericcol=5)
+        Person.testing_create(numericcol=10)
+        g = CTG()
+        with mock.patch('logging.Logger.debug') as m_debug:
+            assert g.record_count == 2
+        messages = [call[0][0] for call in m_debug.call_args_list]
+        assert not any('Count query' in message for message in messages)
+        assert any('Totals query' in message for message in messages)
+        assert g.grand_totals.something == 15
+
+        Person.testing_create(numericcol=1)
+        g.clear_record_cache(preserve_count=True)
+        assert g.grand_totals.something == 15
+        g.clear_record_cache()
+        assert g.grand_totals.something == 16
+        assert g.record_count == 3
+
     def test_query_prep_sorting(self):
         class CTG(Grid):
             Column('First Name', Person.firstname)
@@ -928,6 +1044,472 @@ class TestQueryStringArgs:
         assert g.search_value is None
 
 
+class TestRecordCount:
+    class TG(Grid):
+        Column('First Name', Person.firstname, TextFilter)
+
+    class Estimator:
+        def __init__(self, value):
+            self.value = value
+            self.calls = []
+
+        def estimate(self, grid, query):
+            self.calls.append(query)
+            return self.value
+
+    def setup_method(self, _):
+        Person.delete_cascaded()
+        Person.testing_create('bob')
+        Person.testing_create('bob')
+        Person.testing_create('al')
+
+    def test_count_cache(self):
+        class TG(self.TG):
+            count_cache = LRUCache()
+
+        assert TG().record_count == 3
+        Person.testing_create('bob')
+
+        with mock.patch('logging.Logger.debug') as m_debug:
+            assert TG().record_count == 3
+        assert mock.call('Count loaded from cache') in m_debug.call_args_list
+
+        # a different filter is a different count query
+        g = TG()
+        g.set_filter('firstname', 'eq', 'bob')
+        assert g.record_count == 3
+
+        TG.count_cache.clear()
+        assert TG().record_count == 4
+
+    def test_count_cache_key(self):
+        g = self.TG()
+        g.set_filter('firstname', 'eq', 'bob')
+        key = g.count_cache_key(g.build_query(for_count=True))
+        assert key == g.count_cache_key(g.build_query(for_count=True))
+        g.set_filter('firstname', 'eq', 'al')
+        assert key != g.count_cache_key(g.build_query(for_count=True))
+
+    def test_count_cache_key_uses_query_bind(self):
+        g = self.TG()
+        query = g.build_query(for_count=True)
+        other_session = saorm.Session(bind=sa.create_engine('sqlite:///other.db'))
+        assert g.count_cache_key(query) != g.count_cache_key(query.with_session(other_session))
+
+    def test_estimator(self):
+        class TG(self.TG):
+            count_estimator = self.Estimator(1000)
+
+        g = TG()
+        assert g.record_count == 1000
+        assert g.record_count_is_approximate
+        g.clear_record_cache()
+        assert not g.record_count_is_approximate
+
+    def test_estimator_declines(self):
+        class TG(self.TG):
+            count_estimator = self.Estimator(None)
+
+        g = TG()
+        assert g.record_count == 3
+        assert not g.record_count_is_approximate
+        assert len(TG.count_estimator.calls) == 1
+
+    def test_postgres_estimator_skipped(self):
+        g = self.TG()
+        g.count_estimator = PostgresCountEstimator(min_count=0)
+        if db.engine.dialect.name != 'postgresql':
+            assert g.record_count == 3
+            assert not g.record_count_is_approximate
+        g = self.TG()
+        g.count_estimator = PostgresCountEstimator(min_count=0)
+        g.set_filter('firstname', 'eq', 'bob')
+        assert g.record_count == 2
+        assert not g.record_count_is_approximate
+
+    @_inrequest('/')
+    def test_html_approximate(self):
+        class TG(self.TG):
+            count_estimator = self.Estimator(1000)
+
+        g = TG()
+        header = g.html.header_paging()
+        assert 'about 1000' in header
+        assert 'of about 20' in header
+
+    @_inrequest('/')
+    def test_html_exact(self):
+        header = self.TG().html.header_paging()
+        assert 'about' not in header
+
+
+class TestWindowCount:
+    class TG(Grid):
+        window_count = True
+        per_page = 2
+        Column('First Name', Person.firstname, TextFilter)
+
+    def setup_method(self, _):
+        Person.delete_cascaded()
+        for firstname in ('bob', 'al', 'bob', 'cy', 'al'):
+            Person.testing_create(firstname)
+
+    def test_count_from_records(self):
+        g = self.TG()
+        assert g.uses_window_count
+        assert_in_query(g, 'count(*) OVER ()')
+        with mock.patch('sqlalchemy.orm.Query.count') as m_count:
+            assert g.record_count == 5
+            assert len(g.records) == 2
+        assert not m_count.called
+
+        g.set_filter('firstname', 'eq', 'bob')
+        with mock.patch('sqlalchemy.orm.Query.count') as m_count:
+            assert g.record_count == 2
+        assert not m_count.called
+
+    def test_count_query_excluded(self):
+        g = self.TG()
+        assert 'OVER' not in str(g.build_query(for_count=True))
+        g.set_paging(None, None)
+        assert not g.uses_window_count
+        assert_not_in_query(g, 'OVER')
+
+    def test_empty_first_page(self):
+        g = self.TG()
+        g.set_filter('firstname', 'eq', 'nobody')
+        with mock.patch('sqlalchemy.orm.Query.count') as m_count:
+            assert g.record_count == 0
+        assert not m_count.called
+        assert g.page_count == 1
+
+    def test_page_out_of_range(self):
+        g = self.TG()
+        g.apply_qs_args(grid_args=MultiDict({'onpage': '10'}))
+        # count is not needed to accept the requested page
+        assert g._record_count is None
+        assert g.on_page == 10
+        assert g.record_count == 5
+        assert g.on_page == 3
+        assert len(g.records) == 1
+
+    def test_distinct_query(self):
+        class DistinctGrid(self.TG):
+            def query_prep(self, query, has_sort, has_filters):
+                return query.distinct().order_by(Person.firstname)
+
+        g = DistinctGrid()
+        assert not g.uses_window_count
+        assert_not_in_query(g, 'OVER')
+        assert g.record_count == 3
+        assert [record.firstname for record in g.records] == ['al', 'bob']
+
+
+class TestTimings:
+    class TG(Grid):
+        subtotals = 'grand'
+        Column('First Name', Person.firstname, TextFilter)
+        NumericColumn('Number', Person.numericcol, has_subtotal=True)
+
+    @_inrequest('/?op(firstname)=contains&v1(firstname)=fn')
+    def test_phases_recorded(self):
+        events = []
+        g = self.TG()
+        g.timing_listeners.append(lambda grid, phase, seconds: events.append((grid, phase)))
+        g.apply_qs_args()
+        g.records  # noqa: B018
+        g.record_count  # noqa: B018
+        g.html()
+
+        assert set(g.timings) == {
+            'args',
+            'apply_qs_args',
+            'build_query',
+            'data',
+            'totals',
+            'render_html',
+        }
+        assert all(seconds >= 0 for seconds in g.timings.values())
+        assert [phase for _grid, phase in events[:2]] == ['args', 'apply_qs_args']
+        assert events[-1] == (g, 'render_html')
+        assert self.TG.timing_listeners == ()
+
+    def test_count_phase(self):
+        g = self.TG()
+        g.subtotals = 'none'
+        g.record_count  # noqa: B018
+        assert set(g.timings) == {'build_query', 'count'}
+
+    @_inrequest('/')
+    def test_debug_output(self):
+        g = self.TG()
+        assert 'webgrid timings' not in g.html()
+        assert JSON(g).asdict()['state']['timings'] is None
+
+        g = self.TG()
+        g.debug_timings = True
+        assert re.search(r'<!-- webgrid timings: .*data=[\d.]+ms.* -->$', g.html())
+        assert 'totals' in JSON(g).asdict()['state']['timings']
+
+    def test_streamed_csv_excludes_consumer_time(self):
+        clock = [0.0]
+        g = self.TG()
+        g.subtotals = 'none'
+        with mock.patch('time.perf_counter', lambda: clock[0]):
+            chunks = []
+            for chunk in CSV(g).iter_csv(batch_size=2):
+                chunks.append(chunk)
+                # time spent sending the chunk to the client
+                clock[0] += 10
+        assert len(chunks) > 2
+        assert g.timings['data'] == 0
+        assert g.timings['render_csv'] == 0
+
+
+class TestLoaderOptions:
+    class LG(Grid):
+        Column('First Name', Person.firstname)
+        EmailsColumn('Emails', render_in='html', loader_options=saorm.joinedload(Person.emails))
+
+        def query_prep(self, query, has_sort, has_filters):
+            return query.add_entity(Person).order_by(Person.id)
+
+    def test_options_for_render_target(self):
+        g = self.LG()
+        assert_in_query(g, 'LEFT OUTER JOIN emails')
+        g.render_target = 'html'
+        assert_in_query(g, 'LEFT OUTER JOIN emails')
+        g.render_target = 'csv'
+        assert_not_in_query(g, 'LEFT OUTER JOIN emails')
+
+    def test_options_not_on_count(self):
+        g = self.LG()
+        assert 'emails' not in str(g.build_query(for_count=True))
+
+    def test_grid_options(self):
+        g = self.LG()
+        g.loader_options = (saorm.selectinload(Person.status),)
+        g.render_target = 'csv'
+        query = g.build_query()
+        assert len(query._with_options) == 1
+
+    @_inrequest('/')
+    def test_render_batches_relationship(self):
+        Person.delete_cascaded()
+        for num in range(3):
+            Email.add(person=Person.testing_create(), email=f'{num}@example.com')
+
+        class SG(Grid):
+            Column('First Name', Person.firstname)
+            EmailsColumn(
+                'Emails',
+                render_in='html',
+                loader_options=saorm.selectinload(Person.emails),
+            )
+
+            def query_prep(self, query, has_sort, has_filters):
+                return query.add_entity(Person)
+
+        db.session.expire_all()
+        g = SG()
+        with QueryRecorder(db.engine) as recorder:
+            html = g.html()
+        assert '2@example.com' in html
+        # count, records, and a single query for the emails of all records
+        assert recorder.count == 3
+        assert g.render_target is None
+
+        db.session.expire_all()
+        g = SG()
+        with QueryRecorder(db.engine) as recorder:
+            CSV(g).as_response()
+        assert 'emails' not in ' '.join(recorder.statements)
+
+
+class TestColumnPruning:
+    class PG(Grid):
+        prune_columns = True
+        subtotals = 'page'
+        Column('First Name', Person.firstname, TextFilter)
+        Column('Last Name', Person.lastname, TextFilter, render_in='html')
+        Column('State', Person.state, render_in='csv')
+        NumericColumn('Number', Person.numericcol, has_subtotal=True, render_in='xlsx')
+        Column('Address', Person.address, render_in='xlsx')
+
+    def selected(self, grid, for_count=False):
+        query = grid.build_query(for_count=for_count)
+        return [desc['name'] for desc in query.column_descriptions]
+
+    def test_pruned_for_target(self):
+        g = self.PG()
+        assert self.selected(g) == ['firstname', 'lastname', 'state', 'numericcol', 'address']
+
+        g.render_target = 'csv'
+        assert self.selected(g) == ['firstname', 'state', 'numericcol']
+        assert [col._query_idx for col in g.columns] == [0, None, 1, 2, None]
+        assert self.selected(g, for_count=True) == [
+            'firstname',
+            'lastname',
+            'state',
+            'numericcol',
+            'address',
+        ]
+
+        g.prune_columns = False
+        assert self.selected(g) == ['firstname', 'lastname', 'state', 'numericcol', 'address']
+
+    def test_filter_and_sort_columns_kept(self):
+        g = self.PG()
+        g.render_target = 'csv'
+        g.set_filter('lastname', 'eq', 'bob')
+        g.set_sort('address')
+        assert self.selected(g) == ['firstname', 'lastname', 'state', 'numericcol', 'address']
+
+    def test_search_keeps_filter_columns(self):
+        g = self.PG()
+        g.render_target = 'csv'
+        g.search_value = 'bob'
+        assert self.selected(g) == ['firstname', 'lastname', 'state', 'numericcol']
+
+    @_inrequest('/')
+    def test_render(self):
+        Person.delete_cascaded()
+        Person.testing_create(firstname='fn', lastname='ln', state='st', numericcol=5)
+
+        g = self.PG()
+        renderer = CSV(g)
+        with QueryRecorder(db.engine) as recorder:
+            renderer.as_response()
+        assert 'persons.state' in recorder.statements[-1]
+        assert 'persons.address' not in recorder.statements[-1]
+        assert renderer.output.getvalue().splitlines() == ['First Name,State', 'fn,st']
+
+        # records loaded for one target are reloaded for another
+        g = self.PG()
+        g.render_target = 'csv'
+        g.records  # noqa: B018
+        html = g.html()
+        assert '<td>ln</td>' in html
+        assert g._records_target == 'html'
+
+
+class TestKeysetPaging:
+    class KeysetGrid(Grid):
+        keyset_tiebreaker = Person.id
+        per_page = 2
+        Column('ID', Person.id)
+        Column('First Name', Person.firstname)
+
+    def setup_method(self, _):
+        Person.delete_cascaded()
+        for firstname in ('bob', 'al', 'bob', 'cy', 'al'):
+            Person.testing_create(firstname)
+
+    def expected_ids(self, *order_by):
+        return [person.id for person in Person.query.order_by(*order_by, Person.id.asc()).all()]
+
+    def walk(self, grid, cursor_attr):
+        pages = []
+        while True:
+            pages.append([record.id for record in grid.records])
+            cursor = getattr(grid, cursor_attr)
+            if cursor is None:
+                return pages
+            grid.set_cursor(cursor)
+
+    def test_offset_paging_by_default(self):
+        class TG(self.KeysetGrid):
+            keyset_tiebreaker = None
+
+        g = TG()
+        assert not g.uses_keyset_paging
+        assert g.cursor_next is None
+        assert_in_query(g, 'LIMIT 2 OFFSET 0')
+
+    def test_forward(self):
+        g = self.KeysetGrid()
+        g.set_sort('firstname')
+        assert g.uses_keyset_paging
+        assert not g.has_previous_page
+        pages = self.walk(g, 'cursor_next')
+        assert [len(page) for page in pages] == [2, 2, 1]
+        assert list(itertools.chain(*pages)) == self.expected_ids(Person.firstname)
+        assert g.has_previous_page
+        assert not g.has_next_page
+
+    def test_backward_from_last(self):
+        g = self.KeysetGrid()
+        g.set_sort('-firstname')
+        g.set_cursor(g.cursor_last)
+        pages = self.walk(g, 'cursor_prev')
+        assert [len(page) for page in pages] == [2, 2, 1]
+        assert list(itertools.chain(*reversed(pages))) == self.expected_ids(Person.firstname.desc())
+        assert not g.has_previous_page
+        assert g.has_next_page
+
+    def test_default_sort(self):
+        class TG(self.KeysetGrid):
+            query_default_sort = (Person.firstname.desc(),)
+
+        g = TG()
+        pages = self.walk(g, 'cursor_next')
+        assert list(itertools.chain(*pages)) == self.expected_ids(Person.firstname.desc())
+
+    def test_cursor_ignored_after_sort_change(self):
+        g = self.KeysetGrid()
+        g.set_sort('firstname')
+        cursor = g.cursor_next
+        g = self.KeysetGrid()
+        g.set_sort('-firstname')
+        g.set_cursor(cursor)
+        assert [record.id for record in g.records] == self.expected_ids(
+            Person.firstname.desc(),
+        )[:2]
+
+    def test_invalid_cursor(self):
+        g = self.KeysetGrid()
+        g.set_cursor('not-a-cursor')
+        assert len(g.records) == 2
+        assert not g.has_previous_page
+
+    def test_page_totals_exclude_look_ahead(self):
+        class TG(self.KeysetGrid):
+            subtotals = 'page'
+            Column('Number', Person.numericcol, has_subtotal=True)
+
+        Person.delete_cascaded()
+        for num in (1, 2, 4):
+            Person.testing_create(numericcol=num)
+        g = TG()
+        assert g.page_totals.numericcol == 3
+
+    @_inrequest('/thepage?sort1=firstname')
+    def test_qs_args(self):
+        g = self.KeysetGrid()
+        g.apply_qs_args()
+        cursor = g.cursor_next
+        assert g.build_qs_args() == 'sort1=firstname'
+
+        flask.request.args['cursor'] = cursor
+        g = self.KeysetGrid()
+        g.apply_qs_args()
+        assert g.page_cursor == cursor
+        assert g.build_qs_args() == f'cursor={cursor}&sort1=firstname'
+        assert [record.id for record in g.records] == self.expected_ids(Person.firstname)[2:4]
+
+    @_inrequest('/thepage?sort1=firstname')
+    def test_html_pager(self):
+        g = self.KeysetGrid()
+        g.apply_qs_args()
+        footer = g.html.footer()
+        assert f'href="/thepage?cursor={g.cursor_next}&amp;perpage=2&amp;sort1=firstname"' in (
+            footer
+        )
+        assert f'cursor={g.cursor_last}' in footer
+        assert 'class="first"' not in footer
+        assert 'name="onpage"' not in g.html.header_paging()
+
+
 class GridPrefixTestBase:
     def test_passthru(self):
         source_args = MultiDict([('foo', 'bar'), ('baz', 'bin')])
@@ -1362,6 +1944,60 @@ class TestWebSessionArgsLoader:
 
         assert '_PeopleGrid' in flask.session['dgsessions']
 
+    @_inrequest('/foo?op(firstname)=eq&v1(firstname)=bob&perpage=1&onpage=100')
+    @mock.patch.object(PeopleGrid.manager, 'session_max_hours', 12)
+    def test_expiry_sweep_skipped_until_oldest_expires(self):
+        saved = arrow.get('2021-01-05 15:14:13')
+        with mock.patch('webgrid.extensions.arrow.utcnow', lambda *args: saved):
+            pg = PeopleGrid()
+            loader = WebSessionArgsLoader(pg.manager)
+            loader.get_args(pg, flask.request.args)
+            assert loader.get_session_store(pg, MultiDict())['v1(firstname)'] == 'bob'
+        assert flask.session['dgsessions_oldest'] == saved.int_timestamp
+        assert flask.session['dgsessions'][pg.session_key].startswith(f'{saved.int_timestamp}|')
+
+        with (
+            mock.patch('webgrid.extensions.arrow.utcnow', lambda *args: saved.shift(hours=11)),
+            mock.patch.object(loader, 'session_saved_at') as m_saved_at,
+        ):
+            loader.cleanup_expired_sessions()
+        m_saved_at.assert_not_called()
+
+        # the sweep runs once the oldest session expires, and records the new oldest
+        flask.session['dgsessions']['_OtherGrid'] = f'{saved.shift(hours=6).int_timestamp}|[]'
+        with mock.patch('webgrid.extensions.arrow.utcnow', lambda *args: saved.shift(hours=13)):
+            loader.cleanup_expired_sessions()
+        assert list(flask.session['dgsessions']) == ['_OtherGrid']
+        assert flask.session['dgsessions_oldest'] == saved.shift(hours=6).int_timestamp
+
+    @_inrequest('/foo?op(firstname)=eq&v1(firstname)=bob&perpage=1&onpage=100')
+    @mock.patch.object(PeopleGrid.manager, 'session_max_hours', 12)
+    def test_expiry_cleanup_rate(self):
+        with mock.patch(
+            'webgrid.extensions.arrow.utcnow',
+            lambda *args: arrow.get('2021-01-05 15:14:13'),
+        ):
+            pg = PeopleGrid()
+            loader = WebSessionArgsLoader(pg.manager)
+            loader.get_args(pg, flask.request.args)
+
+        with (
+            mock.patch.object(pg.manager, 'session_cleanup_rate', 0.5),
+            mock.patch('webgrid.extensions.random.random', return_value=0.6),
+        ):
+            loader.cleanup_expired_sessions()
+        assert '_PeopleGrid' in flask.session['dgsessions']
+        # left in place, but expired entries are not loaded
+        args = MultiDict([('session_key', pg.session_key)])
+        assert loader.get_session_store(pg, args) is args
+
+        with (
+            mock.patch.object(pg.manager, 'session_cleanup_rate', 0.5),
+            mock.patch('webgrid.extensions.random.random', return_value=0.4),
+        ):
+            loader.cleanup_expired_sessions()
+        assert '_PeopleGrid' not in flask.session['dgsessions']
+
 
 class TestCustomJSONEncoder:
     def dump(self, value):